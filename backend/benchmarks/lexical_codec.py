@@ -0,0 +1,212 @@
+"""
+Benchmark and round-trip check for the compact Lexical storage encoding.
+
+Generates seeded random editor states shaped like the frontend's output
+(headings, quotes, lists, formatted text runs, line breaks), verifies the
+codec's round-trip properties on every document and reports stored size
+(JSON, and BSON when pymongo is installed) and compact/expand throughput.
+Run from the project root:
+
+    python -m backend.benchmarks.lexical_codec --docs 500 --out lexical.json
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+# The codec reads the storage flag from settings, which require these to import
+os.environ.setdefault("JWT_SECRET", "lexical-benchmark-secret-key-not-for-production")
+os.environ.setdefault("GEMINI_API_KEY", "lexical-benchmark")
+
+from ..services.lexical import compact_lexical, expand_lexical, extract_plain_text  # noqa: E402
+
+
+WORDS = (
+    "editor draft publish summary grammar lexical autosave mongo index latency "
+    "throughput request cursor document paragraph heading quote list token"
+).split()
+
+# Bold, italic, underline and code formats, and a style string as set by the toolbar
+FORMATS = [0, 0, 0, 0, 1, 2, 3, 8, 16]
+STYLES = ["", "", "", "color: #d32f2f;"]
+
+
+def random_text_node(rng: random.Random) -> dict:
+    node = {
+        "detail": 0,
+        "format": rng.choice(FORMATS),
+        "mode": "normal",
+        "style": rng.choice(STYLES),
+        "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12))) + " ",
+        "type": "text",
+        "version": 1,
+    }
+    # Occasional non-mergeable runs
+    if rng.random() < 0.03:
+        node["mode"] = "token"
+    return node
+
+
+def random_inline_children(rng: random.Random) -> List[dict]:
+    children = []
+    for _ in range(rng.randint(1, 8)):
+        if rng.random() < 0.1:
+            children.append({"type": "linebreak", "version": 1})
+        else:
+            children.append(random_text_node(rng))
+    return children
+
+
+def element(node_type: str, children: List[dict], rng: random.Random, **extra) -> dict:
+    return {
+        "children": children,
+        "direction": rng.choice(["ltr"] * 9 + [None]),
+        "format": rng.choice(["", "", "", "center"]),
+        "indent": rng.choice([0, 0, 0, 1]),
+        "type": node_type,
+        "version": 1,
+        **extra,
+    }
+
+
+def random_document(rng: random.Random, blocks: int) -> dict:
+    """Random Lexical editor state with `blocks` top-level blocks."""
+    children = []
+    for _ in range(blocks):
+        kind = rng.random()
+        if kind < 0.6:
+            children.append(element("paragraph", random_inline_children(rng), rng))
+        elif kind < 0.75:
+            children.append(element("heading", random_inline_children(rng), rng, tag=rng.choice(["h1", "h2", "h3"])))
+        elif kind < 0.85:
+            children.append(element("quote", random_inline_children(rng), rng))
+        else:
+            list_type = rng.choice(["bullet", "number"])
+            items = [
+                element("listitem", random_inline_children(rng), rng, value=value)
+                for value in range(1, rng.randint(2, 6))
+            ]
+            children.append(element(
+                "list", items, rng, listType=list_type, start=1, tag="ul" if list_type == "bullet" else "ol"
+            ))
+    root = element("root", children, rng)
+    root["direction"] = "ltr"
+    return {"root": root}
+
+
+def merge_runs_reference(node: dict) -> dict:
+    """Independent reference: merge adjacent plain text runs with equal attributes."""
+    node = dict(node)
+    children = node.get("children")
+    if isinstance(children, list):
+        merged: List[dict] = []
+        for child in children:
+            child = merge_runs_reference(child) if isinstance(child, dict) else child
+            previous = merged[-1] if merged else None
+            if (
+                previous is not None
+                and all(n.get("type") == "text" and n.get("mode") == "normal" and n.get("detail") == 0 for n in (previous, child))
+                and {k: v for k, v in previous.items() if k != "text"} == {k: v for k, v in child.items() if k != "text"}
+            ):
+                merged[-1] = {**previous, "text": previous["text"] + child["text"]}
+            else:
+                merged.append(child)
+        node["children"] = merged
+    return node
+
+
+def check_round_trip(document: dict) -> List[str]:
+    """Round-trip properties that must hold for every document."""
+    failures = []
+    original = copy.deepcopy(document)
+    compact = compact_lexical(document)
+    expanded = expand_lexical(compact)
+
+    if document != original:
+        failures.append("compact mutated its input")
+    if expanded != {"root": merge_runs_reference(original["root"])}:
+        failures.append("expand(compact(doc)) differs from doc with merged text runs")
+    if compact_lexical(compact) != compact:
+        failures.append("compact is not idempotent")
+    if compact_lexical(expanded) != compact:
+        failures.append("compact(expand(compact(doc))) differs from compact(doc)")
+    if expand_lexical(original) != original:
+        failures.append("expand changed a verbose document")
+    if extract_plain_text(compact) != extract_plain_text(original):
+        failures.append("plain text differs between compact and verbose forms")
+    return failures
+
+
+def encoded_sizes(documents: List[dict]) -> Dict[str, int]:
+    sizes = {"json_bytes": sum(len(json.dumps(doc, separators=(",", ":")).encode("utf-8")) for doc in documents)}
+    try:
+        import bson
+    except ImportError:
+        return sizes
+    sizes["bson_bytes"] = sum(len(bson.encode({"content_json": doc})) for doc in documents)
+    return sizes
+
+
+def throughput(function, documents: List[dict], repeat: int) -> float:
+    """Documents per second, best of `repeat` passes."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for document in documents:
+            function(document)
+        best = min(best, time.perf_counter() - started)
+    return round(len(documents) / best, 1)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the compact Lexical encoding")
+    parser.add_argument("--docs", type=int, default=300, help="Number of random documents")
+    parser.add_argument("--blocks", type=int, default=40, help="Top-level blocks per document")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--repeat", type=int, default=5, help="Timing passes (best is reported)")
+    parser.add_argument("--out", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    documents = [random_document(rng, rng.randint(1, args.blocks)) for _ in range(args.docs)]
+
+    failures = []
+    for index, document in enumerate(documents):
+        failures.extend(f"doc {index}: {failure}" for failure in check_round_trip(document))
+
+    compact = [compact_lexical(document) for document in documents]
+    verbose_sizes = encoded_sizes(documents)
+    compact_sizes = encoded_sizes(compact)
+    report = {
+        "python": sys.version.split()[0],
+        "documents": len(documents),
+        "verbose": verbose_sizes,
+        "compact": compact_sizes,
+        "size_ratio": {
+            key: round(compact_sizes[key] / verbose_sizes[key], 3) for key in verbose_sizes
+        },
+        "compact_docs_per_second": throughput(compact_lexical, documents, args.repeat),
+        "expand_docs_per_second": throughput(expand_lexical, compact, args.repeat),
+        "round_trip_failures": len(failures),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(output)
+    else:
+        print(output)
+
+    for failure in failures[:20]:
+        print(f"ROUND TRIP {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
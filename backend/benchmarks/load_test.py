@@ -0,0 +1,403 @@
+"""
+Reproducible load test for the Smart Blog Editor API.
+
+Boots the app with uvicorn against a local MongoDB (or in-memory storage)
+and the Gemini emulator, drives realistic scenarios and writes per-endpoint
+throughput and latency percentiles as JSON. Run from the project root:
+
+    python -m backend.benchmarks.load_test --out bench.json
+    python -m backend.benchmarks.load_test --storage memory
+    python -m backend.benchmarks.load_test --baseline bench.json --max-regression 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+import aiohttp
+from pymongo import MongoClient
+
+from ..emulators.gemini import EmulatorConfig, start_gemini_emulator
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+WORDS = (
+    "editor draft publish summary grammar lexical autosave mongo index latency "
+    "throughput request cursor document paragraph heading quote list token"
+).split()
+
+
+def build_lexical_document(rng: random.Random, target_bytes: int) -> dict:
+    """
+    Build a Lexical editor state of roughly the requested serialized size.
+
+    Args:
+        rng: Seeded random generator
+        target_bytes: Approximate JSON size of the document
+
+    Returns:
+        Lexical editor state dict
+    """
+    children = []
+    size = 0
+    while size < target_bytes:
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60)))
+        node = {
+            "children": [{
+                "detail": 0,
+                "format": 0,
+                "mode": "normal",
+                "style": "",
+                "text": text,
+                "type": "text",
+                "version": 1,
+            }],
+            "direction": "ltr",
+            "format": "",
+            "indent": 0,
+            "type": "paragraph",
+            "version": 1,
+        }
+        children.append(node)
+        size += len(json.dumps(node))
+
+    return {
+        "root": {
+            "children": children,
+            "direction": "ltr",
+            "format": "",
+            "indent": 0,
+            "type": "root",
+            "version": 1,
+        }
+    }
+
+
+class Recorder:
+    """Collect latencies per scenario and endpoint."""
+
+    def __init__(self):
+        self.samples: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.durations: Dict[str, float] = {}
+
+    async def call(self, scenario: str, endpoint: str, session: aiohttp.ClientSession,
+                   method: str, url: str, expected_status: int = 200, **kwargs):
+        started = time.perf_counter()
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                body = await response.read()
+                ok = response.status == expected_status
+        except aiohttp.ClientError:
+            body, ok = b"", False
+        self.samples[scenario][endpoint].append(time.perf_counter() - started)
+        if not ok:
+            self.errors[scenario][endpoint] += 1
+        return body if ok else None
+
+    def report(self) -> dict:
+        scenarios = {}
+        for scenario, endpoints in self.samples.items():
+            duration = self.durations.get(scenario, 0.0)
+            scenarios[scenario] = {"duration_seconds": round(duration, 3), "endpoints": {}}
+            for endpoint, latencies in endpoints.items():
+                latencies = sorted(latencies)
+                scenarios[scenario]["endpoints"][endpoint] = {
+                    "count": len(latencies),
+                    "errors": self.errors[scenario][endpoint],
+                    "throughput_rps": round(len(latencies) / duration, 2) if duration else None,
+                    "mean_ms": round(1000 * sum(latencies) / len(latencies), 2),
+                    "p50_ms": percentile(latencies, 50),
+                    "p95_ms": percentile(latencies, 95),
+                    "p99_ms": percentile(latencies, 99),
+                    "max_ms": round(1000 * latencies[-1], 2),
+                }
+        return scenarios
+
+
+def percentile(sorted_latencies: List[float], pct: float) -> float:
+    """Nearest-rank percentile in milliseconds."""
+    rank = max(1, int(round(pct / 100 * len(sorted_latencies))))
+    return round(1000 * sorted_latencies[rank - 1], 2)
+
+
+async def run_workers(count: int, worker):
+    """Run `worker(i)` for i in range(count) concurrently."""
+    await asyncio.gather(*(worker(i) for i in range(count)))
+
+
+async def scenario_login_burst(base_url, session, recorder, users, args):
+    """Concurrent logins, dominated by bcrypt verification."""
+    async def worker(i):
+        for _ in range(args.logins_per_user):
+            email, password, _ = users[i]
+            await recorder.call(
+                "login_burst", "POST /api/auth/login", session, "POST",
+                f"{base_url}/api/auth/login", json={"email": email, "password": password},
+            )
+
+    await run_workers(len(users), worker)
+
+
+async def scenario_autosave(base_url, session, recorder, users, args, rng):
+    """Each editor repeatedly PATCHes a large Lexical document, like debounced autosave."""
+    documents = [build_lexical_document(rng, args.doc_kb * 1024) for _ in range(4)]
+
+    async def worker(i):
+        _, _, token = users[i]
+        headers = {"Authorization": f"Bearer {token}"}
+        body = await recorder.call(
+            "autosave", "POST /api/posts/", session, "POST", f"{base_url}/api/posts/",
+            expected_status=201, json={"title": f"Bench {i}"}, headers=headers,
+        )
+        if body is None:
+            return
+        post_id = json.loads(body)["id"]
+        for save in range(args.saves_per_editor):
+            await recorder.call(
+                "autosave", "PATCH /api/posts/{post_id}", session, "PATCH",
+                f"{base_url}/api/posts/{post_id}",
+                json={"content_json": documents[(i + save) % len(documents)]}, headers=headers,
+            )
+            if args.think_time:
+                await asyncio.sleep(args.think_time)
+
+    await run_workers(len(users), worker)
+
+
+async def scenario_dashboard(base_url, session, recorder, users, args):
+    """Dashboard loads listing every post of the user."""
+    async def worker(i):
+        _, _, token = users[i]
+        headers = {"Authorization": f"Bearer {token}"}
+        for _ in range(args.dashboard_loads_per_user):
+            await recorder.call(
+                "dashboard", "GET /api/posts/", session, "GET", f"{base_url}/api/posts/", headers=headers,
+            )
+
+    await run_workers(len(users), worker)
+
+
+async def scenario_ai_burst(base_url, session, recorder, users, args, rng):
+    """Concurrent AI summary/grammar requests against the Gemini emulator."""
+    # Generate inputs up front so they do not depend on task scheduling order
+    contents = [
+        [" ".join(rng.choice(WORDS) for _ in range(400)) for _ in range(args.ai_requests_per_user)]
+        for _ in users
+    ]
+
+    async def worker(i):
+        _, _, token = users[i]
+        headers = {"Authorization": f"Bearer {token}"}
+        for request_number, content in enumerate(contents[i]):
+            await recorder.call(
+                "ai_burst", "POST /api/ai/generate", session, "POST", f"{base_url}/api/ai/generate",
+                json={"content": content, "type": "summary" if request_number % 2 else "grammar"},
+                headers=headers,
+            )
+
+    await run_workers(len(users), worker)
+
+
+async def prepare_users(base_url, session, count, run_id):
+    """Register and log in benchmark users; returns (email, password, token) tuples."""
+    async def setup(i):
+        email = f"bench-{run_id}-{i}@example.com"
+        password = "benchmark-password"
+        async with session.post(f"{base_url}/api/auth/register", json={"email": email, "password": password}) as r:
+            r.raise_for_status()
+        async with session.post(f"{base_url}/api/auth/login", json={"email": email, "password": password}) as r:
+            r.raise_for_status()
+            token = (await r.json())["access_token"]
+        return email, password, token
+
+    return await asyncio.gather(*(setup(i) for i in range(count)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_healthy(base_url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f"{base_url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server at {base_url} did not become healthy within {timeout}s")
+
+
+def compare_to_baseline(current: dict, baseline: dict, max_regression: float) -> List[str]:
+    """
+    Compare p95 latency and throughput against a baseline report.
+
+    Returns:
+        Human-readable regression messages (empty if within budget)
+    """
+    regressions = []
+    for scenario, data in current["scenarios"].items():
+        for endpoint, stats in data["endpoints"].items():
+            base = baseline.get("scenarios", {}).get(scenario, {}).get("endpoints", {}).get(endpoint)
+            if not base:
+                continue
+            if base["p95_ms"] and stats["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+                regressions.append(
+                    f"{scenario} {endpoint}: p95 {base['p95_ms']}ms -> {stats['p95_ms']}ms"
+                )
+            if base.get("throughput_rps") and stats.get("throughput_rps") is not None \
+                    and stats["throughput_rps"] < base["throughput_rps"] * (1 - max_regression):
+                regressions.append(
+                    f"{scenario} {endpoint}: throughput {base['throughput_rps']} -> {stats['throughput_rps']} rps"
+                )
+    return regressions
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    run_id = f"{int(time.time())}-{os.getpid()}"
+    database_name = f"{args.database_prefix}_{run_id.replace('-', '_')}"
+
+    emulator, gemini_runner, gemini_base_url = await start_gemini_emulator(EmulatorConfig(
+        latency=args.gemini_latency,
+        error_429_rate=args.gemini_error_429,
+        error_5xx_rate=args.gemini_error_5xx,
+        seed=args.seed,
+    ))
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(
+        os.environ,
+        STORAGE_BACKEND=args.storage,
+        MONGO_URI=args.mongo_uri,
+        DATABASE_NAME=database_name,
+        JWT_SECRET="benchmark-secret-key-not-for-production-use-0123456789",
+        GEMINI_API_KEY="benchmark",
+        GEMINI_API_BASE_URL=gemini_base_url,
+        LOG_LEVEL="WARNING",
+        # Scenarios deliberately exceed per-client budgets; measure the app, not the limiter
+        RATE_LIMIT_ENABLED="False",
+        PYTHONPATH=str(PROJECT_ROOT),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        cwd=PROJECT_ROOT, env=env,
+    )
+
+    recorder = Recorder()
+    try:
+        await wait_until_healthy(base_url, args.startup_timeout)
+
+        connector = aiohttp.TCPConnector(limit=args.editors * 2)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            users = await prepare_users(base_url, session, args.editors, run_id)
+
+            scenarios = [
+                ("login_burst", lambda: scenario_login_burst(base_url, session, recorder, users, args)),
+                ("autosave", lambda: scenario_autosave(base_url, session, recorder, users, args, rng)),
+                ("dashboard", lambda: scenario_dashboard(base_url, session, recorder, users, args)),
+                ("ai_burst", lambda: scenario_ai_burst(base_url, session, recorder, users, args, rng)),
+            ]
+            for name, scenario in scenarios:
+                if args.scenarios and name not in args.scenarios:
+                    continue
+                started = time.perf_counter()
+                await scenario()
+                recorder.durations[name] = time.perf_counter() - started
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        await gemini_runner.cleanup()
+        if args.storage == "mongo" and not args.keep_database:
+            MongoClient(args.mongo_uri).drop_database(database_name)
+
+    return {
+        "meta": {
+            "seed": args.seed,
+            "storage": args.storage,
+            "editors": args.editors,
+            "doc_kb": args.doc_kb,
+            "gemini_latency": args.gemini_latency,
+            "gemini_error_429": args.gemini_error_429,
+            "gemini_error_5xx": args.gemini_error_5xx,
+            "gemini_stats": dict(emulator.stats),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "scenarios": recorder.report(),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Smart Blog Editor API")
+    parser.add_argument("--storage", choices=["mongo", "memory"], default="mongo",
+                        help="Storage backend of the server under test")
+    parser.add_argument("--mongo-uri", default=os.environ.get("BENCH_MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--database-prefix", default="smart_blog_editor_bench")
+    parser.add_argument("--keep-database", action="store_true", help="Do not drop the benchmark database")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--editors", type=int, default=20, help="Concurrent simulated users")
+    parser.add_argument("--doc-kb", type=int, default=64, help="Approximate autosaved document size")
+    parser.add_argument("--saves-per-editor", type=int, default=20)
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds between saves per editor")
+    parser.add_argument("--logins-per-user", type=int, default=3)
+    parser.add_argument("--dashboard-loads-per-user", type=int, default=10)
+    parser.add_argument("--ai-requests-per-user", type=int, default=3)
+    parser.add_argument("--gemini-latency", default="fixed:0.2",
+                        help="Emulator latency distribution (fixed:S | uniform:A,B | normal:M,SD | lognormal:MU,SIGMA)")
+    parser.add_argument("--gemini-error-429", type=float, default=0.0, help="Fraction of emulated 429 responses")
+    parser.add_argument("--gemini-error-5xx", type=float, default=0.0, help="Fraction of emulated 5xx responses")
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    parser.add_argument("--scenarios", nargs="*", help="Subset of scenarios to run")
+    parser.add_argument("--out", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Baseline JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15,
+                        help="Allowed relative p95/throughput regression before failing")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare_to_baseline(report, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
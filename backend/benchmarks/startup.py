@@ -0,0 +1,163 @@
+"""
+Cold-start benchmark for the Smart Blog Editor API.
+
+Measures the import cost of `backend.main` with `python -X importtime`
+(broken down by top-level package) and the time from process spawn to the
+first healthy `/health` response, then checks both against a budget.
+Run from the project root (the time-to-healthy check needs MongoDB):
+
+    python -m backend.benchmarks.startup --out startup.json
+    python -m backend.benchmarks.startup --skip-server   # import time only
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_BUDGET = Path(__file__).resolve().parent / "startup_budget.json"
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+
+def app_environment(**overrides) -> Dict[str, str]:
+    """Environment with the settings the app requires to import."""
+    env = dict(os.environ)
+    env.setdefault("JWT_SECRET", "startup-benchmark-secret-key-not-for-production")
+    env.setdefault("GEMINI_API_KEY", "startup-benchmark")
+    env["PYTHONPATH"] = str(PROJECT_ROOT)
+    env.update(overrides)
+    return env
+
+
+def measure_imports(top: int) -> dict:
+    """
+    Import backend.main in a fresh interpreter under -X importtime.
+
+    Returns:
+        Total import time and the slowest top-level packages (summed self time, ms)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        cwd=PROJECT_ROOT, env=app_environment(), capture_output=True, text=True, check=True,
+    )
+
+    total_us = 0
+    by_package: Dict[str, int] = defaultdict(int)
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative, module = match.groups()
+        # Self times attribute every module exactly once to its top-level package
+        by_package[module.split(".")[0]] += int(self_us)
+        if module == "backend.main":
+            total_us = int(cumulative)
+
+    slowest = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "import_ms": round(total_us / 1000, 1),
+        "top_packages_ms": {package: round(us / 1000, 1) for package, us in slowest},
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_healthy(mongo_uri: str, timeout: float) -> float:
+    """
+    Spawn uvicorn and time until `/health` first answers 200.
+
+    Returns:
+        Milliseconds from spawn to the first healthy response
+    """
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT, env=app_environment(MONGO_URI=mongo_uri, LOG_LEVEL="WARNING"),
+    )
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return round((time.perf_counter() - started) * 1000, 1)
+            except (urllib.error.URLError, ConnectionError, OSError):
+                pass
+            time.sleep(0.02)
+        raise RuntimeError(f"Server did not become healthy within {timeout}s")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def check_budget(report: dict, budget: dict) -> List[str]:
+    """Return messages for every measurement over budget."""
+    failures = []
+    for key, limit in budget.items():
+        value = report.get(key)
+        if value is not None and value > limit:
+            failures.append(f"{key}: {value}ms exceeds budget of {limit}ms")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure API cold-start time")
+    parser.add_argument("--mongo-uri", default=os.environ.get("BENCH_MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median is reported)")
+    parser.add_argument("--top", type=int, default=15, help="Slowest packages to list")
+    parser.add_argument("--skip-server", action="store_true", help="Only measure import time")
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    parser.add_argument("--budget", default=str(DEFAULT_BUDGET), help="JSON file with millisecond budgets")
+    parser.add_argument("--out", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    runs = [measure_imports(args.top) for _ in range(args.repeat)]
+    median_run = sorted(runs, key=lambda run: run["import_ms"])[len(runs) // 2]
+    report = {
+        "python": sys.version.split()[0],
+        "import_ms": median_run["import_ms"],
+        "import_ms_runs": [run["import_ms"] for run in runs],
+        "top_packages_ms": median_run["top_packages_ms"],
+    }
+
+    if not args.skip_server:
+        healthy = [measure_first_healthy(args.mongo_uri, args.startup_timeout) for _ in range(args.repeat)]
+        report["first_healthy_ms"] = statistics.median(healthy)
+        report["first_healthy_ms_runs"] = healthy
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(output)
+    else:
+        print(output)
+
+    failures = check_budget(report, json.loads(Path(args.budget).read_text()))
+    for failure in failures:
+        print(f"OVER BUDGET {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Shared cache package."""
@@ -0,0 +1,47 @@
+"""
+Cache backend interface shared by the memory and Redis implementations.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class CacheBackend(ABC):
+    """
+    Key-value cache with TTLs and invalidation by key.
+
+    Values must be BSON/JSON-serializable (dicts, lists, strings, numbers,
+    datetimes and ObjectIds) so every backend can store them. Cached values
+    are shared between callers and must not be mutated.
+    """
+
+    name = "cache"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float):
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to store (must not be None)
+            ttl: Time to live in seconds
+        """
+
+    @abstractmethod
+    async def delete(self, *keys: str):
+        """Remove keys."""
+
+    async def close(self):
+        """Release connections and background tasks."""
@@ -0,0 +1,55 @@
+"""
+Cache keys and invalidation helpers for users and posts.
+"""
+import secrets
+from typing import Optional
+from ..core.config import settings
+from .provider import get_cache
+
+
+def user_key(email: str) -> str:
+    """Key of a user record looked up by email."""
+    return f"user:{email}"
+
+
+def user_posts_generation_key(user_id) -> str:
+    """Key of the current generation of a user's cached post list."""
+    return f"posts:user:{user_id}:generation"
+
+
+def user_posts_key(user_id, generation: str) -> str:
+    """Key of one generation of a user's post list."""
+    return f"posts:user:{user_id}:{generation}"
+
+
+async def user_posts_generation(user_id) -> str:
+    """
+    Current generation of a user's post list, starting a new one if there is none.
+    
+    Read it before loading the list from storage: a write that lands while
+    the list is being loaded drops the generation, so the stale list is
+    stored under a key nobody reads again instead of being served.
+    
+    Args:
+        user_id: Owner of the posts
+    
+    Returns:
+        Generation token to build user_posts_key() with
+    """
+    cache = get_cache()
+    key = user_posts_generation_key(user_id)
+    generation: Optional[str] = await cache.get(key)
+    if generation is None:
+        generation = secrets.token_hex(8)
+        await cache.set(key, generation, settings.CACHE_POST_TTL_SECONDS)
+    return generation
+
+
+async def invalidate_user_posts(user_id):
+    """
+    Drop a user's cached post list; call after the write has reached storage.
+    
+    Args:
+        user_id: Owner of the changed posts
+    """
+    await get_cache().delete(user_posts_generation_key(user_id))
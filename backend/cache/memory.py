@@ -0,0 +1,45 @@
+"""
+In-process cache backend: bounded LRU with per-entry expiry.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from .base import CacheBackend
+
+
+class MemoryCache(CacheBackend):
+    """LRU cache limited to `max_entries`; expired entries are dropped lazily."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # key -> (expires_at, value)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def _remove(self, key: str):
+        self._entries.pop(key, None)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, value)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._remove(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,65 @@
+"""
+Process-wide cache instance selected by CACHE_BACKEND.
+"""
+import logging
+from typing import Optional
+from ..core.config import settings
+from .base import CacheBackend
+from .memory import MemoryCache
+
+
+logger = logging.getLogger(__name__)
+
+_cache: Optional[CacheBackend] = None
+
+
+async def open_cache():
+    """
+    Create the configured cache backend.
+    Should be called on application startup.
+    """
+    global _cache
+    if _cache is not None:
+        return
+
+    if settings.CACHE_BACKEND == "redis":
+        from .redis_backend import RedisCache
+
+        cache = RedisCache(
+            settings.CACHE_REDIS_URL,
+            prefix=settings.CACHE_KEY_PREFIX,
+            channel=f"{settings.CACHE_KEY_PREFIX}invalidate",
+            local_max_entries=settings.CACHE_MAX_ENTRIES,
+            local_ttl=settings.CACHE_LOCAL_TTL_SECONDS
+        )
+        await cache.start()
+        _cache = cache
+    else:
+        _cache = MemoryCache(settings.CACHE_MAX_ENTRIES)
+
+    logger.info("Cache ready", extra={"backend": _cache.name})
+
+
+async def close_cache():
+    """
+    Close the cache backend.
+    Should be called on application shutdown.
+    """
+    global _cache
+    if _cache is not None:
+        await _cache.close()
+        _cache = None
+
+
+def get_cache() -> CacheBackend:
+    """
+    Get the shared cache.
+
+    Returns:
+        The configured CacheBackend; an in-process cache if open_cache() has
+        not run (scripts and tools importing the routes directly)
+    """
+    global _cache
+    if _cache is None:
+        _cache = MemoryCache(settings.CACHE_MAX_ENTRIES)
+    return _cache
@@ -0,0 +1,123 @@
+"""
+Networked cache backend on Redis with a short-lived local tier.
+
+Entries live in Redis so every instance shares them; each instance also keeps
+a small in-process copy for hot keys. Invalidations are applied in Redis and
+broadcast over pub/sub so peers drop their local copies immediately; the
+local TTL bounds staleness if a broadcast is ever missed.
+"""
+import asyncio
+import json
+import logging
+import secrets
+from typing import Any, Optional
+from bson import json_util
+from .base import CacheBackend
+from .memory import MemoryCache
+
+
+logger = logging.getLogger(__name__)
+
+# Naive UTC datetimes round-trip the same way Motor returns them
+JSON_OPTIONS = json_util.JSONOptions(json_mode=json_util.JSONMode.RELAXED, tz_aware=False)
+
+# Delay before re-subscribing after the pub/sub connection drops
+RESUBSCRIBE_DELAY_SECONDS = 1.0
+
+
+class RedisCache(CacheBackend):
+    """Redis-backed cache with pub/sub invalidation of per-instance local copies."""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str, channel: str, local_max_entries: int, local_ttl: float):
+        # Imported lazily so the memory backend works without the redis package
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self.prefix = prefix
+        self.channel = channel
+        self.local = MemoryCache(local_max_entries)
+        self.local_ttl = local_ttl
+        self.instance_id = secrets.token_hex(8)
+        self._listener: Optional[asyncio.Task] = None
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    async def start(self):
+        """Verify the connection and start listening for invalidation broadcasts."""
+        await self._redis.ping()
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                # Broadcasts may have been missed while disconnected
+                self.local = MemoryCache(self.local.max_entries)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    payload = json.loads(message["data"])
+                    if payload.get("origin") == self.instance_id:
+                        continue
+                    await self.local.delete(*payload.get("keys", ()))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Cache invalidation subscription lost", extra={"error": f"{type(e).__name__}: {e}"})
+                await asyncio.sleep(RESUBSCRIBE_DELAY_SECONDS)
+
+    async def _publish(self, keys=()):
+        payload = json.dumps({"origin": self.instance_id, "keys": list(keys)})
+        await self._redis.publish(self.channel, payload)
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.local.get(key)
+        if value is not None:
+            return value
+
+        try:
+            raw = await self._redis.get(self._key(key))
+        except Exception as e:
+            # Fail open: a cache outage degrades to database reads
+            logger.warning("Cache read failed", extra={"error": f"{type(e).__name__}: {e}"})
+            return None
+        if raw is None:
+            return None
+
+        envelope = json_util.loads(raw, json_options=JSON_OPTIONS)
+        await self.local.set(key, envelope["v"], self.local_ttl)
+        return envelope["v"]
+
+    async def set(self, key: str, value: Any, ttl: float):
+        raw = json_util.dumps({"v": value}, json_options=JSON_OPTIONS)
+        try:
+            await self._redis.set(self._key(key), raw, ex=max(1, int(ttl)))
+        except Exception as e:
+            logger.warning("Cache write failed", extra={"error": f"{type(e).__name__}: {e}"})
+            return
+        await self.local.set(key, value, min(ttl, self.local_ttl))
+
+    async def delete(self, *keys: str):
+        if not keys:
+            return
+        await self.local.delete(*keys)
+        try:
+            await self._redis.delete(*(self._key(key) for key in keys))
+            await self._publish(keys=keys)
+        except Exception as e:
+            logger.warning("Cache delete failed", extra={"error": f"{type(e).__name__}: {e}"})
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self._redis.aclose()
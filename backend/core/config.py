@@ -2,7 +2,7 @@
 Configuration module for loading environment variables and application settings.
 """
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Optional, Literal, Dict, List
 from pathlib import Path
 
 # Get the backend directory path
@@ -13,23 +13,176 @@ ENV_FILE = BACKEND_DIR / ".env"
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
     
+    # Storage for users and posts ("mongo", or "memory" for tests, benchmarks and
+    # single-node deployments without durability; the AI job queue needs MongoDB)
+    STORAGE_BACKEND: Literal["mongo", "memory"] = "mongo"
+    
     # MongoDB
     MONGO_URI: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "smart_blog_editor"
+    # Per-worker pool bounds (backend/serve.py derives the max from MONGO_TOTAL_POOL_SIZE)
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_TOTAL_POOL_SIZE: Optional[int] = None
+    MONGO_MAX_CONNECTING: int = 2
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = 300000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    MONGO_SOCKET_TIMEOUT_MS: Optional[int] = 30000
+    # Comma-separated wire compressors in preference order, e.g. "zstd,snappy,zlib"
+    MONGO_COMPRESSORS: str = ""
+    # Read preference for list/export reads; writes and read-after-write lookups stay on the primary
+    MONGO_READ_PREFERENCE: Literal["primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"] = "primary"
+    MONGO_MAX_STALENESS_SECONDS: Optional[int] = None
     
     # JWT
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Refresh tokens rotate on every use; a session ends after this long without a refresh
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    
+    # Post retention (soft-deleted posts are purged after this period)
+    POST_RETENTION_DAYS: int = 30
+    POST_PURGE_INTERVAL_SECONDS: int = 3600
+    POST_PURGE_BATCH_SIZE: int = 500
+    POST_PURGE_BATCH_DELAY_SECONDS: float = 0.5
+    
+    # Post export/import streaming
+    POST_EXPORT_BATCH_SIZE: int = 200
+    POST_IMPORT_BATCH_SIZE: int = 200
+    POST_IMPORT_MAX_LINE_BYTES: int = 5 * 1024 * 1024
+    
+    # Per-user post stats (kept incrementally, reconciled against the posts collection)
+    POST_STATS_RECONCILE_INTERVAL_SECONDS: int = 6 * 3600
+    POST_STATS_BATCH_SIZE: int = 500
+    
+    # Related posts (TF-IDF) and near-duplicate detection (MinHash/LSH), indexed per user in memory
+    SIMILARITY_MAX_CANDIDATES: int = 200
+    SIMILARITY_QUERY_TERMS: int = 16
+    SIMILARITY_MINHASH_PERMUTATIONS: int = 64
+    SIMILARITY_LSH_BANDS: int = 16
+    SIMILARITY_DUPLICATE_THRESHOLD: float = 0.8
+    SIMILARITY_INDEX_TTL_SECONDS: int = 600
+    SIMILARITY_MAX_INDEXED_USERS: int = 1000
+    
+    # Store content_json in the compact Lexical encoding (reads accept both forms)
+    LEXICAL_COMPACT_STORAGE: bool = True
     
     # Google Gemini AI
     GEMINI_API_KEY: str
+    GEMINI_API_BASE_URL: str = "https://generativelanguage.googleapis.com/v1beta"
+    GEMINI_MAX_CONNECTIONS: int = 100
+    GEMINI_TIMEOUT_SECONDS: float = 60.0
+    GEMINI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    GEMINI_CIRCUIT_RESET_SECONDS: float = 30.0
+    
+    # Input budgeting before Gemini calls (token counts are local estimates)
+    AI_MAX_INPUT_TOKENS: int = 8000
+    AI_MAX_TOTAL_INPUT_TOKENS: int = 100000
+    AI_INPUT_OVERFLOW: Literal["reject", "truncate", "chunk"] = "chunk"
+    AI_CHUNK_TOKENS: int = 4000
+    AI_CHUNK_CONCURRENCY: int = 4
+    
+    # AI job queue (worker pool per process)
+    AI_JOB_WORKERS: int = 4
+    AI_JOB_MAX_ATTEMPTS: int = 3
+    AI_JOB_RETRY_BASE_SECONDS: float = 2.0
+    AI_JOB_LEASE_SECONDS: int = 120
+    AI_JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    AI_JOB_MAX_WAIT_SECONDS: float = 30.0
+    AI_JOB_RESULT_TTL_SECONDS: int = 86400
+    
+    # Batch summarization: posts packed per Gemini call and packs in flight
+    AI_BATCH_PACK_MAX_POSTS: int = 8
+    AI_BATCH_PACK_MAX_INPUT_TOKENS: int = 6000
+    AI_BATCH_CONCURRENCY: int = 4
     
     # Application
     APP_NAME: str = "Smart Blog Editor API"
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = False
     
+    # Production server (backend/serve.py)
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WEB_CONCURRENCY: Optional[int] = None
+    GRACEFUL_SHUTDOWN_SECONDS: int = 25
+    # Comma-separated proxy addresses whose X-Forwarded-For is trusted ("*" trusts any peer)
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    # Set by serve.py for its workers; per-process limits are divided by it
+    SERVER_WORKERS: int = 1
+    
+    # Readiness checks (run in the background, probes only read the cached result)
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 2.0
+    HEALTH_MONGO_TIMEOUT_SECONDS: float = 1.0
+    HEALTH_POOL_SATURATION_THRESHOLD: float = 0.95
+    HEALTH_MAX_EVENT_LOOP_LAG_MS: float = 500.0
+    
+    # Shared cache ("memory" per process, "redis" shared across instances)
+    CACHE_BACKEND: Literal["memory", "redis"] = "memory"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_KEY_PREFIX: str = "sbe:"
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_LOCAL_TTL_SECONDS: float = 5.0
+    CACHE_USER_TTL_SECONDS: int = 60
+    CACHE_POST_TTL_SECONDS: int = 300
+    CACHE_AI_TTL_SECONDS: int = 3600
+    
+    # Rate limiting: token buckets per route group (rates in requests/second)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: Literal["memory", "redis"] = "memory"
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMITS: Dict[str, Dict[str, float]] = {
+        "auth": {"ip_rate": 0.2, "ip_burst": 10},
+        "autosave": {"user_rate": 2.0, "user_burst": 20, "ip_rate": 10.0, "ip_burst": 100},
+        "ai": {"user_rate": 0.2, "user_burst": 5, "ip_rate": 1.0, "ip_burst": 20},
+        "default": {"user_rate": 20.0, "user_burst": 100, "ip_rate": 50.0, "ip_burst": 200},
+    }
+    
+    # Adaptive concurrency limits per route class and process (requests over the limit get 503).
+    # Priority 0 is shed last; queue_timeout is how long a request may wait for a free slot
+    CONCURRENCY_LIMIT_ENABLED: bool = True
+    CONCURRENCY_WINDOW_SECONDS: float = 1.0
+    CONCURRENCY_WINDOW_MIN_SAMPLES: int = 10
+    # Share of its limit a class keeps while a more important class is congested
+    CONCURRENCY_DEGRADED_SHARE: float = 0.5
+    CONCURRENCY_LIMITS: Dict[str, Dict[str, float]] = {
+        "autosave": {"initial": 50, "min": 5, "max": 500, "priority": 0, "queue_timeout": 0.25},
+        "read": {"initial": 50, "min": 5, "max": 500, "priority": 0, "queue_timeout": 0.25},
+        "default": {"initial": 20, "min": 2, "max": 200, "priority": 1, "queue_timeout": 0.1},
+        "ai": {"initial": 10, "min": 1, "max": 100, "priority": 2, "queue_timeout": 0},
+        "registration": {"initial": 5, "min": 1, "max": 50, "priority": 2, "queue_timeout": 0},
+    }
+    
+    # Collaborative editing (WebSocket sessions per post)
+    COLLAB_SNAPSHOT_INTERVAL_SECONDS: float = 5.0
+    COLLAB_MAX_SESSIONS_PER_POST: int = 20
+    COLLAB_MAX_MESSAGE_BYTES: int = 256 * 1024
+    COLLAB_SEND_QUEUE_SIZE: int = 256
+    # One instance owns each post's room; the lease is renewed every snapshot interval
+    COLLAB_LEASE_SECONDS: float = 30.0
+    
+    # Observability
+    LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATES: Dict[str, float] = {"DEBUG": 0.1, "INFO": 1.0}
+    METRICS_ENABLED: bool = True
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 0.1
+    TRACING_EXPORTER: Literal["console", "file"] = "file"
+    TRACING_FILE_PATH: str = str(BACKEND_DIR / "traces.ndjson")
+    
+    # Admin / on-demand profiling (admin endpoints are disabled while ADMIN_TOKEN is unset)
+    ADMIN_TOKEN: Optional[str] = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_PATH_PREFIXES: List[str] = []
+    PROFILING_INTERVAL_SECONDS: float = 0.001
+    PROFILING_MAX_CONCURRENT: int = 2
+    PROFILING_MAX_STORED: int = 50
+    
     class Config:
         env_file = str(ENV_FILE)
         case_sensitive = True
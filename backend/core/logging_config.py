@@ -0,0 +1,143 @@
+"""
+Structured JSON logging with a non-blocking queue handler.
+
+Records are filtered (sampling, redaction) and queued on the calling thread;
+formatting and stream I/O happen on a background listener thread so logging
+never blocks a request coroutine.
+"""
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from .config import settings
+
+
+# Correlation id of the request currently being handled
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Fields carrying user content; only their length is ever logged
+REDACTED_FIELDS = {"prompt", "content", "response", "response_text", "text"}
+
+# Attributes present on every LogRecord; anything else came from `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "request_id"}
+
+_listener: Optional[QueueListener] = None
+
+
+def new_request_id() -> str:
+    """Generate a new correlation id."""
+    return uuid.uuid4().hex
+
+
+class JsonFormatter(logging.Formatter):
+    """Render a log record as a single JSON line."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a configured fraction of records per level; warnings and above always pass."""
+    
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = {logging.getLevelName(level.upper()): rate for level, rate in rates.items()}
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class RedactionFilter(logging.Filter):
+    """Replace prompt/response bodies passed via `extra=` with their length."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        for field in REDACTED_FIELDS:
+            value = record.__dict__.get(field)
+            if value is not None:
+                record.__dict__[field] = f"[REDACTED {len(str(value))} chars]"
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+    
+    dropped = 0
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Capture request context and render the message while still on the caller's task
+        record.request_id = request_id_var.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging():
+    """
+    Route the application's loggers through the background JSON writer.
+    Should be called first on application startup.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+    queue_handler.addFilter(RedactionFilter())
+    
+    app_logger = logging.getLogger("backend")
+    app_logger.setLevel(settings.LOG_LEVEL)
+    app_logger.handlers = [queue_handler]
+    app_logger.propagate = False
+    
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """
+    Flush queued records and stop the background writer.
+    Should be called last on application shutdown.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,204 @@
+"""
+Prometheus metrics for request, MongoDB, Gemini, cache and collaboration instrumentation.
+"""
+from typing import Dict, Tuple
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from pymongo import monitoring
+
+
+# HTTP
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+)
+
+# MongoDB
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency as reported by the driver",
+    ["command", "collection", "outcome"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+MONGO_POOL_CONNECTIONS = Gauge(
+    "mongo_pool_connections",
+    "MongoDB pool connections by state (open, checked_out, waiting)",
+    ["server", "state"],
+)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    "mongo_pool_checkout_failures_total",
+    "Failed connection checkouts (e.g. wait-queue timeouts)",
+    ["server", "reason"],
+)
+
+# Gemini
+GEMINI_REQUEST_DURATION = Histogram(
+    "gemini_request_duration_seconds",
+    "Gemini API call latency",
+    ["model", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 21.0, 34.0, 60.0),
+)
+GEMINI_ERRORS = Counter(
+    "gemini_errors_total",
+    "Failed Gemini API calls by reason",
+    ["model", "reason"],
+)
+GEMINI_TOKENS = Counter(
+    "gemini_tokens_total",
+    "Tokens reported by Gemini usage metadata",
+    ["model", "kind"],
+)
+GEMINI_TOKEN_ESTIMATE_RATIO = Histogram(
+    "gemini_token_estimate_ratio",
+    "Actual prompt tokens divided by the calibrated local estimate",
+    buckets=(0.5, 0.7, 0.8, 0.9, 0.95, 1.0, 1.05, 1.1, 1.2, 1.3, 1.5, 2.0),
+)
+GEMINI_TOKEN_CALIBRATION = Gauge(
+    "gemini_token_calibration_factor",
+    "Correction factor applied to local token estimates",
+)
+AI_INPUT_PLANS = Counter(
+    "ai_input_plans_total",
+    "AI inputs by budgeting decision (single, chunked, truncated, rejected)",
+    ["mode"],
+)
+
+# Authentication
+AUTH_REFRESHES = Counter(
+    "auth_refreshes_total",
+    "Refresh token exchanges by outcome",
+    ["outcome"],
+)
+
+# Caches
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Cache lookups by cache name and result (hit ratio = hit / (hit + miss))",
+    ["cache", "result"],
+)
+
+# Rate limiting
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected with 429 by route group and bucket scope (user or ip)",
+    ["group", "scope"],
+)
+
+# Load shedding
+CONCURRENCY_LIMIT = Gauge(
+    "concurrency_limit",
+    "Current adaptive concurrency limit by route class",
+    ["route_class"],
+)
+CONCURRENCY_IN_FLIGHT = Gauge(
+    "concurrency_in_flight",
+    "Requests holding a concurrency slot by route class",
+    ["route_class"],
+)
+LOAD_SHED_REJECTIONS = Counter(
+    "load_shed_rejections_total",
+    "Requests rejected with 503 by the adaptive concurrency limiter",
+    ["route_class"],
+)
+
+# Collaborative editing
+COLLAB_SESSIONS = Gauge(
+    "collab_sessions",
+    "Open collaborative editing WebSocket sessions",
+)
+COLLAB_OPS = Counter(
+    "collab_ops_total",
+    "Collaborative editing operations applied by kind",
+    ["kind"],
+)
+COLLAB_SNAPSHOTS = Counter(
+    "collab_snapshots_total",
+    "Collaborative document snapshots written to MongoDB",
+    ["outcome"],
+)
+
+# Post statistics
+POST_STATS_CORRECTIONS = Counter(
+    "post_stats_corrections_total",
+    "Per-user post stats corrected or created by reconciliation",
+)
+
+# Related posts
+SIMILARITY_INDEX_BUILD_DURATION = Histogram(
+    "similarity_index_build_seconds",
+    "Time to build a user's related-post index from storage",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    """
+    Record a cache lookup outcome.
+    
+    Args:
+        cache: Name of the cache
+        hit: Whether the lookup was a hit
+    """
+    CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_gemini_usage(model: str, usage: dict):
+    """
+    Record token counts from a Gemini `usageMetadata` block.
+    
+    Args:
+        model: Gemini model name
+        usage: The `usageMetadata` dict from the response (may be empty)
+    """
+    for kind, key in (
+        ("prompt", "promptTokenCount"),
+        ("candidates", "candidatesTokenCount"),
+        ("total", "totalTokenCount"),
+    ):
+        count = usage.get(key)
+        if isinstance(count, int) and count > 0:
+            GEMINI_TOKENS.labels(model=model, kind=kind).inc(count)
+
+
+class MongoCommandMetricsListener(monitoring.CommandListener):
+    """pymongo command listener recording command latency per collection."""
+    
+    def __init__(self):
+        self._collections: Dict[Tuple, str] = {}
+    
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(event.command_name)
+        self._collections[(event.connection_id, event.request_id)] = (
+            collection if isinstance(collection, str) else ""
+        )
+    
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._record(event, "success")
+    
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._record(event, "failure")
+    
+    def _record(self, event, outcome: str):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_DURATION.labels(
+            command=event.command_name,
+            collection=collection,
+            outcome=outcome,
+        ).observe(event.duration_micros / 1_000_000)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text exposition format.
+    
+    Returns:
+        Tuple of (payload, content type)
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,48 @@
+"""
+In-memory store for per-request profiles.
+"""
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional, Tuple
+from .config import settings
+
+
+class ProfileStore:
+    """Keep the most recent profiles, evicting the oldest beyond the limit."""
+    
+    def __init__(self, max_profiles: int):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, Tuple[dict, str]]" = OrderedDict()
+    
+    @staticmethod
+    def new_id() -> str:
+        """Generate a profile ID."""
+        return uuid.uuid4().hex
+    
+    def add(self, profile_id: str, metadata: dict, speedscope_json: str):
+        """
+        Store a rendered profile.
+        
+        Args:
+            profile_id: ID returned to the client in the X-Profile-Id header
+            metadata: Request information (method, path, status, duration)
+            speedscope_json: Profile in speedscope (flamegraph) JSON format
+        """
+        metadata = {"id": profile_id, "captured_at": datetime.utcnow().isoformat(), **metadata}
+        self._profiles[profile_id] = (metadata, speedscope_json)
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+    
+    def list(self) -> List[dict]:
+        """Return metadata of stored profiles, newest first."""
+        return [metadata for metadata, _ in reversed(self._profiles.values())]
+    
+    def get(self, profile_id: str) -> Optional[str]:
+        """Return the speedscope JSON of a profile, if still stored."""
+        entry = self._profiles.get(profile_id)
+        return entry[1] if entry else None
+
+
+# Global profile store
+profile_store = ProfileStore(settings.PROFILING_MAX_STORED)
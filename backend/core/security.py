@@ -1,6 +1,8 @@
 """
 Security utilities for password hashing and JWT token management.
 """
+import hashlib
+import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -78,3 +80,29 @@ def verify_token(token: str) -> Optional[dict]:
         return payload
     except JWTError:
         return None
+
+
+def generate_refresh_token() -> str:
+    """
+    Create an opaque refresh token.
+    
+    Returns:
+        URL-safe random token (256 bits)
+    """
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Hash a refresh token for storage and lookup.
+    
+    Refresh tokens are random rather than user-chosen, so a fast SHA-256
+    digest is enough and avoids bcrypt on every refresh.
+    
+    Args:
+        token: Refresh token string
+        
+    Returns:
+        Hex-encoded SHA-256 digest
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
@@ -0,0 +1,99 @@
+"""
+OpenTelemetry tracing setup with a local console/file exporter.
+"""
+import os
+from typing import Dict, Tuple
+import bson
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from pymongo import monitoring
+from .config import settings
+
+
+# Proxy tracer: a no-op until setup_tracing() installs a provider
+tracer = trace.get_tracer("backend")
+
+_provider = None
+_trace_file = None
+
+
+def setup_tracing():
+    """
+    Install the tracer provider with the configured sampler and exporter.
+    Should be called on application startup, before connecting to MongoDB.
+    """
+    global _provider, _trace_file
+    if not settings.TRACING_ENABLED or _provider is not None:
+        return
+    
+    # The SDK is only imported when tracing is enabled
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    
+    if settings.TRACING_EXPORTER == "file":
+        # One JSON span per line for offline analysis
+        _trace_file = open(settings.TRACING_FILE_PATH, "a", encoding="utf-8")
+        exporter = ConsoleSpanExporter(
+            out=_trace_file,
+            formatter=lambda span: span.to_json(indent=None) + os.linesep,
+        )
+    else:
+        exporter = ConsoleSpanExporter()
+    
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.APP_NAME, "service.version": settings.APP_VERSION}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATE)),
+    )
+    # Spans are exported from a background thread, never on the request path
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+
+
+def shutdown_tracing():
+    """
+    Flush pending spans and close the exporter.
+    Should be called on application shutdown.
+    """
+    global _provider, _trace_file
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+    if _trace_file is not None:
+        _trace_file.close()
+        _trace_file = None
+
+
+class MongoCommandTracingListener(monitoring.CommandListener):
+    """pymongo command listener wrapping every MongoDB command in a client span."""
+    
+    def __init__(self):
+        self._spans: Dict[Tuple, trace.Span] = {}
+    
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(event.command_name)
+        
+        span = tracer.start_span(f"mongo.{event.command_name}", kind=SpanKind.CLIENT)
+        if span.is_recording():
+            span.set_attribute("db.system", "mongodb")
+            span.set_attribute("db.name", event.database_name)
+            span.set_attribute("db.operation", event.command_name)
+            if isinstance(collection, str):
+                span.set_attribute("db.mongodb.collection", collection)
+            span.set_attribute("db.mongodb.command_size", len(bson.encode(event.command)))
+        self._spans[(event.connection_id, event.request_id)] = span
+    
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        span = self._spans.pop((event.connection_id, event.request_id), None)
+        if span is not None:
+            span.end()
+    
+    def failed(self, event: monitoring.CommandFailedEvent):
+        span = self._spans.pop((event.connection_id, event.request_id), None)
+        if span is not None:
+            span.set_status(Status(StatusCode.ERROR, str(event.failure.get("errmsg", ""))))
+            span.end()
@@ -1,9 +1,24 @@
 """
 MongoDB database connection and client management using Motor (async driver).
 """
+import logging
+from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from typing import Optional
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
+from typing import Awaitable, Callable, Optional
 from ..core.config import settings
+from ..core.metrics import MongoCommandMetricsListener
+from ..core.tracing import MongoCommandTracingListener
+from .pool_stats import pool_stats
+
+
+logger = logging.getLogger(__name__)
 
 
 class Database:
@@ -11,30 +26,169 @@ class Database:
     
     client: Optional[AsyncIOMotorClient] = None
     db: Optional[AsyncIOMotorDatabase] = None
+    read_db: Optional[AsyncIOMotorDatabase] = None
 
 
 # Global database instance
 database = Database()
 
 
+def _read_preference():
+    """Build the configured read preference for list/export reads."""
+    if settings.MONGO_READ_PREFERENCE == "primary":
+        return Primary()
+    
+    preference_class = {
+        "primaryPreferred": PrimaryPreferred,
+        "secondary": Secondary,
+        "secondaryPreferred": SecondaryPreferred,
+        "nearest": Nearest,
+    }[settings.MONGO_READ_PREFERENCE]
+    return preference_class(max_staleness=settings.MONGO_MAX_STALENESS_SECONDS or -1)
+
+
+def _client_options() -> dict:
+    """Pool, timeout and compression options for the Motor client."""
+    options = {
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "maxConnecting": settings.MONGO_MAX_CONNECTING,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+    }
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    return options
+
+
 async def connect_to_mongo():
     """
     Connect to MongoDB and initialize the database client.
     Should be called on application startup.
     """
     try:
-        database.client = AsyncIOMotorClient(settings.MONGO_URI)
+        event_listeners = [pool_stats]
+        if settings.METRICS_ENABLED:
+            event_listeners.append(MongoCommandMetricsListener())
+        if settings.TRACING_ENABLED:
+            event_listeners.append(MongoCommandTracingListener())
+        
+        database.client = AsyncIOMotorClient(
+            settings.MONGO_URI,
+            event_listeners=event_listeners,
+            **_client_options()
+        )
         database.db = database.client[settings.DATABASE_NAME]
+        database.read_db = database.client.get_database(
+            settings.DATABASE_NAME,
+            read_preference=_read_preference()
+        )
         
         # Test connection
         await database.client.admin.command('ping')
-        print(f"✅ Connected to MongoDB: {settings.DATABASE_NAME}")
+        logger.info("Connected to MongoDB", extra={"database": settings.DATABASE_NAME})
+        
+        await ensure_indexes()
         
     except Exception as e:
-        print(f"❌ Failed to connect to MongoDB: {e}")
+        logger.error("Failed to connect to MongoDB", extra={"error": str(e)})
         raise e
 
 
+async def run_migration_once(name: str, migration: Callable[[], Awaitable]):
+    """
+    Run a data migration unless it is recorded as applied in the migrations collection.
+    
+    Migrations must be idempotent: instances starting at the same time may
+    both run one before either records it.
+    
+    Args:
+        name: Unique migration name
+        migration: Callable returning the awaitable that performs the migration
+    """
+    migrations = database.db["migrations"]
+    if await migrations.find_one({"_id": name}) is not None:
+        return
+    
+    await migration()
+    await migrations.update_one(
+        {"_id": name},
+        {"$setOnInsert": {"applied_at": datetime.utcnow()}},
+        upsert=True
+    )
+    logger.info("Applied migration", extra={"migration": name})
+
+
+async def ensure_indexes():
+    """
+    Create the indexes the application relies on.
+    
+    The hot listing index only covers live posts, so tombstoned posts never
+    inflate it; a separate small index covers tombstones for the purge task.
+    """
+    posts = database.db["posts"]
+    
+    # Backfill the tombstone flag on posts created before soft delete existed
+    await run_migration_once("posts_is_deleted_backfill", lambda: posts.update_many(
+        {"is_deleted": {"$exists": False}},
+        {"$set": {"is_deleted": False, "deleted_at": None}}
+    ))
+    
+    await posts.create_index(
+        [("user_id", 1), ("updated_at", -1)],
+        name="live_posts_by_user",
+        partialFilterExpression={"is_deleted": False}
+    )
+    await posts.create_index(
+        [("deleted_at", 1)],
+        name="deleted_posts_by_deleted_at",
+        partialFilterExpression={"is_deleted": True}
+    )
+    
+    # Refresh tokens: lookup by hash, session revocation and expiry
+    refresh_tokens = database.db["refresh_tokens"]
+    await refresh_tokens.create_index([("token_hash", 1)], name="refresh_tokens_by_hash", unique=True)
+    await refresh_tokens.create_index([("family_id", 1)], name="refresh_tokens_by_family")
+    await refresh_tokens.create_index(
+        [("expires_at", 1)],
+        name="refresh_tokens_ttl",
+        expireAfterSeconds=0
+    )
+    
+    # Leases (collab room ownership, singleton loops); expired ones are reclaimable before removal
+    await database.db["leases"].create_index(
+        [("expires_at", 1)],
+        name="leases_ttl",
+        expireAfterSeconds=0
+    )
+    
+    # AI job queue: claim order, pending-job dedupe, lease recovery and result TTL
+    ai_jobs = database.db["ai_jobs"]
+    await ai_jobs.create_index(
+        [("status", 1), ("priority", -1), ("created_at", 1)],
+        name="ai_jobs_claim_order"
+    )
+    await ai_jobs.create_index(
+        [("dedupe_key", 1)],
+        name="ai_jobs_pending_dedupe",
+        unique=True,
+        partialFilterExpression={"active": True}
+    )
+    await ai_jobs.create_index(
+        [("lease_expires_at", 1)],
+        name="ai_jobs_leases",
+        partialFilterExpression={"status": "running"}
+    )
+    await ai_jobs.create_index(
+        [("expires_at", 1)],
+        name="ai_jobs_result_ttl",
+        expireAfterSeconds=0
+    )
+
+
 async def close_mongo_connection():
     """
     Close MongoDB connection.
@@ -42,7 +196,7 @@ async def close_mongo_connection():
     """
     if database.client:
         database.client.close()
-        print("✅ MongoDB connection closed")
+        logger.info("MongoDB connection closed")
 
 
 def get_database() -> AsyncIOMotorDatabase:
@@ -53,3 +207,30 @@ def get_database() -> AsyncIOMotorDatabase:
         AsyncIOMotorDatabase instance
     """
     return database.db
+
+
+def get_read_database() -> AsyncIOMotorDatabase:
+    """
+    Get the database instance for reads that tolerate replica lag (lists, exports).
+    
+    Uses MONGO_READ_PREFERENCE, so these reads can be served by secondaries
+    while writes and read-after-write lookups go through get_database().
+    
+    Returns:
+        AsyncIOMotorDatabase instance with the configured read preference
+    """
+    return database.read_db
+
+
+def get_pool_stats() -> dict:
+    """
+    Get connection pool statistics for monitoring.
+    
+    Returns:
+        Configured pool bounds and per-server open/checked_out/waiting counts
+    """
+    return {
+        "min_pool_size": settings.MONGO_MIN_POOL_SIZE,
+        "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+        "servers": pool_stats.snapshot(),
+    }
@@ -0,0 +1,81 @@
+"""
+MongoDB connection pool statistics collected from pymongo pool events.
+"""
+import threading
+from collections import defaultdict
+from typing import Dict
+from pymongo import monitoring
+from ..core.metrics import MONGO_POOL_CHECKOUT_FAILURES, MONGO_POOL_CONNECTIONS
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Track open, checked-out and waiting connections per server.
+    
+    pymongo calls the listener from Motor's executor threads, so counters
+    are only read and written under a lock.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"open": 0, "checked_out": 0, "waiting": 0, "checkout_failures": 0}
+        )
+    
+    def _adjust(self, address, **deltas: int):
+        server = f"{address[0]}:{address[1]}"
+        with self._lock:
+            stats = self._stats[server]
+            for state, delta in deltas.items():
+                stats[state] += delta
+                if state != "checkout_failures":
+                    MONGO_POOL_CONNECTIONS.labels(server=server, state=state).set(stats[state])
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        self._adjust(event.address, open=1)
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        self._adjust(event.address, open=-1)
+    
+    def connection_check_out_started(self, event):
+        self._adjust(event.address, waiting=1)
+    
+    def connection_check_out_failed(self, event):
+        self._adjust(event.address, waiting=-1, checkout_failures=1)
+        server = f"{event.address[0]}:{event.address[1]}"
+        MONGO_POOL_CHECKOUT_FAILURES.labels(server=server, reason=str(event.reason)).inc()
+    
+    def connection_checked_out(self, event):
+        self._adjust(event.address, waiting=-1, checked_out=1)
+    
+    def connection_checked_in(self, event):
+        self._adjust(event.address, checked_out=-1)
+    
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """
+        Current pool statistics per server.
+        
+        Returns:
+            Mapping of "host:port" to open/checked_out/waiting/checkout_failures counts
+        """
+        with self._lock:
+            return {server: dict(stats) for server, stats in self._stats.items()}
+
+
+# Global pool statistics collector
+pool_stats = PoolStatsListener()
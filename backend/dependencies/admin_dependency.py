@@ -0,0 +1,30 @@
+"""
+Admin dependency for protecting operational routes.
+"""
+import hmac
+from typing import Optional
+from fastapi import Header, HTTPException, status
+from ..core.config import settings
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Dependency that only lets requests carrying the admin token through.
+    
+    Args:
+        x_admin_token: Value of the X-Admin-Token header
+        
+    Raises:
+        HTTPException: 404 if admin access is disabled, 403 if the token is wrong
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found"
+        )
+    
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token"
+        )
@@ -1,12 +1,17 @@
 """
 Authentication dependency for protecting routes.
 """
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, WebSocketException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
+from ..cache.keys import user_key
+from ..cache.provider import get_cache
+from ..core.config import settings
+from ..core.metrics import record_cache_lookup
 from ..core.security import verify_token
-from ..db.database import get_database
+from ..core.tracing import tracer
 from ..models.user_model import UserModel
+from ..repositories.provider import get_user_repository
 
 
 # HTTP Bearer token security scheme
@@ -28,10 +33,40 @@ async def get_current_user(
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    token = credentials.credentials
+    with tracer.start_as_current_span("auth.get_current_user"):
+        return await _resolve_user(credentials.credentials)
+
+
+async def get_websocket_user(token: Optional[str] = Query(None)) -> UserModel:
+    """
+    Dependency to authenticate a WebSocket handshake.
     
+    Browsers cannot set headers on WebSocket handshakes, so the JWT is passed
+    as the `token` query parameter.
+    
+    Args:
+        token: JWT access token
+        
+    Returns:
+        UserModel instance of the authenticated user
+        
+    Raises:
+        WebSocketException: If the token is missing or invalid
+    """
+    if not token:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Missing token")
+    
+    try:
+        return await _resolve_user(token)
+    except HTTPException as e:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail))
+
+
+async def _resolve_user(token: str) -> UserModel:
+    """Decode the token and load the matching active user."""
     # Verify and decode token
-    payload = verify_token(token)
+    with tracer.start_as_current_span("auth.jwt_decode"):
+        payload = verify_token(token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,9 +83,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get database and find user
-    db = get_database()
-    user_dict = await db["users"].find_one({"email": email})
+    user_dict = await _load_user(email)
     
     if not user_dict:
         raise HTTPException(
@@ -69,3 +102,23 @@ async def get_current_user(
         )
     
     return user
+
+
+async def _load_user(email: str) -> Optional[dict]:
+    """Load a user by email through the shared cache."""
+    cache = get_cache()
+    key = user_key(email)
+    user_dict = await cache.get(key)
+    record_cache_lookup("users", user_dict is not None)
+    if user_dict is not None:
+        return user_dict
+    
+    # Find the user in storage
+    user_dict = await get_user_repository().get_by_email(email)
+    
+    if user_dict:
+        # The password hash never leaves the database
+        user_dict = {**user_dict, "hashed_password": ""}
+        await cache.set(key, user_dict, settings.CACHE_USER_TTL_SECONDS)
+    
+    return user_dict
@@ -0,0 +1 @@
+"""Local emulators for external services."""
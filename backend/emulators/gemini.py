@@ -0,0 +1,306 @@
+"""
+Deterministic local emulator for the Gemini REST API.
+
+Implements the `generateContent` and `streamGenerateContent` response shapes
+with configurable latency distributions, token-rate streaming, 429/5xx
+injection and malformed-response modes. Point the app at it with
+GEMINI_API_BASE_URL=http://127.0.0.1:8090/v1beta and run:
+
+    python -m backend.emulators.gemini --port 8090 --latency lognormal:-1.6,0.4 --error-429 0.05
+
+The configuration can be changed at runtime with `POST /emulator/config`
+and counters are available at `GET /emulator/stats`.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+from collections import Counter
+from dataclasses import dataclass, asdict, fields
+from typing import List, Optional
+
+from aiohttp import web
+
+
+WORDS = (
+    "the post explains how editors draft publish and revise content with clear structure "
+    "concise summary highlights main points readers value practical examples performance "
+    "latency caching autosave documents improve writing quality"
+).split()
+
+MALFORMED_MODES = ("invalid_json", "missing_candidates", "empty_parts", "html")
+
+
+@dataclass
+class EmulatorConfig:
+    """Behaviour of the emulator; every field can be updated at runtime."""
+
+    # "fixed:S", "uniform:MIN,MAX", "normal:MEAN,STDDEV" or "lognormal:MU,SIGMA" (seconds)
+    latency: str = "fixed:0.2"
+    # Streaming speed for streamGenerateContent
+    tokens_per_second: float = 80.0
+    tokens_per_chunk: int = 8
+    # Length of generated answers in words
+    response_words: int = 60
+    # Fractions of requests answered with failures
+    error_429_rate: float = 0.0
+    error_5xx_rate: float = 0.0
+    malformed_rate: float = 0.0
+    malformed_mode: str = "invalid_json"
+    # Required x-goog-api-key (None accepts any key)
+    api_key: Optional[str] = None
+    seed: int = 0
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Draw a response delay in seconds from the configured distribution."""
+        kind, _, params = self.latency.partition(":")
+        values = [float(value) for value in params.split(",") if value]
+        if kind == "fixed":
+            delay = values[0]
+        elif kind == "uniform":
+            delay = rng.uniform(values[0], values[1])
+        elif kind == "normal":
+            delay = rng.gauss(values[0], values[1])
+        elif kind == "lognormal":
+            delay = rng.lognormvariate(values[0], values[1])
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.latency}")
+        return max(0.0, delay)
+
+    def validate(self):
+        """Raise ValueError if the configuration is inconsistent."""
+        self.sample_latency(random.Random(0))
+        if self.malformed_mode not in MALFORMED_MODES:
+            raise ValueError(f"malformed_mode must be one of {MALFORMED_MODES}")
+        for name in ("error_429_rate", "error_5xx_rate", "malformed_rate"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1")
+        if self.tokens_per_second <= 0 or self.tokens_per_chunk <= 0:
+            raise ValueError("tokens_per_second and tokens_per_chunk must be positive")
+
+
+class GeminiEmulator:
+    """aiohttp application emulating the Gemini `models/*` endpoints."""
+
+    def __init__(self, config: Optional[EmulatorConfig] = None):
+        self.config = config or EmulatorConfig()
+        self.config.validate()
+        self.stats: Counter = Counter()
+        self._request_number = 0
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1beta/models/{target}", self._handle_model_call)
+        app.router.add_get("/emulator/stats", self._handle_stats)
+        app.router.add_post("/emulator/config", self._handle_config)
+        app.router.add_post("/emulator/reset", self._handle_reset)
+        return app
+
+    def _next_rng(self) -> random.Random:
+        # One generator per request, derived from the seed and arrival order
+        self._request_number += 1
+        return random.Random(f"{self.config.seed}:{self._request_number}")
+
+    @staticmethod
+    def _error(status: int, message: str, status_name: str, headers: Optional[dict] = None) -> web.Response:
+        return web.json_response(
+            {"error": {"code": status, "message": message, "status": status_name}},
+            status=status,
+            headers=headers,
+        )
+
+    def _generate_words(self, prompt: str) -> List[str]:
+        # The answer depends only on the seed and the prompt, never on timing
+        digest = hashlib.sha256(f"{self.config.seed}:{prompt}".encode("utf-8")).digest()
+        rng = random.Random(digest)
+        return [rng.choice(WORDS) for _ in range(self.config.response_words)]
+
+    @staticmethod
+    def _chunk_payload(text: str, prompt_tokens: int, candidate_tokens: int, finished: bool) -> dict:
+        candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+        if finished:
+            candidate["finishReason"] = "STOP"
+        return {
+            "candidates": [candidate],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": candidate_tokens,
+                "totalTokenCount": prompt_tokens + candidate_tokens,
+            },
+        }
+
+    def _malformed_response(self) -> web.Response:
+        mode = self.config.malformed_mode
+        if mode == "invalid_json":
+            return web.Response(text='{"candidates": [{"content": {"parts": [{"text": "trunc', content_type="application/json")
+        if mode == "missing_candidates":
+            return web.json_response({"promptFeedback": {"blockReason": "OTHER"}})
+        if mode == "empty_parts":
+            return web.json_response({"candidates": [{"content": {"parts": [], "role": "model"}}]})
+        return web.Response(text="<html><body>Bad Gateway</body></html>", content_type="text/html")
+
+    async def _handle_model_call(self, request: web.Request) -> web.StreamResponse:
+        model, _, method = request.match_info["target"].partition(":")
+        if method not in ("generateContent", "streamGenerateContent"):
+            return self._error(404, f"Method {method} not found", "NOT_FOUND")
+
+        config = self.config
+        rng = self._next_rng()
+        self.stats["requests"] += 1
+
+        supplied_key = request.headers.get("x-goog-api-key") or request.query.get("key")
+        if config.api_key is not None and supplied_key != config.api_key:
+            self.stats["rejected_api_key"] += 1
+            return self._error(400, "API key not valid. Please pass a valid API key.", "INVALID_ARGUMENT")
+
+        try:
+            payload = await request.json()
+            prompt = "".join(part.get("text", "") for part in payload["contents"][0]["parts"])
+        except (json.JSONDecodeError, KeyError, IndexError, TypeError):
+            self.stats["bad_request"] += 1
+            return self._error(400, "Invalid JSON payload received.", "INVALID_ARGUMENT")
+
+        await asyncio.sleep(config.sample_latency(rng))
+
+        roll = rng.random()
+        if roll < config.error_429_rate:
+            self.stats["error_429"] += 1
+            return self._error(429, "Resource has been exhausted (e.g. check quota).", "RESOURCE_EXHAUSTED",
+                               headers={"Retry-After": "1"})
+        roll -= config.error_429_rate
+        if roll < config.error_5xx_rate:
+            self.stats["error_5xx"] += 1
+            if rng.random() < 0.5:
+                return self._error(500, "An internal error has occurred.", "INTERNAL")
+            return self._error(503, "The model is overloaded. Please try again later.", "UNAVAILABLE")
+        roll -= config.error_5xx_rate
+        if roll < config.malformed_rate:
+            self.stats["malformed"] += 1
+            return self._malformed_response()
+
+        words = self._generate_words(prompt)
+        prompt_tokens = max(1, math.ceil(len(prompt) / 4))
+        max_tokens = payload.get("generationConfig", {}).get("maxOutputTokens")
+        if isinstance(max_tokens, int) and max_tokens > 0:
+            words = words[:max_tokens]
+
+        self.stats[f"ok_{method}"] += 1
+        if method == "generateContent":
+            return web.json_response(self._chunk_payload(" ".join(words), prompt_tokens, len(words), True))
+        return await self._stream(request, words, prompt_tokens)
+
+    async def _stream(self, request: web.Request, words: List[str], prompt_tokens: int) -> web.StreamResponse:
+        sse = request.query.get("alt") == "sse"
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/event-stream" if sse else "application/json"}
+        )
+        await response.prepare(request)
+
+        chunk_size = self.config.tokens_per_chunk
+        delay = chunk_size / self.config.tokens_per_second
+        chunks = [words[i:i + chunk_size] for i in range(0, len(words), chunk_size)] or [[]]
+        emitted = 0
+
+        if not sse:
+            await response.write(b"[")
+        for index, chunk in enumerate(chunks):
+            await asyncio.sleep(delay)
+            emitted += len(chunk)
+            finished = index == len(chunks) - 1
+            text = " ".join(chunk) + ("" if finished else " ")
+            body = json.dumps(self._chunk_payload(text, prompt_tokens, emitted, finished))
+            if sse:
+                await response.write(f"data: {body}\r\n\r\n".encode("utf-8"))
+            else:
+                await response.write((body if index == 0 else f",\r\n{body}").encode("utf-8"))
+        if not sse:
+            await response.write(b"]")
+
+        await response.write_eof()
+        return response
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"stats": dict(self.stats), "config": asdict(self.config)})
+
+    async def _handle_config(self, request: web.Request) -> web.Response:
+        updates = await request.json()
+        known = {field.name for field in fields(EmulatorConfig)}
+        unknown = set(updates) - known
+        if unknown:
+            return web.json_response({"error": f"Unknown fields: {sorted(unknown)}"}, status=400)
+
+        candidate = EmulatorConfig(**{**asdict(self.config), **updates})
+        try:
+            candidate.validate()
+        except (ValueError, IndexError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+        self.config = candidate
+        return web.json_response(asdict(self.config))
+
+    async def _handle_reset(self, request: web.Request) -> web.Response:
+        self.stats.clear()
+        self._request_number = 0
+        return web.json_response({"status": "reset"})
+
+
+async def start_gemini_emulator(config: Optional[EmulatorConfig] = None, host: str = "127.0.0.1", port: int = 0):
+    """
+    Start the emulator in the running event loop.
+
+    Args:
+        config: Emulator behaviour (defaults to a fast, error-free emulator)
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+
+    Returns:
+        Tuple of (emulator, runner, base URL to use as GEMINI_API_BASE_URL)
+    """
+    emulator = GeminiEmulator(config)
+    runner = web.AppRunner(emulator.build_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return emulator, runner, f"http://{host}:{bound_port}/v1beta"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the local Gemini emulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="fixed:0.2", help="fixed:S | uniform:A,B | normal:M,SD | lognormal:MU,SIGMA")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--tokens-per-chunk", type=int, default=8)
+    parser.add_argument("--response-words", type=int, default=60)
+    parser.add_argument("--error-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="Fraction of requests answered with 500/503")
+    parser.add_argument("--malformed", type=float, default=0.0, help="Fraction of malformed responses")
+    parser.add_argument("--malformed-mode", default="invalid_json", choices=MALFORMED_MODES)
+    parser.add_argument("--api-key", help="Only accept this API key")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = EmulatorConfig(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        tokens_per_chunk=args.tokens_per_chunk,
+        response_words=args.response_words,
+        error_429_rate=args.error_429,
+        error_5xx_rate=args.error_5xx,
+        malformed_rate=args.malformed,
+        malformed_mode=args.malformed_mode,
+        api_key=args.api_key,
+        seed=args.seed,
+    )
+    emulator = GeminiEmulator(config)
+    print(f"Gemini emulator listening on http://{args.host}:{args.port}/v1beta")
+    web.run_app(emulator.build_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
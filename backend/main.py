@@ -1,12 +1,34 @@
 """
 Main FastAPI application for Smart Blog Editor.
 """
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from .core.config import settings
+from .core.metrics import render_metrics
+from .core.tracing import setup_tracing, shutdown_tracing
+from .core.logging_config import setup_logging, shutdown_logging
 from .db.database import connect_to_mongo, close_mongo_connection
-from .routes import auth, posts, ai
+from .services.post_purge import start_post_purge, stop_post_purge
+from .services.post_stats import start_stats_reconciliation, stop_stats_reconciliation
+from .services.http_client import open_http_session, close_http_session
+from .services.ai_jobs import start_ai_workers, stop_ai_workers
+from .cache.provider import open_cache, close_cache
+from .repositories.provider import open_repositories, close_repositories
+from .services.rate_limiter import open_rate_limiter, close_rate_limiter
+from .services.health import health_state, start_health_checks, stop_health_checks, mark_draining
+from .middleware.metrics_middleware import MetricsMiddleware
+from .middleware.rate_limit_middleware import RateLimitMiddleware
+from .middleware.load_shedding_middleware import LoadSheddingMiddleware
+from .middleware.request_context_middleware import RequestContextMiddleware
+from .middleware.profiling_middleware import ProfilingMiddleware
+from .services.collab import collab_manager
+from .routes import auth, posts, ai, admin, collab
+
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
@@ -15,12 +37,39 @@ async def lifespan(app: FastAPI):
     Application lifespan manager for startup and shutdown events.
     """
     # Startup
-    print(f"🚀 Starting {settings.APP_NAME} v{settings.APP_VERSION}")
-    await connect_to_mongo()
+    setup_logging()
+    logger.info("Starting application", extra={"app": settings.APP_NAME, "version": settings.APP_VERSION})
+    setup_tracing()
+    # Warm up before accepting traffic: MongoDB ping and indexes, outbound HTTP pool, cache
+    mongo_storage = settings.STORAGE_BACKEND == "mongo"
+    if mongo_storage:
+        await connect_to_mongo()
+    open_repositories()
+    await open_http_session()
+    await open_cache()
+    await open_rate_limiter()
+    start_post_purge()
+    start_stats_reconciliation()
+    # The AI job queue lives in MongoDB only
+    if mongo_storage:
+        start_ai_workers()
+    await start_health_checks()
     yield
     # Shutdown
+    mark_draining()
+    await stop_health_checks()
+    await collab_manager.close_all()
+    await stop_ai_workers()
+    await stop_stats_reconciliation()
+    await stop_post_purge()
+    await close_http_session()
+    await close_rate_limiter()
+    await close_cache()
+    await close_repositories()
     await close_mongo_connection()
-    print("👋 Application shutdown complete")
+    shutdown_tracing()
+    logger.info("Application shutdown complete")
+    shutdown_logging()
 
 
 # Create FastAPI application
@@ -31,6 +80,19 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Profile selected requests on demand (added first, so it is innermost and profiles
+# cover only the app, not load shedding, rate limiting or CORS)
+app.add_middleware(ProfilingMiddleware)
+
+# Shed load beyond adaptive per-class concurrency limits (inside rate limiting, so throttled
+# requests do not skew latency samples; before CORS so 503s carry CORS headers)
+if settings.CONCURRENCY_LIMIT_ENABLED:
+    app.add_middleware(LoadSheddingMiddleware)
+
+# Throttle abusive clients (added before CORS so 429s carry CORS headers and preflights pass)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -45,10 +107,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Attach a correlation id to every request's logs
+app.add_middleware(RequestContextMiddleware)
+
+# Trace each request (inside metrics so span time excludes metric bookkeeping)
+if settings.TRACING_ENABLED:
+    from .middleware.tracing_middleware import TracingMiddleware
+    app.add_middleware(TracingMiddleware)
+
+# Record per-route latency (added last so it wraps the whole stack)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(posts.router)
+app.include_router(collab.router)
 app.include_router(ai.router)
+app.include_router(admin.router)
 
 
 @app.get("/")
@@ -69,3 +145,30 @@ async def health_check():
         "status": "healthy",
         "service": settings.APP_NAME
     }
+
+
+@app.api_route("/health/live", methods=["GET", "HEAD"])
+async def liveness_check():
+    """Liveness probe: the process is up and its event loop is responsive."""
+    return {"status": "alive"}
+
+
+@app.api_route("/health/ready", methods=["GET", "HEAD"])
+async def readiness_check():
+    """
+    Readiness probe built from cached dependency checks.
+    
+    Returns 503 while MongoDB is unreachable, its pool is saturated, the event
+    loop is lagging or the instance is draining. An open Gemini circuit only
+    reports "degraded".
+    """
+    result = health_state.readiness()
+    status_code = 200 if result["ready"] else 503
+    return JSONResponse(content=result, status_code=status_code)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint."""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
@@ -0,0 +1,80 @@
+"""
+ASGI middleware shedding requests beyond each route class's adaptive concurrency limit.
+"""
+import json
+import re
+import time
+from ..core.metrics import LOAD_SHED_REJECTIONS
+from ..services.concurrency_limiter import get_concurrency_limiter
+from ..services.rate_limiter import retry_after_header
+
+
+# First match wins; a None class is never limited (paths outside /api/, AI job long polls)
+ROUTE_CLASSES = [
+    (None, {"GET"}, re.compile(r"^/api/ai/jobs/")),
+    ("ai", None, re.compile(r"^/api/ai/")),
+    ("registration", {"POST"}, re.compile(r"^/api/auth/register/?$")),
+    ("autosave", {"PATCH"}, re.compile(r"^/api/posts/[^/]+/?$")),
+    ("read", {"GET", "HEAD"}, re.compile(r"^/api/")),
+    ("default", None, re.compile(r"^/api/")),
+]
+
+
+def route_class(method: str, path: str):
+    """Name of the concurrency class for a request, or None if unlimited."""
+    for name, methods, pattern in ROUTE_CLASSES:
+        if (methods is None or method in methods) and pattern.match(path):
+            return name
+    return None
+
+
+class LoadSheddingMiddleware:
+    """Reject requests over their class's concurrency limit with 503 and Retry-After."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        name = route_class(scope["method"], scope["path"])
+        limiter = get_concurrency_limiter()
+        if name is None or name not in limiter:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire(name):
+            LOAD_SHED_REJECTIONS.labels(route_class=name).inc()
+            await self._reject(send, limiter.retry_after(name))
+            return
+
+        latency = None
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal latency
+            # Time to the response start, so streamed bodies do not count as slowness
+            if message["type"] == "http.response.start" and latency is None:
+                latency = time.perf_counter() - start
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            limiter.release(name, latency)
+
+    @staticmethod
+    async def _reject(send, wait: float):
+        body = json.dumps({"detail": "Server is busy, please retry shortly"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", retry_after_header(wait).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
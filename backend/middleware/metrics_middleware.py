@@ -0,0 +1,39 @@
+"""
+ASGI middleware recording per-route request latency and in-flight requests.
+"""
+import time
+from ..core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+
+
+class MetricsMiddleware:
+    """Record request latency labelled by route template rather than raw path."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status_code = 500
+        
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # The router stores the matched route on the scope; unmatched paths share one label
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,98 @@
+"""
+ASGI middleware profiling individual requests on demand.
+
+A request is profiled when it carries `X-Debug-Profile: <ADMIN_TOKEN>` or is
+picked by the sampling rule (PROFILING_SAMPLE_RATE over PROFILING_PATH_PREFIXES).
+Everything else passes straight through, so the cost when inactive is one
+header scan. Profiles are retrievable through the admin routes.
+"""
+import asyncio
+import hmac
+import logging
+import random
+import time
+from ..core.config import settings
+from ..core.profiling import profile_store
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-debug-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+class ProfilingMiddleware:
+    """Run a sampling profiler for selected requests only."""
+    
+    def __init__(self, app):
+        self.app = app
+        self.active = 0
+        self._pending = set()
+    
+    def _should_profile(self, scope) -> bool:
+        if self.active >= settings.PROFILING_MAX_CONCURRENT:
+            return False
+        
+        if settings.ADMIN_TOKEN:
+            for key, value in scope["headers"]:
+                if key == PROFILE_HEADER:
+                    return hmac.compare_digest(value, settings.ADMIN_TOKEN.encode("utf-8"))
+        
+        if settings.PROFILING_SAMPLE_RATE > 0:
+            prefixes = settings.PROFILING_PATH_PREFIXES
+            if not prefixes or any(scope["path"].startswith(prefix) for prefix in prefixes):
+                return random.random() < settings.PROFILING_SAMPLE_RATE
+        
+        return False
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        # Imported lazily so the profiler costs nothing until first use
+        from pyinstrument import Profiler
+        
+        profile_id = profile_store.new_id()
+        status_code = 500
+        
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER, profile_id.encode("latin-1"))
+                ]
+            await send(message)
+        
+        # async_mode="enabled" attributes only this request's task, not concurrent requests
+        profiler = Profiler(interval=settings.PROFILING_INTERVAL_SECONDS, async_mode="enabled")
+        self.active += 1
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            self.active -= 1
+            duration = time.perf_counter() - started
+            metadata = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 2),
+            }
+            task = asyncio.get_running_loop().create_task(self._store(profiler, profile_id, metadata))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+    
+    @staticmethod
+    async def _store(profiler, profile_id: str, metadata: dict):
+        """Render the profile off the event loop and store it."""
+        from pyinstrument.renderers import SpeedscopeRenderer
+        
+        try:
+            rendered = await asyncio.to_thread(SpeedscopeRenderer().render, profiler.last_session)
+            profile_store.add(profile_id, metadata, rendered)
+        except Exception:
+            logger.exception("Failed to render request profile", extra={"profile_id": profile_id})
@@ -0,0 +1,90 @@
+"""
+ASGI middleware enforcing per-user and per-IP token buckets by route group.
+"""
+import json
+import re
+from ..core.config import settings
+from ..core.metrics import RATE_LIMIT_REJECTIONS
+from ..core.security import verify_token
+from ..services.rate_limiter import get_rate_limiter, retry_after_header
+
+
+# First match wins; paths outside /api/ (health, metrics, docs) are never limited
+ROUTE_GROUPS = [
+    ("auth", {"POST"}, re.compile(r"^/api/auth/(login|register)/?$")),
+    ("autosave", {"PATCH"}, re.compile(r"^/api/posts/[^/]+/?$")),
+    ("ai", {"POST"}, re.compile(r"^/api/ai/")),
+    ("default", None, re.compile(r"^/api/")),
+]
+
+
+def route_group(method: str, path: str):
+    """Name of the rate-limit group for a request, or None if unlimited."""
+    for group, methods, pattern in ROUTE_GROUPS:
+        if (methods is None or method in methods) and pattern.match(path):
+            return group
+    return None
+
+
+def _bearer_subject(headers) -> str:
+    """Subject of a valid bearer token, or "" for anonymous requests."""
+    for name, value in headers:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                payload = verify_token(token)
+                return (payload or {}).get("sub") or ""
+    return ""
+
+
+class RateLimitMiddleware:
+    """Reject requests over their group's budget with 429 and Retry-After."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        group = route_group(scope["method"], scope["path"])
+        limits = settings.RATE_LIMITS.get(group) if group else None
+        if not limits:
+            await self.app(scope, receive, send)
+            return
+        
+        scopes = []
+        checks = []
+        if "ip_rate" in limits:
+            client = scope.get("client")
+            scopes.append("ip")
+            checks.append((f"{group}:ip:{client[0] if client else 'unknown'}", limits["ip_rate"], limits["ip_burst"]))
+        if "user_rate" in limits:
+            subject = _bearer_subject(scope["headers"])
+            if subject:
+                scopes.append("user")
+                checks.append((f"{group}:user:{subject}", limits["user_rate"], limits["user_burst"]))
+        
+        # All buckets are charged together, so a request rejected by one spends no tokens
+        rejected, wait = await get_rate_limiter().acquire(checks)
+        if rejected >= 0:
+            RATE_LIMIT_REJECTIONS.labels(group=group, scope=scopes[rejected]).inc()
+            await self._reject(send, wait)
+            return
+        
+        await self.app(scope, receive, send)
+    
+    @staticmethod
+    async def _reject(send, wait: float):
+        body = json.dumps({"detail": "Too many requests, please slow down"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", retry_after_header(wait).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,45 @@
+"""
+ASGI middleware assigning a correlation id to every request.
+"""
+import re
+from ..core.logging_config import new_request_id, request_id_var
+
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+# Accept caller-supplied ids only if they are short and log-safe
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+class RequestContextMiddleware:
+    """Propagate `X-Request-ID` (or generate one) into logs and the response."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = None
+        for key, value in scope["headers"]:
+            if key == REQUEST_ID_HEADER:
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or new_request_id()
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER, request_id.encode("latin-1"))
+                ]
+            await send(message)
+        
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,50 @@
+"""
+ASGI middleware wrapping each HTTP request in a server span.
+"""
+from opentelemetry import propagate
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from ..core.tracing import tracer
+
+
+class TracingMiddleware:
+    """Start a server span per request, continuing any incoming W3C trace context."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        parent = propagate.extract(carrier)
+        method = scope["method"]
+        
+        with tracer.start_as_current_span(
+            f"{method} {scope['path']}",
+            context=parent,
+            kind=SpanKind.SERVER,
+        ) as span:
+            status_code = 500
+            
+            async def send_wrapper(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                await send(message)
+            
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if span.is_recording():
+                    route = scope.get("route")
+                    route_path = getattr(route, "path", None)
+                    if route_path:
+                        span.update_name(f"{method} {route_path}")
+                        span.set_attribute("http.route", route_path)
+                    span.set_attribute("http.method", method)
+                    span.set_attribute("http.target", scope["path"])
+                    span.set_attribute("http.status_code", status_code)
+                    if status_code >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
@@ -16,8 +16,13 @@ class PostModel(BaseModel):
     title: str = Field(default="Untitled", description="Post title")
     content_json: Dict[str, Any] = Field(default_factory=dict, description="Lexical editor state as JSON")
     status: str = Field(default="draft", description="Post status: draft or published")
+    word_count: int = Field(default=0, description="Words in the content, kept for per-user stats")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    is_deleted: bool = Field(default=False, description="Tombstone flag set when the post is deleted")
+    deleted_at: Optional[datetime] = Field(default=None, description="Deletion timestamp used for purging")
+    summary: Optional[str] = Field(default=None, description="AI-generated summary")
+    summary_updated_at: Optional[datetime] = Field(default=None, description="When the summary was generated")
     
     class Config:
         populate_by_name = True
@@ -42,6 +47,8 @@ class PostModel(BaseModel):
                 },
                 "status": "draft",
                 "created_at": "2026-02-15T10:30:00",
-                "updated_at": "2026-02-15T10:30:00"
+                "updated_at": "2026-02-15T10:30:00",
+                "is_deleted": False,
+                "deleted_at": None
             }
         }
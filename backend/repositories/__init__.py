@@ -0,0 +1 @@
+"""Storage repositories package."""
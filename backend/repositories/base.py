@@ -0,0 +1,267 @@
+"""
+Repository interfaces for users and posts shared by the MongoDB and in-memory backends.
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+
+# bulk_write() error for an update whose post was missing, deleted or not owned
+UNMATCHED_WRITE_ERROR = "Post not found"
+
+
+@dataclass
+class PostWrite:
+    """One write in a bulk request: insert `post`, or set `fields` on a live post."""
+
+    post: Optional[dict] = None
+    post_id: Optional[str] = None
+    fields: dict = field(default_factory=dict)
+
+    @classmethod
+    def insert(cls, post: dict) -> "PostWrite":
+        return cls(post=post)
+
+    @classmethod
+    def update(cls, post_id: str, fields: dict) -> "PostWrite":
+        return cls(post_id=post_id, fields=fields)
+
+
+class UserRepository(ABC):
+    """
+    Users and their refresh-token sessions.
+
+    Documents are returned as dicts shaped like the MongoDB documents
+    (`_id` is an ObjectId) and belong to the caller.
+    """
+
+    name = "repository"
+
+    @abstractmethod
+    async def get_by_email(self, email: str) -> Optional[dict]:
+        """Load a user by email, or None."""
+
+    @abstractmethod
+    async def get_by_id(self, user_id, fields: Optional[Iterable[str]] = None) -> Optional[dict]:
+        """
+        Load a user by ID.
+
+        Args:
+            user_id: User ID
+            fields: Only return these fields (and `_id`)
+
+        Returns:
+            User document, or None
+        """
+
+    @abstractmethod
+    async def insert(self, user: dict) -> dict:
+        """
+        Store a new user.
+
+        Args:
+            user: User document without `_id`
+
+        Returns:
+            The stored document with its new `_id`
+        """
+
+    @abstractmethod
+    async def insert_refresh_token(self, token: dict):
+        """Store a refresh token document (keyed by its `token_hash`)."""
+
+    @abstractmethod
+    async def get_refresh_token(self, token_hash: str) -> Optional[dict]:
+        """Load a refresh token by hash, whatever its state."""
+
+    @abstractmethod
+    async def consume_refresh_token(self, token_hash: str, now: datetime) -> Optional[dict]:
+        """
+        Atomically mark a refresh token used.
+
+        Args:
+            token_hash: Hash of the presented token
+            now: Time of the exchange
+
+        Returns:
+            The token document, or None unless it was unused, unrevoked and unexpired
+        """
+
+    @abstractmethod
+    async def revoke_refresh_family(self, family_id, now: datetime):
+        """Revoke every token of a session."""
+
+    async def close(self):
+        """Release resources held by the backend."""
+
+
+class PostRepository(ABC):
+    """
+    Posts and the per-user stats materialized from them.
+
+    Reads only see live posts (`is_deleted` is False; posts without the
+    flag are not live). Passing `user_id` restricts a lookup or write to
+    posts owned by that user. Lists are sorted by `updated_at`, newest
+    first.
+    """
+
+    name = "repository"
+
+    @abstractmethod
+    async def get(self, post_id: str, user_id=None) -> Optional[dict]:
+        """Load a live post, or None."""
+
+    @abstractmethod
+    async def find_by_ids(self, post_ids: Iterable[str], user_id, fields: Optional[Iterable[str]] = None) -> List[dict]:
+        """
+        Load the live posts among `post_ids` owned by a user.
+
+        Args:
+            post_ids: Post IDs (valid ObjectId strings)
+            user_id: Owner of the posts
+            fields: Only return these fields (and `_id`)
+
+        Returns:
+            Matching posts in no particular order
+        """
+
+    @abstractmethod
+    async def list_by_user(self, user_id, skip: int = 0, limit: Optional[int] = None) -> List[dict]:
+        """
+        A page of a user's live posts, newest first.
+
+        Args:
+            user_id: Owner of the posts
+            skip: Posts to skip
+            limit: Maximum posts to return (all if None)
+
+        Returns:
+            List of posts
+        """
+
+    @abstractmethod
+    async def count_by_user(self, user_id) -> int:
+        """Number of live posts owned by a user."""
+
+    @abstractmethod
+    def iter_by_user(self, user_id, batch_size: int) -> AsyncIterator[dict]:
+        """
+        Stream a user's live posts, newest first, reading `batch_size` at a time.
+
+        The iterator should be closed with `aclose()` if not exhausted.
+        """
+
+    @abstractmethod
+    async def insert(self, post: dict) -> dict:
+        """
+        Store a new post.
+
+        Args:
+            post: Post document (an `_id` is assigned if missing)
+
+        Returns:
+            The stored document
+        """
+
+    @abstractmethod
+    async def insert_many(self, posts: List[dict]) -> Dict[int, str]:
+        """
+        Store several posts, continuing past individual failures.
+
+        Returns:
+            Error message by index for the posts that were not stored
+        """
+
+    @abstractmethod
+    async def update(
+        self,
+        post_id: str,
+        fields: dict,
+        user_id=None,
+        previous_fields: Optional[Iterable[str]] = None,
+        expected: Optional[dict] = None
+    ) -> Optional[dict]:
+        """
+        Atomically set fields on a live post.
+
+        Args:
+            post_id: Post ID
+            fields: Field values to set
+            user_id: Only update if the post belongs to this user
+            previous_fields: Fields of the previous version to return (all if None)
+            expected: Only update if the post still has these field values (compare-and-set)
+
+        Returns:
+            The post as it was before the update, or None if no live post matched
+        """
+
+    @abstractmethod
+    async def bulk_write(self, writes: List[PostWrite], user_id=None) -> Dict[int, str]:
+        """
+        Apply inserts and updates without ordering guarantees between them.
+
+        Args:
+            writes: Writes to apply
+            user_id: Only update posts owned by this user
+
+        Returns:
+            Error message by index for the writes that failed, including
+            updates that matched no live post (UNMATCHED_WRITE_ERROR)
+        """
+
+    @abstractmethod
+    async def purge_deleted(self, deleted_before: datetime, limit: int) -> int:
+        """
+        Physically remove up to `limit` posts tombstoned before `deleted_before`.
+
+        Returns:
+            Number of posts removed
+        """
+
+    @abstractmethod
+    def iter_missing_word_counts(self, user_id=None) -> AsyncIterator[dict]:
+        """Stream live posts (`_id` and `content_json`) stored without a `word_count`."""
+
+    @abstractmethod
+    async def set_missing_word_counts(self, word_counts: Dict[object, int]) -> int:
+        """
+        Store word counts on posts that still have none.
+
+        Args:
+            word_counts: Word count by post `_id`
+
+        Returns:
+            Number of posts updated
+        """
+
+    @abstractmethod
+    async def get_stats(self, user_id) -> Optional[dict]:
+        """A user's materialized stats, or None if they were never built."""
+
+    @abstractmethod
+    async def apply_stats_delta(self, user_id, delta: dict, activity_at: Optional[datetime] = None):
+        """
+        Adjust a user's counters atomically; users without stats are skipped.
+
+        Args:
+            user_id: Owner of the posts
+            delta: Counter changes (drafts, published, total_words)
+            activity_at: Time of the write, kept as last_activity_at if newer
+        """
+
+    @abstractmethod
+    async def reconcile_stats(self, user_id=None) -> int:
+        """
+        Rebuild stats from the posts and correct counters that drifted.
+
+        Args:
+            user_id: Reconcile a single user (all users if None); a single
+                user always ends up with a stats document
+
+        Returns:
+            Number of users whose stats were corrected or created
+        """
+
+    async def close(self):
+        """Release resources held by the backend."""
@@ -0,0 +1,297 @@
+"""
+In-process repositories with the same semantics as the MongoDB ones.
+
+Data lives in dicts for the lifetime of the process, which suits tests,
+benchmarks and single-node deployments that do not need durability.
+Documents are deep-copied in and out, so callers can never mutate stored
+state, and no method awaits while holding partial state, so each call is
+atomic on the event loop.
+"""
+import copy
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set
+from bson import ObjectId
+from .base import UNMATCHED_WRITE_ERROR, PostRepository, PostWrite, UserRepository
+
+
+# Expired refresh tokens are swept after this many inserts
+TOKEN_SWEEP_INTERVAL = 1024
+
+
+def _object_id(value) -> ObjectId:
+    return value if isinstance(value, ObjectId) else ObjectId(str(value))
+
+
+def _is_live(post: dict) -> bool:
+    # Same rule as the MongoDB filter {"is_deleted": False}: a missing flag is not live
+    return post.get("is_deleted") is False
+
+
+def _project(document: dict, fields: Optional[Iterable[str]]) -> dict:
+    if fields is None:
+        return copy.deepcopy(document)
+    return copy.deepcopy({"_id": document["_id"], **{key: document[key] for key in fields if key in document}})
+
+
+class MemoryUserRepository(UserRepository):
+    """Users and refresh tokens held in process memory."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._users: Dict[ObjectId, dict] = {}
+        self._user_ids_by_email: Dict[str, ObjectId] = {}
+        self._tokens: Dict[str, dict] = {}
+        self._token_families: Dict[ObjectId, Set[str]] = {}
+        self._inserts_since_sweep = 0
+
+    async def get_by_email(self, email: str) -> Optional[dict]:
+        user_id = self._user_ids_by_email.get(email)
+        return copy.deepcopy(self._users[user_id]) if user_id is not None else None
+
+    async def get_by_id(self, user_id, fields: Optional[Iterable[str]] = None) -> Optional[dict]:
+        user = self._users.get(_object_id(user_id))
+        return _project(user, fields) if user is not None else None
+
+    async def insert(self, user: dict) -> dict:
+        user = copy.deepcopy(user)
+        user.setdefault("_id", ObjectId())
+        self._users[user["_id"]] = user
+        self._user_ids_by_email.setdefault(user["email"], user["_id"])
+        return copy.deepcopy(user)
+
+    def _remove_token(self, token_hash: str):
+        token = self._tokens.pop(token_hash, None)
+        if token is None:
+            return
+        family = self._token_families.get(token["family_id"])
+        if family is not None:
+            family.discard(token_hash)
+            if not family:
+                del self._token_families[token["family_id"]]
+
+    def _live_token(self, token_hash: str) -> Optional[dict]:
+        """Token by hash, dropping it if expired (the TTL index does this in MongoDB)."""
+        token = self._tokens.get(token_hash)
+        if token is not None and token["expires_at"] <= datetime.utcnow():
+            self._remove_token(token_hash)
+            return None
+        return token
+
+    async def insert_refresh_token(self, token: dict):
+        token = copy.deepcopy(token)
+        token.setdefault("_id", ObjectId())
+        if token["token_hash"] in self._tokens:
+            raise ValueError("Duplicate refresh token hash")
+        self._tokens[token["token_hash"]] = token
+        self._token_families.setdefault(token["family_id"], set()).add(token["token_hash"])
+
+        self._inserts_since_sweep += 1
+        if self._inserts_since_sweep >= TOKEN_SWEEP_INTERVAL:
+            self._inserts_since_sweep = 0
+            for token_hash in list(self._tokens):
+                self._live_token(token_hash)
+
+    async def get_refresh_token(self, token_hash: str) -> Optional[dict]:
+        return copy.deepcopy(self._live_token(token_hash))
+
+    async def consume_refresh_token(self, token_hash: str, now: datetime) -> Optional[dict]:
+        token = self._live_token(token_hash)
+        if token is None or token["used_at"] is not None or token["revoked_at"] is not None or token["expires_at"] <= now:
+            return None
+        token["used_at"] = now
+        return copy.deepcopy(token)
+
+    async def revoke_refresh_family(self, family_id, now: datetime):
+        for token_hash in self._token_families.get(family_id, ()):
+            token = self._tokens[token_hash]
+            if token["revoked_at"] is None:
+                token["revoked_at"] = now
+
+
+class MemoryPostRepository(PostRepository):
+    """Posts and per-user stats held in process memory."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._posts: Dict[ObjectId, dict] = {}
+        self._post_ids_by_user: Dict[ObjectId, Set[ObjectId]] = {}
+        self._deleted: Set[ObjectId] = set()
+        self._stats: Dict[ObjectId, dict] = {}
+
+    def _live(self, post_id, user_id=None) -> Optional[dict]:
+        post = self._posts.get(_object_id(post_id))
+        if post is None or not _is_live(post):
+            return None
+        if user_id is not None and post["user_id"] != _object_id(user_id):
+            return None
+        return post
+
+    def _user_posts(self, user_id) -> List[dict]:
+        """A user's live posts, newest first."""
+        posts = [
+            self._posts[post_id]
+            for post_id in self._post_ids_by_user.get(_object_id(user_id), ())
+            if _is_live(self._posts[post_id])
+        ]
+        posts.sort(key=lambda post: post["updated_at"], reverse=True)
+        return posts
+
+    def _store(self, post: dict) -> dict:
+        post = copy.deepcopy(post)
+        post.setdefault("_id", ObjectId())
+        if post["_id"] in self._posts:
+            raise ValueError(f"Duplicate key: post {post['_id']} already exists")
+        post["user_id"] = _object_id(post["user_id"])
+        self._posts[post["_id"]] = post
+        self._post_ids_by_user.setdefault(post["user_id"], set()).add(post["_id"])
+        if post.get("is_deleted"):
+            self._deleted.add(post["_id"])
+        return post
+
+    def _set(self, post: dict, fields: dict):
+        post.update(copy.deepcopy(fields))
+        if post.get("is_deleted"):
+            self._deleted.add(post["_id"])
+
+    async def get(self, post_id: str, user_id=None) -> Optional[dict]:
+        return copy.deepcopy(self._live(post_id, user_id))
+
+    async def find_by_ids(self, post_ids: Iterable[str], user_id, fields: Optional[Iterable[str]] = None) -> List[dict]:
+        posts = (self._live(post_id, user_id) for post_id in set(post_ids))
+        return [_project(post, fields) for post in posts if post is not None]
+
+    async def list_by_user(self, user_id, skip: int = 0, limit: Optional[int] = None) -> List[dict]:
+        posts = self._user_posts(user_id)[skip:]
+        if limit is not None:
+            posts = posts[:limit]
+        return copy.deepcopy(posts)
+
+    async def count_by_user(self, user_id) -> int:
+        return sum(
+            1 for post_id in self._post_ids_by_user.get(_object_id(user_id), ())
+            if _is_live(self._posts[post_id])
+        )
+
+    async def iter_by_user(self, user_id, batch_size: int) -> AsyncIterator[dict]:
+        # Snapshot the order up front, like a cursor that does not see later writes
+        for post in self._user_posts(user_id):
+            yield copy.deepcopy(post)
+
+    async def insert(self, post: dict) -> dict:
+        return copy.deepcopy(self._store(post))
+
+    async def insert_many(self, posts: List[dict]) -> Dict[int, str]:
+        errors = {}
+        for index, post in enumerate(posts):
+            try:
+                self._store(post)
+            except ValueError as e:
+                errors[index] = str(e)
+        return errors
+
+    async def update(
+        self,
+        post_id: str,
+        fields: dict,
+        user_id=None,
+        previous_fields: Optional[Iterable[str]] = None,
+        expected: Optional[dict] = None
+    ) -> Optional[dict]:
+        post = self._live(post_id, user_id)
+        if post is None or any(post.get(key) != value for key, value in (expected or {}).items()):
+            return None
+        previous = _project(post, previous_fields)
+        self._set(post, fields)
+        return previous
+
+    async def bulk_write(self, writes: List[PostWrite], user_id=None) -> Dict[int, str]:
+        errors = {}
+        for index, write in enumerate(writes):
+            if write.post is not None:
+                try:
+                    self._store(write.post)
+                except ValueError as e:
+                    errors[index] = str(e)
+            else:
+                post = self._live(write.post_id, user_id)
+                if post is None:
+                    errors[index] = UNMATCHED_WRITE_ERROR
+                else:
+                    self._set(post, write.fields)
+        return errors
+
+    async def purge_deleted(self, deleted_before: datetime, limit: int) -> int:
+        expired = [
+            post_id for post_id in self._deleted
+            if self._posts[post_id].get("deleted_at") and self._posts[post_id]["deleted_at"] < deleted_before
+        ][:limit]
+        for post_id in expired:
+            post = self._posts.pop(post_id)
+            self._deleted.discard(post_id)
+            user_posts = self._post_ids_by_user.get(post["user_id"])
+            if user_posts is not None:
+                user_posts.discard(post_id)
+                if not user_posts:
+                    del self._post_ids_by_user[post["user_id"]]
+        return len(expired)
+
+    async def iter_missing_word_counts(self, user_id=None) -> AsyncIterator[dict]:
+        post_ids = self._post_ids_by_user.get(_object_id(user_id), set()) if user_id is not None else self._posts.keys()
+        missing = [
+            _project(self._posts[post_id], ["content_json"])
+            for post_id in list(post_ids)
+            if _is_live(self._posts[post_id]) and "word_count" not in self._posts[post_id]
+        ]
+        for post in missing:
+            yield post
+
+    async def set_missing_word_counts(self, word_counts: Dict[object, int]) -> int:
+        updated = 0
+        for post_id, count in word_counts.items():
+            post = self._posts.get(_object_id(post_id))
+            if post is not None and "word_count" not in post:
+                post["word_count"] = count
+                updated += 1
+        return updated
+
+    async def get_stats(self, user_id) -> Optional[dict]:
+        return copy.deepcopy(self._stats.get(_object_id(user_id)))
+
+    async def apply_stats_delta(self, user_id, delta: dict, activity_at: Optional[datetime] = None):
+        stats = self._stats.get(_object_id(user_id))
+        if stats is None:
+            return
+        for key, value in delta.items():
+            stats[key] = stats.get(key, 0) + value
+        if delta:
+            stats["version"] = stats.get("version", 0) + 1
+        if activity_at is not None and (stats.get("last_activity_at") is None or activity_at > stats["last_activity_at"]):
+            stats["last_activity_at"] = activity_at
+
+    async def reconcile_stats(self, user_id=None) -> int:
+        now = datetime.utcnow()
+        user_ids = [_object_id(user_id)] if user_id is not None else list(set(self._post_ids_by_user) | set(self._stats))
+        corrected = 0
+        for owner in user_ids:
+            posts = self._user_posts(owner)
+            counters = {
+                "drafts": sum(1 for post in posts if post.get("status") != "published"),
+                "published": sum(1 for post in posts if post.get("status") == "published"),
+                "total_words": sum(post.get("word_count", 0) for post in posts),
+            }
+            current = self._stats.get(owner)
+            if current is None:
+                if not posts and user_id is None:
+                    continue
+                current = self._stats[owner] = {"_id": owner, "version": 0}
+                # Like the MongoDB backend, an empty document for a user without posts is not a correction
+                corrected += 1 if posts else 0
+            elif any(current.get(field) != value for field, value in counters.items()):
+                corrected += 1
+            current.update(counters, reconciled_at=now)
+            latest = posts[0]["updated_at"] if posts else None
+            if latest is not None and (current.get("last_activity_at") is None or latest > current["last_activity_at"]):
+                current["last_activity_at"] = latest
+        return corrected
@@ -0,0 +1,325 @@
+"""
+MongoDB repositories (Motor), reading the connection set up by connect_to_mongo().
+"""
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+from bson import ObjectId
+from pymongo import InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from ..core.config import settings
+from ..db.database import get_database, get_read_database
+from .base import UNMATCHED_WRITE_ERROR, PostRepository, PostWrite, UserRepository
+
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ("drafts", "published", "total_words")
+# Recounts of one user before giving up until the next reconciliation run
+STATS_RECONCILE_ATTEMPTS = 3
+
+
+def _projection(fields: Optional[Iterable[str]]) -> Optional[dict]:
+    return {field: 1 for field in fields} if fields is not None else None
+
+
+def _write_errors(error: BulkWriteError) -> Dict[int, str]:
+    return {
+        write_error["index"]: write_error.get("errmsg", "Write failed")
+        for write_error in error.details.get("writeErrors", [])
+    }
+
+
+class MongoUserRepository(UserRepository):
+    """Users in the `users` collection, sessions in `refresh_tokens`."""
+
+    name = "mongo"
+
+    async def get_by_email(self, email: str) -> Optional[dict]:
+        return await get_database()["users"].find_one({"email": email})
+
+    async def get_by_id(self, user_id, fields: Optional[Iterable[str]] = None) -> Optional[dict]:
+        return await get_database()["users"].find_one({"_id": ObjectId(str(user_id))}, _projection(fields))
+
+    async def insert(self, user: dict) -> dict:
+        user = dict(user)
+        result = await get_database()["users"].insert_one(user)
+        user["_id"] = result.inserted_id
+        return user
+
+    async def insert_refresh_token(self, token: dict):
+        await get_database()["refresh_tokens"].insert_one(dict(token))
+
+    async def get_refresh_token(self, token_hash: str) -> Optional[dict]:
+        return await get_database()["refresh_tokens"].find_one({"token_hash": token_hash})
+
+    async def consume_refresh_token(self, token_hash: str, now: datetime) -> Optional[dict]:
+        return await get_database()["refresh_tokens"].find_one_and_update(
+            {"token_hash": token_hash, "used_at": None, "revoked_at": None, "expires_at": {"$gt": now}},
+            {"$set": {"used_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def revoke_refresh_family(self, family_id, now: datetime):
+        await get_database()["refresh_tokens"].update_many(
+            {"family_id": family_id, "revoked_at": None},
+            {"$set": {"revoked_at": now}}
+        )
+
+
+class MongoPostRepository(PostRepository):
+    """Posts in the `posts` collection, materialized stats in `user_stats`."""
+
+    name = "mongo"
+
+    @staticmethod
+    def _live(post_id=None, user_id=None) -> dict:
+        query: dict = {"is_deleted": False}
+        if post_id is not None:
+            query["_id"] = ObjectId(str(post_id))
+        if user_id is not None:
+            query["user_id"] = ObjectId(str(user_id))
+        return query
+
+    async def get(self, post_id: str, user_id=None) -> Optional[dict]:
+        return await get_database()["posts"].find_one(self._live(post_id, user_id))
+
+    async def find_by_ids(self, post_ids: Iterable[str], user_id, fields: Optional[Iterable[str]] = None) -> List[dict]:
+        query = self._live(user_id=user_id)
+        query["_id"] = {"$in": [ObjectId(post_id) for post_id in post_ids]}
+        cursor = get_database()["posts"].find(query, _projection(fields))
+        return await cursor.to_list(length=None)
+
+    async def list_by_user(self, user_id, skip: int = 0, limit: Optional[int] = None) -> List[dict]:
+        # Served by the live_posts_by_user index, on the configured read preference
+        cursor = get_read_database()["posts"].find(self._live(user_id=user_id)).sort("updated_at", -1).skip(skip)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(length=None)
+
+    async def count_by_user(self, user_id) -> int:
+        return await get_read_database()["posts"].count_documents(self._live(user_id=user_id))
+
+    async def iter_by_user(self, user_id, batch_size: int) -> AsyncIterator[dict]:
+        cursor = get_read_database()["posts"].find(
+            self._live(user_id=user_id)
+        ).sort("updated_at", -1).batch_size(batch_size)
+        try:
+            async for post in cursor:
+                yield post
+        finally:
+            await cursor.close()
+
+    async def insert(self, post: dict) -> dict:
+        post = dict(post)
+        result = await get_database()["posts"].insert_one(post)
+        post["_id"] = result.inserted_id
+        return post
+
+    async def insert_many(self, posts: List[dict]) -> Dict[int, str]:
+        try:
+            await get_database()["posts"].insert_many([dict(post) for post in posts], ordered=False)
+        except BulkWriteError as e:
+            return _write_errors(e)
+        return {}
+
+    async def update(
+        self,
+        post_id: str,
+        fields: dict,
+        user_id=None,
+        previous_fields: Optional[Iterable[str]] = None,
+        expected: Optional[dict] = None
+    ) -> Optional[dict]:
+        return await get_database()["posts"].find_one_and_update(
+            {**self._live(post_id, user_id), **(expected or {})},
+            {"$set": fields},
+            projection=_projection(previous_fields),
+            return_document=ReturnDocument.BEFORE
+        )
+
+    async def bulk_write(self, writes: List[PostWrite], user_id=None) -> Dict[int, str]:
+        requests = [
+            InsertOne(dict(write.post)) if write.post is not None
+            else UpdateOne(self._live(write.post_id, user_id), {"$set": write.fields})
+            for write in writes
+        ]
+        if not requests:
+            return {}
+        try:
+            result = await get_database()["posts"].bulk_write(requests, ordered=False)
+            errors: Dict[int, str] = {}
+            matched = result.matched_count
+        except BulkWriteError as e:
+            errors = _write_errors(e)
+            matched = e.details.get("nMatched", 0)
+
+        updates = [index for index, write in enumerate(writes) if write.post is None and index not in errors]
+        if matched < len(updates):
+            errors.update(await self._unmatched_updates(writes, updates, user_id))
+        return errors
+
+    async def _unmatched_updates(self, writes: List[PostWrite], updates: List[int], user_id=None) -> Dict[int, str]:
+        """
+        Find which updates of a bulk write matched no live post.
+
+        MongoDB only reports how many updates matched, so this re-reads the
+        targeted posts: an update took effect if its post now holds the values
+        it set. A post changed again since then is reported as unmatched too.
+        """
+        clauses = []
+        for index in updates:
+            clause = {"_id": ObjectId(str(writes[index].post_id)), **writes[index].fields}
+            if user_id is not None:
+                clause["user_id"] = ObjectId(str(user_id))
+            clauses.append(clause)
+        cursor = get_database()["posts"].find({"$or": clauses}, {"_id": 1})
+        applied = {post["_id"] async for post in cursor}
+        return {
+            index: UNMATCHED_WRITE_ERROR
+            for index in updates
+            if ObjectId(str(writes[index].post_id)) not in applied
+        }
+
+    async def purge_deleted(self, deleted_before: datetime, limit: int) -> int:
+        posts = get_database()["posts"]
+        cursor = posts.find({"is_deleted": True, "deleted_at": {"$lt": deleted_before}}, {"_id": 1}).limit(limit)
+        post_ids = [post["_id"] async for post in cursor]
+        if not post_ids:
+            return 0
+        result = await posts.delete_many({"_id": {"$in": post_ids}, "is_deleted": True})
+        return result.deleted_count
+
+    async def iter_missing_word_counts(self, user_id=None) -> AsyncIterator[dict]:
+        query = self._live(user_id=user_id)
+        query["word_count"] = {"$exists": False}
+        cursor = get_database()["posts"].find(query, {"content_json": 1}).batch_size(settings.POST_STATS_BATCH_SIZE)
+        try:
+            async for post in cursor:
+                yield post
+        finally:
+            await cursor.close()
+
+    async def set_missing_word_counts(self, word_counts: Dict[object, int]) -> int:
+        if not word_counts:
+            return 0
+        result = await get_database()["posts"].bulk_write([
+            UpdateOne({"_id": post_id, "word_count": {"$exists": False}}, {"$set": {"word_count": count}})
+            for post_id, count in word_counts.items()
+        ], ordered=False)
+        return result.modified_count
+
+    async def get_stats(self, user_id) -> Optional[dict]:
+        return await get_database()["user_stats"].find_one({"_id": ObjectId(str(user_id))})
+
+    async def apply_stats_delta(self, user_id, delta: dict, activity_at: Optional[datetime] = None):
+        update: dict = {}
+        if delta:
+            # The version lets reconciliation detect counter changes made while it aggregates
+            update["$inc"] = {**delta, "version": 1}
+        if activity_at is not None:
+            update["$max"] = {"last_activity_at": activity_at}
+        if update:
+            await get_database()["user_stats"].update_one({"_id": ObjectId(str(user_id))}, update)
+
+    def _stats_pipeline(self, user_id=None) -> list:
+        # A single user's match is served by the live_posts_by_user index
+        return [
+            {"$match": self._live(user_id=user_id)},
+            {"$group": {
+                "_id": "$user_id",
+                "drafts": {"$sum": {"$cond": [{"$eq": ["$status", "published"]}, 0, 1]}},
+                "published": {"$sum": {"$cond": [{"$eq": ["$status", "published"]}, 1, 0]}},
+                "total_words": {"$sum": {"$ifNull": ["$word_count", 0]}},
+                "last_activity_at": {"$max": "$updated_at"},
+            }},
+        ]
+
+    async def _reconcile_user(self, user_id: ObjectId, started_at: datetime) -> bool:
+        """
+        Recount one user's posts and store the counters unless a delta landed meanwhile.
+
+        The stats version is read before the posts are aggregated and the
+        write only applies if it is unchanged, so an $inc made during the
+        aggregation is never overwritten; the recount is retried instead.
+
+        Returns:
+            True if the stored counters were wrong (or created for a user with posts)
+        """
+        db = get_database()
+        for _ in range(STATS_RECONCILE_ATTEMPTS):
+            current = await db["user_stats"].find_one({"_id": user_id})
+            rows = [row async for row in db["posts"].aggregate(self._stats_pipeline(user_id))]
+            row = rows[0] if rows else {}
+            counters = {field: row.get(field, 0) for field in COUNTER_FIELDS}
+
+            if current is None:
+                document = {"_id": user_id, **counters, "version": 0, "reconciled_at": started_at}
+                if row.get("last_activity_at"):
+                    document["last_activity_at"] = row["last_activity_at"]
+                try:
+                    await db["user_stats"].insert_one(document)
+                except DuplicateKeyError:
+                    continue
+                # An empty document for a user without posts is not a correction
+                return any(counters.values())
+
+            update: dict = {"$set": {**counters, "reconciled_at": started_at}}
+            if row.get("last_activity_at"):
+                update["$max"] = {"last_activity_at": row["last_activity_at"]}
+            result = await db["user_stats"].update_one({"_id": user_id, "version": current.get("version")}, update)
+            if result.matched_count:
+                return any(current.get(field) != value for field, value in counters.items())
+
+        logger.warning("Post stats kept changing during reconciliation", extra={"user_id": str(user_id)})
+        return False
+
+    async def reconcile_stats(self, user_id=None) -> int:
+        db = get_database()
+        now = datetime.utcnow()
+        # MongoDB stores milliseconds; truncate so the stale-document comparison below is exact
+        started_at = now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+        if user_id is not None:
+            return int(await self._reconcile_user(ObjectId(str(user_id)), started_at))
+
+        corrected = 0
+
+        async def check_batch(batch: list):
+            nonlocal corrected
+            existing = {
+                stats["_id"]: stats
+                async for stats in db["user_stats"].find({"_id": {"$in": [row["_id"] for row in batch]}})
+            }
+            in_sync = []
+            for row in batch:
+                current = existing.get(row["_id"])
+                if current is not None and all(current.get(field) == row[field] for field in COUNTER_FIELDS):
+                    # Only marked reconciled if no delta landed since it was read; otherwise the
+                    # stale pass below recounts it
+                    update: dict = {"$set": {"reconciled_at": started_at}}
+                    if row.get("last_activity_at"):
+                        update["$max"] = {"last_activity_at": row["last_activity_at"]}
+                    in_sync.append(UpdateOne({"_id": row["_id"], "version": current.get("version")}, update))
+                elif await self._reconcile_user(row["_id"], started_at):
+                    corrected += 1
+            if in_sync:
+                await db["user_stats"].bulk_write(in_sync, ordered=False)
+
+        # The bulk aggregation only finds drifted users; each correction is a guarded per-user recount
+        batch = []
+        async for row in db["posts"].aggregate(self._stats_pipeline(), allowDiskUse=True):
+            batch.append(row)
+            if len(batch) >= settings.POST_STATS_BATCH_SIZE:
+                await check_batch(batch)
+                batch = []
+        if batch:
+            await check_batch(batch)
+
+        # Users left out above (no posts left, or changed while checked) that still have counters
+        stale = {"reconciled_at": {"$lt": started_at}, "$or": [{field: {"$ne": 0}} for field in COUNTER_FIELDS]}
+        stale_ids = [stats["_id"] async for stats in db["user_stats"].find(stale, {"_id": 1})]
+        for stale_id in stale_ids:
+            if await self._reconcile_user(stale_id, started_at):
+                corrected += 1
+        return corrected
@@ -0,0 +1,71 @@
+"""
+Process-wide repositories selected by STORAGE_BACKEND.
+"""
+import logging
+from typing import Optional
+from ..core.config import settings
+from .base import PostRepository, UserRepository
+
+
+logger = logging.getLogger(__name__)
+
+_users: Optional[UserRepository] = None
+_posts: Optional[PostRepository] = None
+
+
+def _create_repositories():
+    global _users, _posts
+    if settings.STORAGE_BACKEND == "memory":
+        from .memory import MemoryPostRepository, MemoryUserRepository
+
+        _users, _posts = MemoryUserRepository(), MemoryPostRepository()
+    else:
+        from .mongo import MongoPostRepository, MongoUserRepository
+
+        _users, _posts = MongoUserRepository(), MongoPostRepository()
+
+
+def open_repositories():
+    """
+    Create the configured repositories.
+    Should be called on application startup (after connect_to_mongo for the MongoDB backend).
+    """
+    if _posts is None:
+        _create_repositories()
+        logger.info("Repositories ready", extra={"backend": _posts.name})
+
+
+async def close_repositories():
+    """
+    Close the repositories; in-memory data is discarded.
+    Should be called on application shutdown.
+    """
+    global _users, _posts
+    for repository in (_users, _posts):
+        if repository is not None:
+            await repository.close()
+    _users = _posts = None
+
+
+def get_user_repository() -> UserRepository:
+    """
+    Get the user repository.
+
+    Returns:
+        The configured UserRepository (created on first use if open_repositories() has not run)
+    """
+    if _users is None:
+        _create_repositories()
+    return _users
+
+
+def get_post_repository() -> PostRepository:
+    """
+    Get the post repository.
+
+    Returns:
+        The configured PostRepository (created on first use if open_repositories() has not run)
+    """
+    if _posts is None:
+        _create_repositories()
+    return _posts
@@ -0,0 +1,61 @@
+"""
+Admin routes for operational tooling (request profiles, pool statistics).
+"""
+from fastapi import APIRouter, HTTPException, status, Depends, Response
+from ..core.profiling import profile_store
+from ..db.database import get_pool_stats
+from ..dependencies.admin_dependency import require_admin
+
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """
+    List captured request profiles, newest first.
+    
+    Returns:
+        Profile metadata (id, method, path, status, duration)
+    """
+    return {"profiles": profile_store.list()}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """
+    Download a captured profile in speedscope format (open at https://www.speedscope.app).
+    
+    Args:
+        profile_id: ID from the X-Profile-Id response header
+        
+    Returns:
+        Speedscope JSON document
+        
+    Raises:
+        HTTPException: 404 if the profile is unknown or was evicted
+    """
+    profile = profile_store.get(profile_id)
+    
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    
+    return Response(
+        content=profile,
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'}
+    )
+
+
+@router.get("/mongo/pool")
+async def mongo_pool_stats():
+    """
+    Report MongoDB connection pool usage for this worker.
+    
+    Returns:
+        Pool bounds and per-server open/checked-out/waiting connection counts
+    """
+    return get_pool_stats()
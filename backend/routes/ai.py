@@ -3,18 +3,26 @@ AI routes for generating content using Google Gemini API
 Handles summary generation and grammar correction
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from pydantic import BaseModel, Field
-from typing import Literal
+from datetime import datetime
+from bson import ObjectId
+from typing import List, Literal, Optional
 from backend.dependencies.auth_dependency import get_current_user
 from backend.core.config import settings
-import aiohttp
-import asyncio
-import traceback
+from backend.models.user_model import UserModel
+from backend.services.ai_jobs import submit_job, wait_for_job
+from backend.services.ai_tasks import run_ai_task
+from backend.services.batch_summaries import summarize_posts
+from backend.services.gemini_client import GeminiError
+from backend.services.token_budget import TokenBudgetExceeded, check_input_size
+import logging
 
 
 router = APIRouter(prefix="/api/ai", tags=["AI"])
 
+logger = logging.getLogger(__name__)
+
 
 class AIGenerateRequest(BaseModel):
     """Request schema for AI text generation"""
@@ -28,6 +36,71 @@ class AIGenerateResponse(BaseModel):
     type: str = Field(..., description="Type of generation performed")
 
 
+class AIJobCreateRequest(AIGenerateRequest):
+    """Request schema for queueing an AI job"""
+    priority: Literal["low", "normal", "high"] = Field("normal", description="Queue priority")
+
+
+class AIJobResponse(BaseModel):
+    """Status (and result, once finished) of an AI job"""
+    id: str
+    type: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    attempts: int
+    result: Optional[str] = None
+    error: Optional[str] = None
+    deduplicated: bool = False
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class BatchSummaryRequest(BaseModel):
+    """Request schema for summarizing several posts"""
+    post_ids: List[str] = Field(..., min_length=1, max_length=100, description="Posts to summarize")
+    force: bool = Field(False, description="Regenerate summaries that are still current")
+
+
+class BatchSummaryItem(BaseModel):
+    """Summary outcome for one post"""
+    post_id: str
+    success: bool
+    summary: Optional[str] = None
+    cached: bool = Field(False, description="Stored summary reused because the post has not changed")
+    error: Optional[str] = None
+
+
+class BatchSummaryResponse(BaseModel):
+    """Response schema for batch summarization"""
+    results: List[BatchSummaryItem]
+    succeeded: int
+    failed: int
+    gemini_calls: int = Field(..., description="Gemini requests made for this batch")
+
+
+def require_job_queue():
+    """Reject job requests when storage has no job queue (it lives in MongoDB)."""
+    if settings.STORAGE_BACKEND != "mongo":
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The AI job queue requires MongoDB storage"
+        )
+
+
+def job_to_response(job: dict, deduplicated: bool = False) -> AIJobResponse:
+    """Convert an ai_jobs document to the response schema."""
+    return AIJobResponse(
+        id=str(job["_id"]),
+        type=job["type"],
+        status=job["status"],
+        attempts=job["attempts"],
+        result=job.get("result"),
+        error=job.get("error"),
+        deduplicated=deduplicated,
+        created_at=job["created_at"],
+        finished_at=job.get("finished_at")
+    )
+
+
 @router.post("/generate", response_model=AIGenerateResponse)
 async def generate_ai_content(
     request: AIGenerateRequest,
@@ -45,95 +118,134 @@ async def generate_ai_content(
     """
     try:
         if not settings.GEMINI_API_KEY:
-            print("ERROR: GEMINI_API_KEY not configured")
+            logger.error("GEMINI_API_KEY not configured")
             raise HTTPException(status_code=500, detail="Gemini API key not configured")
         
-        print(f"AI Request: type={request.type}, content_length={len(request.content)}")
-        
-        # Build prompt
-        if request.type == "summary":
-            prompt = f"""Generate a concise professional summary of the following blog post. 
-The summary should be 2-3 sentences and capture the main points clearly.
-
-Blog content:
-{request.content}
-
-Professional Summary:"""
-        else:  # grammar
-            prompt = f"""Fix all grammar mistakes and improve the clarity of the following text. 
-Do not change the meaning or core message. Keep the same tone and style.
-Only return the corrected text, without any explanations.
-
-Original text:
-{request.content}
-
-Corrected text:"""
-        
-        # Prepare request payload for Gemini REST API
-        payload = {
-            "contents": [{
-                "parts": [{"text": prompt}]
-            }],
-            "generationConfig": {
-                "temperature": 0.7,
-                "topK": 40,
-                "topP": 0.95,
-                "maxOutputTokens": 1024,
-            }
-        }
+        logger.info("AI request", extra={"ai_type": request.type, "content_length": len(request.content)})
         
-        # Make request to Gemini API (using Gemini 2.5 Flash - latest working model)
-        # Using header-based authentication for better security
-        url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
-        headers = {
-            "Content-Type": "application/json",
-            "x-goog-api-key": settings.GEMINI_API_KEY
-        }
+        try:
+            text = await run_ai_task(request.type, request.content)
+        except TokenBudgetExceeded as e:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+        except GeminiError as e:
+            headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+            raise HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
         
-        print("Calling Gemini API [REDACTED]")
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=headers) as response:
-                response_text = await response.text()
-                
-                if response.status != 200:
-                    print(f"Gemini API Error {response.status}: {response_text}")
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Gemini API error ({response.status}): {response_text[:200]}"
-                    )
-                
-                try:
-                    data = await response.json()
-                except Exception as json_err:
-                    print(f"JSON Parse Error: {json_err}, Response: {response_text}")
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Failed to parse API response: {str(json_err)}"
-                    )
-                
-                # Extract generated text
-                try:
-                    result = data["candidates"][0]["content"]["parts"][0]["text"]
-                    print(f"AI Generation Success: {len(result)} chars")
-                    return AIGenerateResponse(
-                        result=result.strip(),
-                        type=request.type
-                    )
-                except (KeyError, IndexError) as e:
-                    print(f"Response Format Error: {e}, Data: {str(data)[:500]}")
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Unexpected API response format: {str(e)}, Response: {str(data)[:200]}"
-                    )
+        return AIGenerateResponse(
+            result=text,
+            type=request.type
+        )
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"UNEXPECTED ERROR in AI endpoint: {type(e).__name__}: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Unexpected error in AI endpoint")
         raise HTTPException(
             status_code=500,
             detail=f"AI generation failed: {type(e).__name__}: {str(e)}"
         )
 
+
+@router.post(
+    "/jobs",
+    response_model=AIJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_job_queue)]
+)
+async def create_ai_job(
+    request: AIJobCreateRequest,
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Queue an AI generation job and return immediately.
+    
+    An identical job (same user, type and content) that is still pending is
+    returned instead of queueing a duplicate. Poll `GET /api/ai/jobs/{id}`
+    (optionally with `wait` to long-poll) for the result.
+    """
+    if not settings.GEMINI_API_KEY:
+        raise HTTPException(status_code=500, detail="Gemini API key not configured")
+    
+    # Reject oversized input now rather than failing in a worker later
+    try:
+        check_input_size(request.content)
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    
+    job, deduplicated = await submit_job(current_user.id, request.type, request.content, request.priority)
+    
+    return job_to_response(job, deduplicated)
+
+
+@router.get("/jobs/{job_id}", response_model=AIJobResponse, dependencies=[Depends(require_job_queue)])
+async def get_ai_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to wait for the job to finish (long polling)"),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Get the status of an AI job, waiting up to `wait` seconds for it to finish.
+    
+    Finished jobs are kept for AI_JOB_RESULT_TTL_SECONDS.
+    """
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid job ID format"
+        )
+    
+    job = await wait_for_job(job_id, current_user.id, min(wait, settings.AI_JOB_MAX_WAIT_SECONDS))
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    return job_to_response(job)
+
+
+@router.post("/summaries/batch", response_model=BatchSummaryResponse)
+async def summarize_posts_batch(
+    request: BatchSummaryRequest,
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Summarize several of the current user's posts.
+    
+    Post text is read server-side, several short posts are packed into each
+    Gemini request and packs run concurrently. Summaries are stored on the
+    posts and reused until the post is edited again.
+    """
+    if not settings.GEMINI_API_KEY:
+        raise HTTPException(status_code=500, detail="Gemini API key not configured")
+    
+    invalid = [post_id for post_id in request.post_ids if not ObjectId.is_valid(post_id)]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid post ID format: {invalid[0]}"
+        )
+    
+    # Each post is summarized once even if listed twice
+    post_ids = list(dict.fromkeys(request.post_ids))
+    batch = await summarize_posts(post_ids, current_user.id, force=request.force)
+    
+    results = [
+        BatchSummaryItem(
+            post_id=outcome.post_id,
+            success=outcome.summary is not None,
+            summary=outcome.summary,
+            cached=outcome.cached,
+            error=outcome.error
+        )
+        for outcome in batch.outcomes
+    ]
+    succeeded = sum(1 for result in results if result.success)
+    
+    return BatchSummaryResponse(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        gemini_calls=batch.gemini_calls
+    )
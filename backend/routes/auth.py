@@ -7,13 +7,21 @@ from ..schemas.user_schema import (
     UserRegisterSchema,
     UserLoginSchema,
     TokenSchema,
+    RefreshTokenSchema,
     UserResponseSchema,
     MessageSchema
 )
 from ..models.user_model import UserModel
+from ..core.config import settings
 from ..core.security import hash_password, verify_password, create_access_token
-from ..db.database import get_database
 from ..dependencies.auth_dependency import get_current_user
+from ..repositories.provider import get_user_repository
+from ..services.refresh_tokens import (
+    RefreshTokenError,
+    issue_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token
+)
 
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
@@ -33,10 +41,10 @@ async def register(user_data: UserRegisterSchema):
     Raises:
         HTTPException: If email already exists
     """
-    db = get_database()
+    users = get_user_repository()
     
     # Check if user already exists
-    existing_user = await db["users"].find_one({"email": user_data.email})
+    existing_user = await users.get_by_email(user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -54,11 +62,11 @@ async def register(user_data: UserRegisterSchema):
     
     # Insert into database
     user_dict = new_user.model_dump(by_alias=True, exclude={"id"})
-    result = await db["users"].insert_one(user_dict)
+    stored_user = await users.insert(user_dict)
     
     # Return user data
     return UserResponseSchema(
-        id=str(result.inserted_id),
+        id=str(stored_user["_id"]),
         email=new_user.email,
         created_at=new_user.created_at,
         is_active=new_user.is_active
@@ -68,21 +76,19 @@ async def register(user_data: UserRegisterSchema):
 @router.post("/login", response_model=TokenSchema)
 async def login(user_credentials: UserLoginSchema):
     """
-    Login and receive a JWT access token.
+    Login and receive a JWT access token and a refresh token.
     
     Args:
         user_credentials: User login credentials (email and password)
         
     Returns:
-        JWT access token
+        JWT access token and refresh token
         
     Raises:
         HTTPException: If credentials are invalid
     """
-    db = get_database()
-    
     # Find user by email
-    user_dict = await db["users"].find_one({"email": user_credentials.email})
+    user_dict = await get_user_repository().get_by_email(user_credentials.email)
     if not user_dict:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -107,10 +113,87 @@ async def login(user_credentials: UserLoginSchema):
             detail="Account is inactive"
         )
     
-    # Create access token
+    # Create access token and start a refresh session
     access_token = create_access_token(data={"sub": user.email})
+    refresh_token = await issue_refresh_token(user.id)
+    
+    return TokenSchema(
+        access_token=access_token,
+        token_type="bearer",
+        refresh_token=refresh_token,
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    )
+
+
+@router.post("/refresh", response_model=TokenSchema)
+async def refresh(token_data: RefreshTokenSchema):
+    """
+    Exchange a refresh token for a new access token and refresh token.
+    
+    No password check is involved; the presented refresh token is consumed
+    and replaced. Reusing an already exchanged token revokes the session.
+    
+    Args:
+        token_data: Refresh token from login or the previous refresh
+        
+    Returns:
+        New JWT access token and refresh token
+        
+    Raises:
+        HTTPException: 401 if the token is invalid, expired, revoked or reused, 403 if the account is inactive
+    """
+    try:
+        user_id, refresh_token = await rotate_refresh_token(token_data.refresh_token)
+    except RefreshTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user_dict = await get_user_repository().get_by_id(user_id, fields=("email", "is_active"))
+    
+    if not user_dict:
+        await revoke_refresh_token(refresh_token)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if not user_dict.get("is_active", True):
+        await revoke_refresh_token(refresh_token)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is inactive"
+        )
+    
+    access_token = create_access_token(data={"sub": user_dict["email"]})
+    
+    return TokenSchema(
+        access_token=access_token,
+        token_type="bearer",
+        refresh_token=refresh_token,
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    )
+
+
+@router.post("/logout", response_model=MessageSchema)
+async def logout(token_data: RefreshTokenSchema):
+    """
+    End the session a refresh token belongs to.
+    
+    Access tokens already issued stay valid until they expire.
+    
+    Args:
+        token_data: Refresh token of the session
+        
+    Returns:
+        Confirmation message
+    """
+    await revoke_refresh_token(token_data.refresh_token)
     
-    return TokenSchema(access_token=access_token, token_type="bearer")
+    return MessageSchema(message="Logged out")
 
 
 @router.get("/protected", response_model=MessageSchema)
@@ -0,0 +1,110 @@
+"""
+WebSocket route for real-time collaborative post editing.
+"""
+import json
+from bson import ObjectId
+from fastapi import APIRouter, Depends, WebSocket, WebSocketException, status
+
+from ..models.user_model import UserModel
+from ..core.config import settings
+from ..repositories.provider import get_post_repository
+from ..dependencies.auth_dependency import get_websocket_user
+from ..services.collab import CollabJoinError, collab_manager
+from ..services.collab_document import CollabOperationError
+
+
+router = APIRouter(prefix="/api/posts", tags=["Collaboration"])
+
+# Application close codes (4000-4999 range)
+CLOSE_BAD_OPERATION = 4400
+CLOSE_NOT_FOUND = 4404
+CLOSE_ROOM_ELSEWHERE = 4409
+CLOSE_ROOM_FULL = 4429
+
+
+@router.websocket("/{post_id}/collab")
+async def collaborate(
+    websocket: WebSocket,
+    post_id: str,
+    current_user: UserModel = Depends(get_websocket_user)
+):
+    """
+    Collaborative editing session for a post (owner only).
+    
+    Protocol (JSON text frames):
+    - server → client `sync`: full replica state and the client's `site` id
+    - client → server `ops`: `{"type": "ops", "ops": [...]}`, each op has `kind`
+      (insert/update/delete/title) and a Lamport `clock`
+    - server → client `ack`: sequence number after the client's batch
+    - server → other clients `ops`: the effective operations with the author's `site`
+    - `ping` / `pong` keep-alive
+    
+    Edits are snapshotted into `content_json` periodically and when the last
+    session leaves. An invalid operation closes the socket with 4400; the
+    client should reconnect and resync. Binary frames close it with 1003.
+    
+    One instance owns a post's room at a time: connecting to another one
+    closes with 4409, so load balancers must route this path sticky per post.
+    If the post is changed outside the room (e.g. a PATCH autosave) the room
+    is discarded with 1012 rather than overwriting it; clients reconnect.
+    """
+    if not ObjectId.is_valid(post_id):
+        raise WebSocketException(code=CLOSE_NOT_FOUND, reason="Invalid post ID format")
+    
+    post = await get_post_repository().get(post_id, user_id=current_user.id)
+    
+    if not post:
+        raise WebSocketException(code=CLOSE_NOT_FOUND, reason="Post not found")
+    
+    await websocket.accept()
+    try:
+        session = await collab_manager.join(post, websocket)
+    except CollabJoinError as e:
+        code = CLOSE_ROOM_FULL if e.kind == "full" else CLOSE_ROOM_ELSEWHERE
+        await websocket.close(code=code, reason=str(e))
+        return
+    
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                break
+            raw = frame.get("text")
+            if raw is None:
+                await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason="Text frames only")
+                break
+            if len(raw) > settings.COLLAB_MAX_MESSAGE_BYTES:
+                await websocket.close(code=status.WS_1009_MESSAGE_TOO_BIG)
+                break
+            
+            try:
+                message = json.loads(raw)
+            except json.JSONDecodeError:
+                await websocket.close(code=CLOSE_BAD_OPERATION, reason="Invalid JSON")
+                break
+            
+            if not isinstance(message, dict):
+                await websocket.close(code=CLOSE_BAD_OPERATION, reason="Unsupported message")
+                break
+            
+            if message.get("type") == "ping":
+                session.send({"type": "pong"})
+                continue
+            
+            ops = message.get("ops")
+            if message.get("type") != "ops" or not isinstance(ops, list):
+                await websocket.close(code=CLOSE_BAD_OPERATION, reason="Unsupported message")
+                break
+            
+            try:
+                seq = collab_manager.apply(post_id, session, ops)
+            except CollabOperationError as e:
+                await websocket.close(code=CLOSE_BAD_OPERATION, reason=str(e)[:120])
+                break
+            if seq is None:
+                # The room was discarded and this socket is being closed
+                break
+            
+            session.send({"type": "ack", "seq": seq})
+    finally:
+        await collab_manager.leave(post_id, session)
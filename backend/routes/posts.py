@@ -1,25 +1,51 @@
 """
 Routes for blog post management.
 """
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 from bson import ObjectId
-from typing import List
+from typing import List, Optional
+from pydantic import ValidationError
+import json
+import zlib
 
 from ..schemas.post_schema import (
     PostCreateSchema,
     PostUpdateSchema,
     PostResponseSchema,
-    PostListResponseSchema
+    PostListResponseSchema,
+    PostStatsResponseSchema,
+    PostBulkRequestSchema,
+    PostBulkItemResultSchema,
+    PostBulkResponseSchema,
+    PostImportItemSchema,
+    PostImportErrorSchema,
+    PostImportResponseSchema,
+    PostSimilarResponseSchema,
+    SimilarPostSchema
 )
 from ..models.post_model import PostModel
 from ..models.user_model import UserModel
-from ..db.database import get_database
+from ..schemas.user_schema import MessageSchema
+from ..cache.keys import invalidate_user_posts, user_posts_generation, user_posts_key
+from ..cache.provider import get_cache
+from ..core.config import settings
+from ..core.metrics import record_cache_lookup
+from ..core.tracing import tracer
 from ..dependencies.auth_dependency import get_current_user
+from ..repositories.base import PostWrite
+from ..repositories.provider import get_post_repository
+from ..services.lexical import count_words, encode_for_storage, expand_lexical
+from ..services.post_stats import apply_stats_delta, get_user_stats, merge_deltas, post_delta, status_delta
+from ..services.similarity import drop_user_index, find_similar, index_post, remove_post
 
 
 router = APIRouter(prefix="/api/posts", tags=["Posts"])
 
+# Maximum number of rejected lines reported back from an import
+MAX_IMPORT_ERRORS = 100
+
 
 def post_to_response(post_dict: dict) -> PostResponseSchema:
     """Convert MongoDB post document to response schema."""
@@ -27,10 +53,11 @@ def post_to_response(post_dict: dict) -> PostResponseSchema:
         id=str(post_dict["_id"]),
         user_id=str(post_dict["user_id"]),
         title=post_dict["title"],
-        content_json=post_dict["content_json"],
+        content_json=expand_lexical(post_dict["content_json"]),
         status=post_dict["status"],
         created_at=post_dict["created_at"],
-        updated_at=post_dict["updated_at"]
+        updated_at=post_dict["updated_at"],
+        summary=post_dict.get("summary")
     )
 
 
@@ -49,8 +76,6 @@ async def create_post(
     Returns:
         Newly created post information
     """
-    db = get_database()
-    
     # Get user_id as ObjectId
     user_object_id = ObjectId(str(current_user.id))
     
@@ -58,43 +83,205 @@ async def create_post(
     new_post = PostModel(
         user_id=user_object_id,  # type: ignore
         title=post_data.title or "Untitled",
-        content_json=post_data.content_json or {},
+        content_json=encode_for_storage(post_data.content_json or {}),
         status="draft",
+        word_count=count_words(post_data.content_json or {}),
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
     
     # Insert into database
     post_dict = new_post.model_dump(by_alias=True, exclude={"id"})
-    # Convert user_id back to ObjectId for MongoDB storage
+    # Convert user_id back to ObjectId for storage
     post_dict["user_id"] = user_object_id
-    result = await db["posts"].insert_one(post_dict)
+    created_post = await get_post_repository().insert(post_dict)
     
-    # Fetch the created post
-    created_post = await db["posts"].find_one({"_id": result.inserted_id})
+    await invalidate_user_posts(user_object_id)
+    index_post(user_object_id, created_post)
+    await apply_stats_delta(user_object_id, post_delta(post_dict), post_dict["updated_at"])
     
     return post_to_response(created_post)
 
 
+@router.post("/bulk", response_model=PostBulkResponseSchema)
+async def bulk_posts(
+    bulk_data: PostBulkRequestSchema,
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Apply a batch of create/update/publish/delete operations in one round trip.
+    
+    All operations are validated together, then applied with a single
+    unordered bulk write scoped to the current user's posts.
+    
+    Args:
+        bulk_data: List of operations to apply
+        current_user: Current authenticated user
+        
+    Returns:
+        Per-operation results in request order
+        
+    Raises:
+        HTTPException: 400 if a post ID is malformed or targeted more than once
+    """
+    repository = get_post_repository()
+    user_object_id = ObjectId(str(current_user.id))
+    operations = bulk_data.operations
+    
+    # Validate all target IDs before touching the database
+    target_indexes: dict = {}
+    for index, operation in enumerate(operations):
+        if operation.op == "create":
+            continue
+        
+        if not ObjectId.is_valid(operation.post_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid post ID format at index {index}"
+            )
+        
+        # Unordered writes give no ordering guarantee between operations on the same post
+        if operation.post_id in target_indexes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    f"Post {operation.post_id} is targeted by more than one operation "
+                    f"(indexes {target_indexes[operation.post_id]} and {index})"
+                )
+            )
+        target_indexes[operation.post_id] = index
+    
+    # Resolve ownership (and the state stats deltas start from) with a single query
+    owned_posts: dict = {}
+    if target_indexes:
+        found = await repository.find_by_ids(target_indexes, user_object_id, fields=("status", "word_count"))
+        owned_posts = {str(post["_id"]): post for post in found}
+    
+    now = datetime.utcnow()
+    results: List[Optional[PostBulkItemResultSchema]] = [None] * len(operations)
+    write_requests: List[PostWrite] = []
+    write_indexes: List[int] = []
+    write_deltas: List[dict] = []
+    
+    for index, operation in enumerate(operations):
+        if operation.op == "create":
+            new_post = PostModel(
+                user_id=user_object_id,  # type: ignore
+                title=operation.title or "Untitled",
+                content_json=encode_for_storage(operation.content_json or {}),
+                status="draft",
+                word_count=count_words(operation.content_json or {}),
+                created_at=now,
+                updated_at=now
+            )
+            post_dict = new_post.model_dump(by_alias=True, exclude={"id"})
+            post_dict["_id"] = ObjectId()
+            post_dict["user_id"] = user_object_id
+            write_requests.append(PostWrite.insert(post_dict))
+            write_deltas.append(post_delta(post_dict))
+            post_id = str(post_dict["_id"])
+        else:
+            post_id = operation.post_id
+            
+            if post_id not in owned_posts:
+                results[index] = PostBulkItemResultSchema(
+                    index=index,
+                    op=operation.op,
+                    post_id=post_id,
+                    success=False,
+                    error="Post not found"
+                )
+                continue
+            
+            owned_post = owned_posts[post_id]
+            
+            if operation.op == "update":
+                update_data: dict = {"updated_at": now}
+                delta: dict = {}
+                if operation.title is not None:
+                    update_data["title"] = operation.title
+                if operation.content_json is not None:
+                    update_data["content_json"] = encode_for_storage(operation.content_json)
+                    update_data["word_count"] = count_words(operation.content_json)
+                    delta = {"total_words": update_data["word_count"] - owned_post.get("word_count", 0)}
+                write_requests.append(PostWrite.update(post_id, update_data))
+                write_deltas.append(delta)
+            elif operation.op == "publish":
+                write_requests.append(PostWrite.update(post_id, {"status": "published", "updated_at": now}))
+                write_deltas.append(merge_deltas(status_delta(owned_post.get("status"), -1), status_delta("published")))
+            else:
+                write_requests.append(PostWrite.update(post_id, {"is_deleted": True, "deleted_at": now}))
+                write_deltas.append(post_delta(owned_post, -1))
+        
+        write_indexes.append(index)
+        results[index] = PostBulkItemResultSchema(
+            index=index,
+            op=operation.op,
+            post_id=post_id,
+            success=True
+        )
+    
+    if write_requests:
+        # Unordered writes keep going past failures; mark only the failed items, including
+        # posts deleted since the ownership lookup, and leave their stats deltas out
+        failed_writes = await repository.bulk_write(write_requests, user_id=user_object_id)
+        for position, error in failed_writes.items():
+            index = write_indexes[position]
+            results[index] = results[index].model_copy(update={"success": False, "error": error})
+        
+        await invalidate_user_posts(user_object_id)
+        drop_user_index(user_object_id)
+        await apply_stats_delta(
+            user_object_id,
+            merge_deltas(*(delta for position, delta in enumerate(write_deltas) if position not in failed_writes)),
+            now
+        )
+    
+    succeeded = sum(1 for result in results if result.success)
+    
+    return PostBulkResponseSchema(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded
+    )
+
+
 @router.get("/", response_model=PostListResponseSchema)
 async def get_all_posts(
+    skip: int = Query(0, ge=0, description="Number of posts to skip"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of posts to return"),
     current_user: UserModel = Depends(get_current_user)
 ):
     """
-    Get all posts for the current logged-in user.
+    Get the posts of the current logged-in user, newest first.
     
     Args:
+        skip: Number of posts to skip
+        limit: Maximum number of posts to return (all if omitted)
         current_user: Current authenticated user
         
     Returns:
-        List of user's posts with total count
+        Page of the user's posts with the total count
     """
-    db = get_database()
-    
-    # Find all posts by current user
+    repository = get_post_repository()
     user_id_str = str(current_user.id)
-    cursor = db["posts"].find({"user_id": ObjectId(user_id_str)}).sort("updated_at", -1)
-    posts = await cursor.to_list(length=None)
+    
+    # Pages are read straight from storage; only the full list is cached
+    if skip or limit is not None:
+        posts = await repository.list_by_user(user_id_str, skip=skip, limit=limit)
+        return PostListResponseSchema(
+            posts=[post_to_response(post) for post in posts],
+            total=await repository.count_by_user(user_id_str)
+        )
+    
+    cache = get_cache()
+    cache_key = user_posts_key(user_id_str, await user_posts_generation(user_id_str))
+    posts = await cache.get(cache_key)
+    record_cache_lookup("posts", posts is not None)
+    
+    if posts is None:
+        posts = await repository.list_by_user(user_id_str)
+        await cache.set(cache_key, posts, settings.CACHE_POST_TTL_SECONDS)
     
     # Convert to response schema
     post_responses = [post_to_response(post) for post in posts]
@@ -105,6 +292,212 @@ async def get_all_posts(
     )
 
 
+@router.get("/stats", response_model=PostStatsResponseSchema)
+async def get_post_stats(
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Get post counts, total words and last activity for the current user.
+    
+    Reads the counters maintained on every post write, so the cost does not
+    depend on the number of posts.
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Returns:
+        Per-user post statistics
+    """
+    stats = await get_user_stats(current_user.id)
+    drafts = stats.get("drafts", 0)
+    published = stats.get("published", 0)
+    
+    return PostStatsResponseSchema(
+        drafts=drafts,
+        published=published,
+        total=drafts + published,
+        total_words=stats.get("total_words", 0),
+        last_activity_at=stats.get("last_activity_at")
+    )
+
+
+@router.get("/export")
+async def export_posts(
+    gzip: bool = Query(False, description="Gzip-compress the NDJSON stream"),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Stream all posts of the current user as NDJSON (one post per line).
+    
+    Posts are read from storage in bounded batches and written out as they
+    arrive, so memory use does not grow with the number of posts.
+    
+    Args:
+        gzip: Whether to gzip-compress the stream
+        current_user: Current authenticated user
+        
+    Returns:
+        Streaming NDJSON response
+    """
+    posts = get_post_repository().iter_by_user(current_user.id, settings.POST_EXPORT_BATCH_SIZE)
+    
+    async def generate_lines():
+        compressor = zlib.compressobj(wbits=31) if gzip else None
+        try:
+            async for post in posts:
+                line = (post_to_response(post).model_dump_json() + "\n").encode("utf-8")
+                if compressor:
+                    line = compressor.compress(line)
+                    if not line:
+                        continue
+                yield line
+            
+            if compressor:
+                yield compressor.flush()
+        finally:
+            await posts.aclose()
+    
+    filename = "posts.ndjson.gz" if gzip else "posts.ndjson"
+    return StreamingResponse(
+        generate_lines(),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/import", response_model=PostImportResponseSchema)
+async def import_posts(
+    request: Request,
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Import posts from an NDJSON body (one post per line, as produced by export).
+    
+    The body is parsed line by line as it streams in and inserted in bounded
+    batches. Gzip bodies are accepted with `Content-Encoding: gzip` or
+    `Content-Type: application/gzip`. Imported posts always get new IDs and
+    belong to the current user.
+    
+    Args:
+        request: Incoming request whose body is streamed
+        current_user: Current authenticated user
+        
+    Returns:
+        Import counts and the first rejected lines
+        
+    Raises:
+        HTTPException: 413 if a single line exceeds the size limit, 400 if the gzip stream is corrupt
+    """
+    repository = get_post_repository()
+    user_object_id = ObjectId(str(current_user.id))
+    
+    gzipped = (
+        request.headers.get("content-encoding", "").lower() == "gzip"
+        or request.headers.get("content-type", "").lower().startswith("application/gzip")
+    )
+    decompressor = zlib.decompressobj(wbits=31) if gzipped else None
+    
+    batch: list = []
+    batch_lines: List[int] = []
+    errors: List[PostImportErrorSchema] = []
+    imported = 0
+    failed = 0
+    line_number = 0
+    
+    def reject(line: int, error: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_IMPORT_ERRORS:
+            errors.append(PostImportErrorSchema(line=line, error=error))
+    
+    async def flush_batch():
+        nonlocal imported
+        if not batch:
+            return
+        failed_writes = await repository.insert_many(batch)
+        imported += len(batch) - len(failed_writes)
+        for position, error in failed_writes.items():
+            reject(batch_lines[position], error)
+        await apply_stats_delta(
+            user_object_id,
+            merge_deltas(*(post_delta(post) for position, post in enumerate(batch) if position not in failed_writes)),
+            datetime.utcnow()
+        )
+        batch.clear()
+        batch_lines.clear()
+    
+    async def handle_line(raw_line: bytes):
+        nonlocal line_number
+        line_number += 1
+        
+        if not raw_line.strip():
+            return
+        
+        try:
+            item = PostImportItemSchema.model_validate(json.loads(raw_line))
+        except json.JSONDecodeError:
+            reject(line_number, "Invalid JSON")
+            return
+        except ValidationError as e:
+            reject(line_number, f"Invalid post: {e.errors()[0]['msg']}")
+            return
+        
+        now = datetime.utcnow()
+        new_post = PostModel(
+            user_id=user_object_id,  # type: ignore
+            title=item.title,
+            content_json=encode_for_storage(item.content_json),
+            status=item.status,
+            word_count=count_words(item.content_json),
+            created_at=item.created_at or now,
+            updated_at=item.updated_at or now
+        )
+        post_dict = new_post.model_dump(by_alias=True, exclude={"id"})
+        post_dict["user_id"] = user_object_id
+        batch.append(post_dict)
+        batch_lines.append(line_number)
+        
+        if len(batch) >= settings.POST_IMPORT_BATCH_SIZE:
+            await flush_batch()
+    
+    buffer = b""
+    try:
+        async for chunk in request.stream():
+            if decompressor:
+                chunk = decompressor.decompress(chunk)
+            
+            lines = (buffer + chunk).split(b"\n")
+            buffer = lines.pop()
+            
+            if len(buffer) > settings.POST_IMPORT_MAX_LINE_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Line {line_number + len(lines) + 1} exceeds the maximum line size"
+                )
+            
+            for raw_line in lines:
+                await handle_line(raw_line)
+        
+        if decompressor:
+            buffer += decompressor.flush()
+    except zlib.error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid gzip body"
+        )
+    
+    for raw_line in buffer.split(b"\n"):
+        await handle_line(raw_line)
+    
+    await flush_batch()
+    
+    if imported:
+        await invalidate_user_posts(user_object_id)
+        drop_user_index(user_object_id)
+    
+    return PostImportResponseSchema(imported=imported, failed=failed, errors=errors)
+
+
 @router.get("/{post_id}", response_model=PostResponseSchema)
 async def get_post(
     post_id: str,
@@ -123,7 +516,7 @@ async def get_post(
     Raises:
         HTTPException: 404 if post not found, 403 if not owner
     """
-    db = get_database()
+    repository = get_post_repository()
     
     # Validate ObjectId
     if not ObjectId.is_valid(post_id):
@@ -132,8 +525,8 @@ async def get_post(
             detail="Invalid post ID format"
         )
     
-    # Find post
-    post = await db["posts"].find_one({"_id": ObjectId(post_id)})
+    # Not cached: a single post is one indexed read, and editors must see their latest save
+    post = await repository.get(post_id)
     
     if not post:
         raise HTTPException(
@@ -151,6 +544,53 @@ async def get_post(
     return post_to_response(post)
 
 
+@router.get("/{post_id}/related", response_model=PostSimilarResponseSchema)
+async def get_related_posts(
+    post_id: str,
+    limit: int = Query(5, ge=1, le=50, description="Maximum results per list"),
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Find the current user's posts related to a post, and its near-duplicates.
+    
+    Related posts are ranked by TF-IDF cosine similarity of their text;
+    near-duplicates are posts whose word shingles mostly overlap (MinHash/LSH).
+    Both are answered from a per-user in-memory index without scanning all posts.
+    
+    Args:
+        post_id: Post ID
+        limit: Maximum results per list
+        current_user: Current authenticated user
+        
+    Returns:
+        Related posts and near-duplicates, most similar first
+        
+    Raises:
+        HTTPException: 404 if post not found
+    """
+    # Validate ObjectId
+    if not ObjectId.is_valid(post_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid post ID format"
+        )
+    
+    post = await get_post_repository().get(post_id, user_id=current_user.id)
+    
+    if not post:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found"
+        )
+    
+    related, duplicates = await find_similar(current_user.id, post, limit)
+    
+    return PostSimilarResponseSchema(
+        related=[SimilarPostSchema(post_id=pid, title=title, score=score) for pid, title, score in related],
+        duplicates=[SimilarPostSchema(post_id=pid, title=title, score=score) for pid, title, score in duplicates]
+    )
+
+
 @router.patch("/{post_id}", response_model=PostResponseSchema)
 async def update_post(
     post_id: str,
@@ -171,7 +611,7 @@ async def update_post(
     Raises:
         HTTPException: 404 if post not found, 403 if not owner
     """
-    db = get_database()
+    repository = get_post_repository()
     
     # Validate ObjectId
     if not ObjectId.is_valid(post_id):
@@ -181,7 +621,7 @@ async def update_post(
         )
     
     # Find post
-    post = await db["posts"].find_one({"_id": ObjectId(post_id)})
+    post = await repository.get(post_id)
     
     if not post:
         raise HTTPException(
@@ -203,18 +643,32 @@ async def update_post(
         update_data["title"] = post_data.title
     
     if post_data.content_json is not None:
-        update_data["content_json"] = post_data.content_json
+        update_data["content_json"] = encode_for_storage(post_data.content_json)
+        update_data["word_count"] = count_words(post_data.content_json)
     
-    # Update post
-    await db["posts"].update_one(
-        {"_id": ObjectId(post_id)},
-        {"$set": update_data}
-    )
+    # Update post; the previous version gives the exact word count delta
+    previous_post = await repository.update(post_id, update_data, previous_fields=("word_count",))
     
-    # Fetch updated post
-    updated_post = await db["posts"].find_one({"_id": ObjectId(post_id)})
+    if not previous_post:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found"
+        )
     
-    return post_to_response(updated_post)
+    # Fetch updated post (deleted in the meantime: answer with what was written)
+    updated_post = await repository.get(post_id) or {**post, **update_data}
+    
+    await invalidate_user_posts(post["user_id"])
+    if "title" in update_data or "content_json" in update_data:
+        index_post(post["user_id"], updated_post)
+    
+    delta = {}
+    if "word_count" in update_data:
+        delta = {"total_words": update_data["word_count"] - previous_post.get("word_count", 0)}
+    await apply_stats_delta(post["user_id"], merge_deltas(delta), update_data["updated_at"])
+    
+    with tracer.start_as_current_span("posts.serialize"):
+        return post_to_response(updated_post)
 
 
 @router.post("/{post_id}/publish", response_model=PostResponseSchema)
@@ -235,7 +689,7 @@ async def publish_post(
     Raises:
         HTTPException: 404 if post not found, 403 if not owner
     """
-    db = get_database()
+    repository = get_post_repository()
     
     # Validate ObjectId
     if not ObjectId.is_valid(post_id):
@@ -245,7 +699,7 @@ async def publish_post(
         )
     
     # Find post
-    post = await db["posts"].find_one({"_id": ObjectId(post_id)})
+    post = await repository.get(post_id)
     
     if not post:
         raise HTTPException(
@@ -260,13 +714,90 @@ async def publish_post(
             detail="You don't have permission to publish this post"
         )
     
-    # Update to published
-    await db["posts"].update_one(
-        {"_id": ObjectId(post_id)},
-        {"$set": {"status": "published", "updated_at": datetime.utcnow()}}
+    # Update to published; the previous status decides whether the counters move
+    now = datetime.utcnow()
+    previous_post = await repository.update(
+        post_id,
+        {"status": "published", "updated_at": now},
+        previous_fields=("status",)
     )
     
-    # Fetch updated post
-    updated_post = await db["posts"].find_one({"_id": ObjectId(post_id)})
+    if not previous_post:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found"
+        )
+    
+    # Fetch updated post (deleted in the meantime: answer with what was written)
+    updated_post = await repository.get(post_id) or {**post, "status": "published", "updated_at": now}
+    
+    await invalidate_user_posts(post["user_id"])
+    await apply_stats_delta(
+        post["user_id"],
+        merge_deltas(status_delta(previous_post.get("status"), -1), status_delta("published")),
+        now
+    )
     
     return post_to_response(updated_post)
+
+
+@router.delete("/{post_id}", response_model=MessageSchema)
+async def delete_post(
+    post_id: str,
+    current_user: UserModel = Depends(get_current_user)
+):
+    """
+    Delete a post (only if owned by current user).
+    
+    The post is tombstoned immediately and physically removed by the
+    background purge once the retention period has passed.
+    
+    Args:
+        post_id: Post ID
+        current_user: Current authenticated user
+        
+    Returns:
+        Confirmation message
+        
+    Raises:
+        HTTPException: 404 if post not found, 403 if not owner
+    """
+    repository = get_post_repository()
+    
+    # Validate ObjectId
+    if not ObjectId.is_valid(post_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid post ID format"
+        )
+    
+    # Find post
+    post = await repository.get(post_id)
+    
+    if not post:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found"
+        )
+    
+    # Verify ownership
+    if str(post["user_id"]) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to delete this post"
+        )
+    
+    # Tombstone the post; only the request that actually deletes it adjusts the counters
+    now = datetime.utcnow()
+    previous_post = await repository.update(
+        post_id,
+        {"is_deleted": True, "deleted_at": now},
+        previous_fields=("status", "word_count")
+    )
+    
+    await invalidate_user_posts(post["user_id"])
+    remove_post(post["user_id"], post_id)
+    if previous_post:
+        await apply_stats_delta(post["user_id"], post_delta(previous_post, -1), now)
+    
+    return MessageSchema(message="Post deleted")
@@ -2,8 +2,8 @@
 Pydantic schemas for post-related request/response validation.
 """
 from datetime import datetime
-from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional, Dict, Any, List, Literal
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 
 
 class PostCreateSchema(BaseModel):
@@ -76,6 +76,7 @@ class PostResponseSchema(BaseModel):
     status: str = Field(..., description="Post status (draft or published)")
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
+    summary: Optional[str] = Field(None, description="AI-generated summary, if one has been generated")
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -106,3 +107,165 @@ class PostListResponseSchema(BaseModel):
             }
         }
     )
+
+
+class PostStatsResponseSchema(BaseModel):
+    """Schema for per-user post statistics."""
+    
+    drafts: int = Field(..., description="Number of draft posts")
+    published: int = Field(..., description="Number of published posts")
+    total: int = Field(..., description="Total number of posts")
+    total_words: int = Field(..., description="Words across all posts")
+    last_activity_at: Optional[datetime] = Field(None, description="Time of the most recent post write")
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "drafts": 3,
+                "published": 5,
+                "total": 8,
+                "total_words": 4210,
+                "last_activity_at": "2026-02-15T10:30:00"
+            }
+        }
+    )
+
+
+class SimilarPostSchema(BaseModel):
+    """Schema for one related or near-duplicate post."""
+    
+    post_id: str = Field(..., description="Post ID")
+    title: str = Field(..., description="Post title")
+    score: float = Field(..., description="TF-IDF cosine similarity (related) or estimated Jaccard similarity (duplicates)")
+
+
+class PostSimilarResponseSchema(BaseModel):
+    """Schema for related posts and near-duplicates of a post."""
+    
+    related: List[SimilarPostSchema] = Field(..., description="Most similar posts, best first")
+    duplicates: List[SimilarPostSchema] = Field(..., description="Near-duplicate posts above the duplicate threshold")
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "related": [{"post_id": "507f1f77bcf86cd799439011", "title": "Indexing in MongoDB", "score": 0.42}],
+                "duplicates": [{"post_id": "507f1f77bcf86cd799439012", "title": "Untitled", "score": 0.94}]
+            }
+        }
+    )
+
+
+class PostBulkOperationSchema(BaseModel):
+    """Schema for a single operation inside a bulk request."""
+    
+    op: Literal["create", "update", "publish", "delete"] = Field(..., description="Operation to apply")
+    post_id: Optional[str] = Field(None, description="Target post ID (required for update, publish and delete)")
+    title: Optional[str] = Field(None, description="Post title (create and update)")
+    content_json: Optional[Dict[str, Any]] = Field(None, description="Lexical editor state (create and update)")
+    
+    @model_validator(mode="after")
+    def check_operation_fields(self):
+        """Ensure each operation carries exactly the fields it needs."""
+        if self.op == "create":
+            if self.post_id is not None:
+                raise ValueError("post_id must not be set for create operations")
+        elif not self.post_id:
+            raise ValueError(f"post_id is required for {self.op} operations")
+        
+        if self.op == "update" and self.title is None and self.content_json is None:
+            raise ValueError("update operations require title or content_json")
+        
+        if self.op in ("publish", "delete") and (self.title is not None or self.content_json is not None):
+            raise ValueError(f"{self.op} operations do not accept title or content_json")
+        
+        return self
+
+
+class PostBulkRequestSchema(BaseModel):
+    """Schema for a batch of post operations."""
+    
+    operations: List[PostBulkOperationSchema] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        description="Operations to apply (at most 500 per request)"
+    )
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "operations": [
+                    {"op": "create", "title": "New Draft", "content_json": {}},
+                    {"op": "update", "post_id": "507f1f77bcf86cd799439011", "title": "Renamed"},
+                    {"op": "publish", "post_id": "507f1f77bcf86cd799439012"},
+                    {"op": "delete", "post_id": "507f1f77bcf86cd799439013"}
+                ]
+            }
+        }
+    )
+
+
+class PostBulkItemResultSchema(BaseModel):
+    """Schema for the outcome of a single bulk operation."""
+    
+    index: int = Field(..., description="Position of the operation in the request")
+    op: str = Field(..., description="Operation that was requested")
+    post_id: Optional[str] = Field(None, description="Affected post ID")
+    success: bool = Field(..., description="Whether the operation was applied")
+    error: Optional[str] = Field(None, description="Error message if the operation failed")
+
+
+class PostBulkResponseSchema(BaseModel):
+    """Schema for bulk operation results."""
+    
+    results: List[PostBulkItemResultSchema] = Field(..., description="Per-operation results in request order")
+    succeeded: int = Field(..., description="Number of operations applied")
+    failed: int = Field(..., description="Number of operations rejected")
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "results": [
+                    {"index": 0, "op": "create", "post_id": "507f1f77bcf86cd799439014", "success": True, "error": None},
+                    {"index": 1, "op": "update", "post_id": "507f1f77bcf86cd799439011", "success": False, "error": "Post not found"}
+                ],
+                "succeeded": 1,
+                "failed": 1
+            }
+        }
+    )
+
+
+class PostImportItemSchema(BaseModel):
+    """Schema for a single NDJSON line in a post import."""
+    
+    title: str = Field(default="Untitled", description="Post title")
+    content_json: Dict[str, Any] = Field(default_factory=dict, description="Lexical editor state")
+    status: Literal["draft", "published"] = Field(default="draft", description="Post status")
+    created_at: Optional[datetime] = Field(None, description="Original creation timestamp")
+    updated_at: Optional[datetime] = Field(None, description="Original update timestamp")
+
+
+class PostImportErrorSchema(BaseModel):
+    """Schema for a rejected import line."""
+    
+    line: int = Field(..., description="1-based line number in the uploaded file")
+    error: str = Field(..., description="Reason the line was rejected")
+
+
+class PostImportResponseSchema(BaseModel):
+    """Schema for post import results."""
+    
+    imported: int = Field(..., description="Number of posts inserted")
+    failed: int = Field(..., description="Number of lines rejected")
+    errors: List[PostImportErrorSchema] = Field(..., description="First rejected lines (capped at 100)")
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "imported": 120,
+                "failed": 1,
+                "errors": [{"line": 57, "error": "Invalid JSON"}]
+            }
+        }
+    )
@@ -43,17 +43,27 @@ class TokenSchema(BaseModel):
     
     access_token: str = Field(..., description="JWT access token")
     token_type: str = Field(default="bearer", description="Token type")
+    refresh_token: Optional[str] = Field(None, description="Single-use refresh token")
+    expires_in: Optional[int] = Field(None, description="Access token lifetime in seconds")
     
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
                 "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
-                "token_type": "bearer"
+                "token_type": "bearer",
+                "refresh_token": "5fJ0r2kQbE7y6bN1mS0cX4uV9wA3hL8dTq2pZ7eRk1o",
+                "expires_in": 1800
             }
         }
     )
 
 
+class RefreshTokenSchema(BaseModel):
+    """Schema for refresh and logout requests."""
+    
+    refresh_token: str = Field(..., min_length=1, description="Refresh token from login or the last refresh")
+
+
 class UserResponseSchema(BaseModel):
     """Schema for user data in responses."""
     
@@ -0,0 +1,147 @@
+"""
+Production server launcher.
+Run this from the project root: python -m backend.serve
+
+Starts one uvicorn worker per CPU core the container may use (affinity and
+cgroup CPU quota; override with WEB_CONCURRENCY), or a single one while
+storage or cache are in-memory, uses uvloop/httptools when
+installed, splits the MongoDB connection budget across workers and drains
+in-flight requests on SIGTERM. Each worker runs the app's warm-up (MongoDB
+ping, index check, HTTP client pool) in its lifespan startup before it
+accepts connections.
+
+Workers share nothing: in-memory storage, caches, rate-limit buckets,
+collaboration rooms and background loops all exist once per worker, so
+per-process state refuses or divides itself across SERVER_WORKERS.
+"""
+import importlib.util
+import logging
+import math
+import os
+from typing import Optional
+import uvicorn
+from .core.config import settings
+
+
+logger = logging.getLogger("backend.serve")
+
+
+def _read_file(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit() -> Optional[int]:
+    """CPUs allowed by the cgroup quota (v2 cpu.max or v1 CFS), rounded up; None if unlimited."""
+    cpu_max = _read_file("/sys/fs/cgroup/cpu.max")
+    if cpu_max is not None:
+        quota, _, period = cpu_max.partition(" ")
+    else:
+        quota = _read_file("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+        period = _read_file("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    try:
+        quota, period = int(quota), int(period)
+    except (TypeError, ValueError):
+        # "max", missing files or no cgroup support
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return max(1, math.ceil(quota / period))
+
+
+def available_cores() -> int:
+    """Number of CPU cores this process may run on, honouring container CPU limits."""
+    if hasattr(os, "sched_getaffinity"):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+    quota = cgroup_cpu_limit()
+    return min(cores, quota) if quota else cores
+
+
+def worker_count() -> int:
+    """Workers to start: WEB_CONCURRENCY if set, otherwise one per core if nothing is per-process."""
+    if settings.WEB_CONCURRENCY:
+        return max(1, settings.WEB_CONCURRENCY)
+    if settings.STORAGE_BACKEND == "memory" or settings.CACHE_BACKEND == "memory":
+        return 1
+    return available_cores()
+
+
+def check_worker_state(workers: int):
+    """
+    Refuse multi-worker setups whose per-process state cannot be shared.
+    
+    Args:
+        workers: Number of worker processes
+    """
+    if workers > 1 and settings.STORAGE_BACKEND == "memory":
+        raise SystemExit(
+            "STORAGE_BACKEND=memory keeps posts inside one process; "
+            "set WEB_CONCURRENCY=1 or use STORAGE_BACKEND=mongo"
+        )
+    if workers > 1 and settings.CACHE_BACKEND == "memory":
+        # A write only invalidates the cache of the worker that handled it
+        raise SystemExit(
+            "CACHE_BACKEND=memory would serve stale post lists from other workers; "
+            "set WEB_CONCURRENCY=1 or use CACHE_BACKEND=redis"
+        )
+
+
+def _export(name: str, value):
+    # Worker processes read it from the environment; a single worker runs in this process
+    os.environ[name] = str(value)
+    setattr(settings, name, value)
+
+
+def configure_workers(workers: int):
+    """
+    Export the worker count and per-worker Motor pool size so each worker inherits them.
+    
+    Args:
+        workers: Number of worker processes
+    """
+    _export("SERVER_WORKERS", workers)
+    if settings.MONGO_TOTAL_POOL_SIZE:
+        per_worker = max(1, settings.MONGO_TOTAL_POOL_SIZE // workers)
+        _export("MONGO_MAX_POOL_SIZE", per_worker)
+        _export("MONGO_MIN_POOL_SIZE", min(settings.MONGO_MIN_POOL_SIZE, per_worker))
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
+    workers = worker_count()
+    check_worker_state(workers)
+    configure_workers(workers)
+    
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    logger.info(
+        f"Starting {workers} worker(s) on {settings.HOST}:{settings.PORT} "
+        f"(loop={loop}, http={http}, mongo_pool={settings.MONGO_MAX_POOL_SIZE})"
+    )
+    
+    uvicorn.run(
+        "backend.main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=workers,
+        loop=loop,
+        http=http,
+        # Trust X-Forwarded-For only from the reverse proxy, or clients could spoof their IP
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        access_log=False,
+        # On SIGTERM stop accepting connections and let in-flight requests finish
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+        timeout_keep_alive=5,
+        log_level="info"
+    )
+
+
+if __name__ == "__main__":
+    main()
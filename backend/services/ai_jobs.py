@@ -0,0 +1,349 @@
+"""
+Asynchronous AI job queue persisted in MongoDB
+A bounded pool of worker coroutines claims queued jobs by priority, retries
+upstream failures with backoff and keeps results until their TTL expires
+"""
+
+import asyncio
+import hashlib
+import logging
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from backend.core.config import settings
+from backend.db.database import get_database
+from backend.services.ai_tasks import run_ai_task
+from backend.services.gemini_client import GeminiError
+from backend.services.token_budget import TokenBudgetExceeded
+
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"low": 0, "normal": 1, "high": 2}
+
+# Failures worth retrying: the upstream may recover
+RETRYABLE_REASONS = ("circuit_open", "network", "http_429", "invalid_json", "unexpected_format")
+
+_workers: List[asyncio.Task] = []
+_wakeup: Optional[asyncio.Event] = None
+# Jobs finished by this process, for long-polling clients
+_finished: Dict[str, asyncio.Event] = {}
+
+
+def _dedupe_key(user_id, task_type: str, content: str) -> str:
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return f"{user_id}:{task_type}:{digest}"
+
+
+async def submit_job(user_id, task_type: str, content: str, priority: str = "normal") -> Tuple[dict, bool]:
+    """
+    Queue a job, or return the identical job that is already pending.
+
+    Args:
+        user_id: Owner of the job
+        task_type: Either "summary" or "grammar"
+        content: Text to process
+        priority: "low", "normal" or "high"
+
+    Returns:
+        Tuple of (job document, whether an existing job was reused)
+    """
+    db = get_database()
+    now = datetime.utcnow()
+    job = {
+        "_id": ObjectId(),
+        "user_id": ObjectId(str(user_id)),
+        "type": task_type,
+        "content": content,
+        "priority": PRIORITIES[priority],
+        "status": "queued",
+        # Only queued/running jobs carry the flag, so the unique index dedupes pending work only
+        "active": True,
+        "dedupe_key": _dedupe_key(user_id, task_type, content),
+        "attempts": 0,
+        "run_after": now,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+    try:
+        await db["ai_jobs"].insert_one(job)
+    except DuplicateKeyError:
+        existing = await db["ai_jobs"].find_one({"dedupe_key": job["dedupe_key"], "active": True})
+        if existing:
+            return existing, True
+        # The pending duplicate finished in between; queue a fresh job
+        job["_id"] = ObjectId()
+        await db["ai_jobs"].insert_one(job)
+
+    if _wakeup is not None:
+        _wakeup.set()
+    return job, False
+
+
+async def get_job(job_id: str, user_id) -> Optional[dict]:
+    """
+    Load a job owned by a user.
+
+    Args:
+        job_id: Job ID
+        user_id: Owner of the job
+
+    Returns:
+        Job document, or None if not found
+    """
+    db = get_database()
+    return await db["ai_jobs"].find_one({"_id": ObjectId(job_id), "user_id": ObjectId(str(user_id))})
+
+
+async def wait_for_job(job_id: str, user_id, timeout: float) -> Optional[dict]:
+    """
+    Long-poll a job until it finishes or the timeout passes.
+
+    Jobs finished in this process wake the waiter immediately; jobs run by
+    other instances are picked up by re-reading at the poll interval.
+
+    Args:
+        job_id: Job ID
+        user_id: Owner of the job
+        timeout: Maximum seconds to wait
+
+    Returns:
+        Latest job document, or None if not found
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    event = _finished.setdefault(job_id, asyncio.Event())
+    try:
+        while True:
+            job = await get_job(job_id, user_id)
+            remaining = deadline - loop.time()
+            if job is None or job["status"] in ("succeeded", "failed") or remaining <= 0:
+                return job
+
+            try:
+                await asyncio.wait_for(event.wait(), timeout=min(remaining, settings.AI_JOB_POLL_INTERVAL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _finished.pop(job_id, None)
+
+
+async def _claim_job() -> Optional[dict]:
+    """Atomically take the highest-priority runnable job."""
+    db = get_database()
+    now = datetime.utcnow()
+    return await db["ai_jobs"].find_one_and_update(
+        {"status": "queued", "run_after": {"$lte": now}},
+        {
+            "$set": {
+                "status": "running",
+                # Identifies this claim: once the lease is requeued, the old run can no longer write
+                "lease_token": secrets.token_hex(8),
+                "lease_expires_at": now + timedelta(seconds=settings.AI_JOB_LEASE_SECONDS),
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("priority", -1), ("created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def _finish_job(job: dict, update: dict):
+    """Record a final outcome and start the result TTL."""
+    db = get_database()
+    now = datetime.utcnow()
+    await db["ai_jobs"].update_one(
+        {"_id": job["_id"], "lease_token": job["lease_token"]},
+        {
+            "$set": {
+                **update,
+                "updated_at": now,
+                "finished_at": now,
+                "expires_at": now + timedelta(seconds=settings.AI_JOB_RESULT_TTL_SECONDS),
+            },
+            "$unset": {"active": "", "lease_token": "", "lease_expires_at": "", "content": ""},
+        },
+    )
+    event = _finished.get(str(job["_id"]))
+    if event is not None:
+        event.set()
+
+
+async def _release_job(job: dict, delay_seconds: float = 0.0, error: Optional[str] = None):
+    """Put a claimed job back in the queue."""
+    db = get_database()
+    now = datetime.utcnow()
+    await db["ai_jobs"].update_one(
+        {"_id": job["_id"], "lease_token": job["lease_token"]},
+        {
+            "$set": {
+                "status": "queued",
+                "run_after": now + timedelta(seconds=delay_seconds),
+                "last_error": error,
+                "updated_at": now,
+            },
+            "$unset": {"lease_token": "", "lease_expires_at": ""},
+        },
+    )
+
+
+async def _heartbeat(job: dict):
+    """Extend a claimed job's lease until cancelled, so long runs are not requeued."""
+    db = get_database()
+    while True:
+        await asyncio.sleep(settings.AI_JOB_LEASE_SECONDS / 3)
+        now = datetime.utcnow()
+        try:
+            result = await db["ai_jobs"].update_one(
+                {"_id": job["_id"], "lease_token": job["lease_token"]},
+                {"$set": {"lease_expires_at": now + timedelta(seconds=settings.AI_JOB_LEASE_SECONDS)}},
+            )
+        except Exception:
+            # Try again on the next beat; the lease outlives a couple of misses
+            logger.warning("AI job heartbeat failed", extra={"job_id": str(job["_id"])})
+            continue
+        if result.matched_count == 0:
+            logger.warning("AI job lease lost, its result will be discarded", extra={"job_id": str(job["_id"])})
+            return
+
+
+async def _execute(job: dict) -> str:
+    """Run a claimed job's task while a heartbeat keeps its lease."""
+    heartbeat = asyncio.create_task(_heartbeat(job))
+    try:
+        return await run_ai_task(job["type"], job["content"])
+    finally:
+        heartbeat.cancel()
+        try:
+            await heartbeat
+        except asyncio.CancelledError:
+            pass
+
+
+async def _run_job(job: dict):
+    """Execute a claimed job and record its outcome."""
+    try:
+        result = await _execute(job)
+    except GeminiError as e:
+        if e.reason in RETRYABLE_REASONS or e.reason.startswith("http_5"):
+            if job["attempts"] < settings.AI_JOB_MAX_ATTEMPTS:
+                delay = e.retry_after or settings.AI_JOB_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+                await _release_job(job, delay, e.detail)
+                return
+        await _finish_job(job, {"status": "failed", "error": e.detail})
+        return
+    except TokenBudgetExceeded as e:
+        await _finish_job(job, {"status": "failed", "error": str(e)})
+        return
+    except Exception as e:
+        logger.exception("AI job crashed", extra={"job_id": str(job["_id"])})
+        await _finish_job(job, {"status": "failed", "error": f"{type(e).__name__}: {str(e)}"})
+        return
+
+    await _finish_job(job, {"status": "succeeded", "result": result})
+
+
+async def requeue_expired_jobs() -> Tuple[int, int]:
+    """
+    Return jobs whose worker died mid-run (lease expired) to the queue.
+
+    Jobs that already used AI_JOB_MAX_ATTEMPTS fail instead, so a job that
+    crashes its worker every time cannot keep taking workers down.
+
+    Returns:
+        Tuple of (jobs requeued, jobs failed)
+    """
+    db = get_database()
+    now = datetime.utcnow()
+    expired = {"status": "running", "lease_expires_at": {"$lt": now}}
+    failed = await db["ai_jobs"].update_many(
+        {**expired, "attempts": {"$gte": settings.AI_JOB_MAX_ATTEMPTS}},
+        {
+            "$set": {
+                "status": "failed",
+                "error": "Job did not finish within its lease after the maximum number of attempts",
+                "updated_at": now,
+                "finished_at": now,
+                "expires_at": now + timedelta(seconds=settings.AI_JOB_RESULT_TTL_SECONDS),
+            },
+            "$unset": {"active": "", "lease_token": "", "lease_expires_at": "", "content": ""},
+        },
+    )
+    requeued = await db["ai_jobs"].update_many(
+        {**expired, "attempts": {"$lt": settings.AI_JOB_MAX_ATTEMPTS}},
+        {
+            "$set": {"status": "queued", "run_after": now, "updated_at": now},
+            "$unset": {"lease_token": "", "lease_expires_at": ""},
+        },
+    )
+    return requeued.modified_count, failed.modified_count
+
+
+async def _worker_loop():
+    """Claim and run jobs until cancelled; sleep until woken or the poll interval passes."""
+    while True:
+        job = None
+        try:
+            job = await _claim_job()
+            if job is None:
+                _wakeup.clear()
+                try:
+                    await asyncio.wait_for(_wakeup.wait(), timeout=settings.AI_JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await _run_job(job)
+        except asyncio.CancelledError:
+            # Hand an interrupted job straight back instead of waiting for its lease
+            if job is not None:
+                await _release_job(job)
+            raise
+        except Exception:
+            logger.exception("AI job worker failed")
+            await asyncio.sleep(settings.AI_JOB_POLL_INTERVAL_SECONDS)
+
+
+async def _reaper_loop():
+    """Periodically requeue jobs abandoned by crashed workers."""
+    while True:
+        await asyncio.sleep(settings.AI_JOB_LEASE_SECONDS / 2)
+        try:
+            requeued, failed = await requeue_expired_jobs()
+            if requeued or failed:
+                logger.warning("Recovered abandoned AI jobs", extra={"requeued": requeued, "failed": failed})
+        except Exception:
+            logger.exception("AI job reaper failed")
+
+
+def start_ai_workers():
+    """
+    Start the AI job worker pool.
+    Should be called on application startup.
+    """
+    global _wakeup
+    if _workers:
+        return
+    _wakeup = asyncio.Event()
+    for _ in range(settings.AI_JOB_WORKERS):
+        _workers.append(asyncio.create_task(_worker_loop()))
+    _workers.append(asyncio.create_task(_reaper_loop()))
+
+
+async def stop_ai_workers():
+    """
+    Stop the AI job worker pool, requeueing jobs that were in progress.
+    Should be called on application shutdown.
+    """
+    for task in _workers:
+        task.cancel()
+    for task in _workers:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _workers.clear()
@@ -3,8 +3,8 @@ AI Service for integrating with Google Gemini API
 Handles text generation for summaries and grammar correction
 """
 
-import google.generativeai as genai
-from typing import Literal
+from typing import Literal, Optional
+from urllib.parse import urlparse
 from backend.core.config import settings
 
 
@@ -15,11 +15,27 @@ class GeminiService:
         self.api_key = settings.GEMINI_API_KEY
         # Configure the Gemini API with the API key
         if self.api_key:
-            genai.configure(api_key=self.api_key)
+            # Imported here: the SDK is slow to import and only this service needs it
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key, **self._client_overrides())
             self.model = genai.GenerativeModel('models/gemini-1.5-pro')
         else:
             self.model = None
     
+    @staticmethod
+    def _client_overrides() -> dict:
+        """
+        Point the SDK at GEMINI_API_BASE_URL when it is not the public endpoint
+        (e.g. the local emulator in backend/emulators/gemini.py)
+        
+        Returns:
+            Extra keyword arguments for genai.configure
+        """
+        base_url = urlparse(settings.GEMINI_API_BASE_URL)
+        if base_url.netloc == "generativelanguage.googleapis.com":
+            return {}
+        return {"transport": "rest", "client_options": {"api_endpoint": f"{base_url.scheme}://{base_url.netloc}"}}
+    
     def _build_prompt(self, content: str, task_type: Literal["summary", "grammar"]) -> str:
         """
         Build appropriate prompt based on task type
@@ -102,6 +118,18 @@ Corrected text:"""
             raise Exception(f"Gemini API error: {str(e)}")
 
 
-# Singleton instance
-gemini_service = GeminiService()
+_gemini_service: Optional[GeminiService] = None
+
+
+def get_gemini_service() -> GeminiService:
+    """
+    Get the shared GeminiService, creating it on first use.
+    
+    Returns:
+        GeminiService instance
+    """
+    global _gemini_service
+    if _gemini_service is None:
+        _gemini_service = GeminiService()
+    return _gemini_service
 
@@ -0,0 +1,89 @@
+"""
+Single-text AI tasks (summary, grammar) shared by the synchronous route and the job workers
+Identical requests are answered from the shared cache; oversized input is budgeted locally
+"""
+
+import asyncio
+import hashlib
+from typing import List, Literal
+from backend.cache.provider import get_cache
+from backend.core.config import settings
+from backend.core.metrics import record_cache_lookup
+from backend.services.gemini_client import GEMINI_MODEL, build_prompt, generate_content
+from backend.services.token_budget import estimate_tokens, plan_input
+
+
+# Upper bound on output tokens for one grammar correction
+MAX_OUTPUT_TOKENS = 8192
+
+
+def ai_result_cache_key(task_type: str, content: str) -> str:
+    """Cache key of an AI result for the given task and content."""
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return f"ai:{GEMINI_MODEL}:{task_type}:{digest}"
+
+
+async def run_ai_task(task_type: Literal["summary", "grammar"], content: str) -> str:
+    """
+    Produce the AI result for a piece of content.
+    
+    Args:
+        task_type: Either "summary" or "grammar"
+        content: Text to process
+    
+    Returns:
+        Generated text
+    
+    Raises:
+        TokenBudgetExceeded: If the content is over the input budget
+        GeminiError: If a Gemini call fails
+    """
+    # Identical requests share one answer across users and instances
+    cache = get_cache()
+    cache_key = ai_result_cache_key(task_type, content)
+    cached = await cache.get(cache_key)
+    record_cache_lookup("ai", cached is not None)
+    if cached is not None:
+        return cached
+    
+    plan = plan_input(content)
+    
+    if plan.mode == "single":
+        text = await _generate(task_type, plan.chunks[0])
+    elif task_type == "grammar":
+        # Corrections of consecutive chunks are stitched back together in order
+        text = "\n".join(await _generate_many(task_type, plan.chunks))
+    else:
+        # Map-reduce: summarize each chunk, then summarize the partial summaries
+        partials = await _generate_many(task_type, plan.chunks)
+        text = await _generate(task_type, "\n\n".join(partials))
+    
+    await cache.set(cache_key, text, settings.CACHE_AI_TTL_SECONDS)
+    return text
+
+
+async def _generate(task_type: str, content: str) -> str:
+    """One Gemini call for content that fits the single-call budget."""
+    generation_config = None
+    if task_type == "grammar":
+        # A correction is about as long as its input; leave headroom so it is not cut off
+        output_tokens = int(estimate_tokens(content) * 1.3) + 64
+        generation_config = {"maxOutputTokens": max(1024, min(MAX_OUTPUT_TOKENS, output_tokens))}
+    
+    result = await generate_content(
+        build_prompt(content, task_type),
+        request_type=task_type,
+        generation_config=generation_config
+    )
+    return result.text.strip()
+
+
+async def _generate_many(task_type: str, chunks: List[str]) -> List[str]:
+    """Process chunks concurrently (bounded) and return results in chunk order."""
+    semaphore = asyncio.Semaphore(settings.AI_CHUNK_CONCURRENCY)
+    
+    async def run(chunk: str) -> str:
+        async with semaphore:
+            return await _generate(task_type, chunk)
+    
+    return list(await asyncio.gather(*(run(chunk) for chunk in chunks)))
@@ -0,0 +1,198 @@
+"""
+Batch summarization of posts
+Packs several posts into each Gemini request and persists the summaries on the posts
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+from bson import ObjectId
+from backend.cache.keys import invalidate_user_posts
+from backend.core.config import settings
+from backend.repositories.base import PostWrite
+from backend.repositories.provider import get_post_repository
+from backend.services.gemini_client import GeminiError, generate_content
+from backend.services.lexical import extract_plain_text
+from backend.services.token_budget import estimate_tokens, truncate_to_tokens
+
+
+logger = logging.getLogger(__name__)
+
+# Output tokens reserved per post in a pack (2-3 sentence summaries)
+SUMMARY_OUTPUT_TOKENS = 200
+
+# Ask for structured output so summaries map back to posts reliably
+SUMMARY_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "id": {"type": "STRING"},
+            "summary": {"type": "STRING"},
+        },
+        "required": ["id", "summary"],
+    },
+}
+
+
+@dataclass
+class SummaryOutcome:
+    """Result of summarizing one post."""
+
+    post_id: str
+    summary: Optional[str] = None
+    error: Optional[str] = None
+    cached: bool = False
+
+
+@dataclass
+class _PackItem:
+    post_id: str
+    text: str
+    tokens: int
+
+
+@dataclass
+class BatchResult:
+    """Per-post outcomes in request order and the number of Gemini calls made."""
+
+    outcomes: List[SummaryOutcome] = field(default_factory=list)
+    gemini_calls: int = 0
+
+
+def pack_posts(items: List[_PackItem], max_tokens: int, max_posts: int) -> List[List[_PackItem]]:
+    """
+    Group posts into packs that fit the input budget, largest first (first-fit decreasing).
+
+    Args:
+        items: Posts to pack
+        max_tokens: Input token budget per pack
+        max_posts: Maximum posts per pack
+
+    Returns:
+        List of packs
+    """
+    packs: List[List[_PackItem]] = []
+    pack_tokens: List[int] = []
+    for item in sorted(items, key=lambda item: item.tokens, reverse=True):
+        for index, pack in enumerate(packs):
+            if len(pack) < max_posts and pack_tokens[index] + item.tokens <= max_tokens:
+                pack.append(item)
+                pack_tokens[index] += item.tokens
+                break
+        else:
+            packs.append([item])
+            pack_tokens.append(item.tokens)
+    return packs
+
+
+def build_batch_prompt(pack: List[_PackItem]) -> str:
+    """Prompt asking for one summary per post, keyed by post id."""
+    posts = "\n\n".join(f'<post id="{item.post_id}">\n{item.text}\n</post>' for item in pack)
+    return f"""Generate a concise professional summary for each of the following blog posts.
+Each summary should be 2-3 sentences and capture the main points clearly.
+Return a JSON array with one object per post: {{"id": <post id>, "summary": <summary>}}.
+
+{posts}"""
+
+
+async def _summarize_pack(pack: List[_PackItem], semaphore: asyncio.Semaphore) -> Dict[str, SummaryOutcome]:
+    """Summarize one pack with a single Gemini call."""
+    async with semaphore:
+        try:
+            result = await generate_content(
+                build_batch_prompt(pack),
+                request_type="batch_summary",
+                generation_config={
+                    "maxOutputTokens": SUMMARY_OUTPUT_TOKENS * len(pack),
+                    "responseMimeType": "application/json",
+                    "responseSchema": SUMMARY_RESPONSE_SCHEMA,
+                }
+            )
+        except GeminiError as e:
+            return {item.post_id: SummaryOutcome(item.post_id, error=e.detail) for item in pack}
+
+    try:
+        entries = json.loads(result.text)
+        summaries = {
+            str(entry["id"]): str(entry["summary"]).strip()
+            for entry in entries
+            if isinstance(entry, dict) and "id" in entry and "summary" in entry
+        }
+    except (json.JSONDecodeError, TypeError) as e:
+        logger.warning("Unparseable batch summary response", extra={"error": str(e), "response_text": result.text})
+        summaries = {}
+
+    outcomes = {}
+    for item in pack:
+        summary = summaries.get(item.post_id)
+        if summary:
+            outcomes[item.post_id] = SummaryOutcome(item.post_id, summary=summary)
+        else:
+            outcomes[item.post_id] = SummaryOutcome(item.post_id, error="Summary missing from model response")
+    return outcomes
+
+
+async def summarize_posts(post_ids: List[str], user_id, force: bool = False) -> BatchResult:
+    """
+    Summarize a user's posts, reusing stored summaries that are still current.
+
+    Args:
+        post_ids: Posts to summarize (already validated ObjectId strings)
+        user_id: Owner of the posts
+        force: Regenerate summaries even if the stored one is current
+
+    Returns:
+        BatchResult with outcomes in request order
+    """
+    repository = get_post_repository()
+    user_object_id = ObjectId(str(user_id))
+    found = await repository.find_by_ids(
+        post_ids,
+        user_object_id,
+        fields=("content_json", "updated_at", "summary", "summary_updated_at")
+    )
+    posts = {str(post["_id"]): post for post in found}
+
+    outcomes: Dict[str, SummaryOutcome] = {}
+    pending: List[_PackItem] = []
+    for post_id in post_ids:
+        post = posts.get(post_id)
+        if post is None:
+            outcomes[post_id] = SummaryOutcome(post_id, error="Post not found")
+            continue
+
+        summary_at = post.get("summary_updated_at")
+        if not force and post.get("summary") and summary_at and summary_at >= post["updated_at"]:
+            outcomes[post_id] = SummaryOutcome(post_id, summary=post["summary"], cached=True)
+            continue
+
+        text = extract_plain_text(post.get("content_json") or {})
+        if not text:
+            outcomes[post_id] = SummaryOutcome(post_id, error="Post has no text to summarize")
+            continue
+
+        # A single post larger than a pack is cut to the budget
+        text = truncate_to_tokens(text, settings.AI_BATCH_PACK_MAX_INPUT_TOKENS)
+        pending.append(_PackItem(post_id, text, estimate_tokens(text)))
+
+    packs = pack_posts(pending, settings.AI_BATCH_PACK_MAX_INPUT_TOKENS, settings.AI_BATCH_PACK_MAX_POSTS)
+    semaphore = asyncio.Semaphore(settings.AI_BATCH_CONCURRENCY)
+    for pack_outcomes in await asyncio.gather(*(_summarize_pack(pack, semaphore) for pack in packs)):
+        outcomes.update(pack_outcomes)
+
+    # Persist new summaries without touching updated_at, so they stay current until the next edit
+    now = datetime.utcnow()
+    writes = [
+        PostWrite.update(outcome.post_id, {"summary": outcome.summary, "summary_updated_at": now})
+        for outcome in outcomes.values()
+        if outcome.summary and not outcome.cached
+    ]
+    if writes:
+        await repository.bulk_write(writes, user_id=user_object_id)
+        await invalidate_user_posts(user_object_id)
+
+    return BatchResult(outcomes=[outcomes[post_id] for post_id in post_ids], gemini_calls=len(packs))
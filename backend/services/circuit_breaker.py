@@ -0,0 +1,78 @@
+"""
+Circuit breaker for upstream dependencies
+Stops calling an upstream after repeated failures and probes it again after a cool-down
+"""
+
+import time
+from typing import Literal
+from backend.core.config import settings
+
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+    
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state: CircuitState = "closed"
+        self._probe_in_flight = False
+    
+    @property
+    def state(self) -> CircuitState:
+        """Current state; an open circuit becomes half-open once the cool-down has passed."""
+        if self._state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self._state = "half_open"
+            self._probe_in_flight = False
+        return self._state
+    
+    def retry_after(self) -> int:
+        """Seconds until the circuit will allow a probe request."""
+        remaining = self.reset_seconds - (time.monotonic() - self.opened_at)
+        return max(1, int(remaining + 0.999))
+    
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may go upstream.
+        
+        Returns:
+            True if closed, or if half-open and no probe is in flight
+        """
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+    
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        self.failures = 0
+        self._state = "closed"
+        self._probe_in_flight = False
+    
+    def record_abandoned(self):
+        """Forget a call that ended without a verdict, so a half-open probe can be retried."""
+        self._probe_in_flight = False
+    
+    def record_failure(self):
+        """Count a failed call, opening the circuit at the threshold or on a failed probe."""
+        self.failures += 1
+        if self._state == "half_open" or self.failures >= self.failure_threshold:
+            self._state = "open"
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+# Circuit guarding Gemini API calls
+gemini_circuit = CircuitBreaker(
+    "gemini",
+    failure_threshold=settings.GEMINI_CIRCUIT_FAILURE_THRESHOLD,
+    reset_seconds=settings.GEMINI_CIRCUIT_RESET_SECONDS
+)
@@ -0,0 +1,355 @@
+"""
+Collaborative editing rooms
+Keeps one live CollabDocument per post in memory, relays operations between
+sessions and periodically snapshots the document into the post. Each room is
+owned by one process through a lease, so edits to a post never fork across
+workers or instances
+"""
+
+import asyncio
+import json
+import logging
+import secrets
+from datetime import datetime
+from typing import Dict, Optional
+from fastapi import WebSocket
+from backend.cache.keys import invalidate_user_posts
+from backend.core.config import settings
+from backend.core.metrics import COLLAB_OPS, COLLAB_SESSIONS, COLLAB_SNAPSHOTS
+from backend.repositories.provider import get_post_repository
+from backend.services.collab_document import CollabDocument
+from backend.services.leases import acquire_lease, release_lease
+from backend.services.lexical import count_words, encode_for_storage, expand_lexical
+from backend.services.post_stats import apply_stats_delta, merge_deltas
+from backend.services.similarity import index_post
+
+
+logger = logging.getLogger(__name__)
+
+# WebSocket close codes sent by the server
+CLOSE_SERVICE_RESTART = 1012
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class CollabJoinError(Exception):
+    """A session could not join a room ("full", or "elsewhere" if another instance owns it)."""
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+
+
+def _lease_name(post_id: str) -> str:
+    return f"collab:{post_id}"
+
+
+class CollabSession:
+    """One WebSocket connection; outgoing messages go through a bounded queue."""
+
+    def __init__(self, websocket: WebSocket, site: str):
+        self.websocket = websocket
+        self.site = site
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.COLLAB_SEND_QUEUE_SIZE)
+        self.writer: Optional[asyncio.Task] = None
+        self.closer: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the writer task."""
+        self.writer = asyncio.create_task(self._write_loop())
+        self.writer.add_done_callback(self._writer_done)
+
+    def send(self, message: dict) -> bool:
+        """
+        Queue a message for this session.
+
+        Returns:
+            False if the session is closing or too far behind and should be dropped
+        """
+        if self.closer is not None:
+            return False
+        try:
+            self.queue.put_nowait(json.dumps(message, separators=(",", ":")))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self, code: int):
+        """Stop sending and close the socket in the background (once); stop() waits for it."""
+        if self.closer is not None:
+            return
+        if self.writer:
+            self.writer.cancel()
+        self.closer = asyncio.create_task(self._close(code))
+
+    async def stop(self):
+        """Cancel the writer and wait for a pending close."""
+        if self.writer:
+            self.writer.cancel()
+        if self.closer:
+            await self.closer
+
+    async def _write_loop(self):
+        while True:
+            message = await self.queue.get()
+            await self.websocket.send_text(message)
+
+    def _writer_done(self, task: asyncio.Task):
+        # A failed send means the socket is gone; the receive loop sees the disconnect
+        if not task.cancelled() and task.exception() is not None:
+            logger.info(
+                "Collab session send failed",
+                extra={"site": self.site, "error": f"{type(task.exception()).__name__}: {task.exception()}"}
+            )
+
+    async def _close(self, code: int):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            # Already closed by the client or the transport
+            pass
+
+
+class CollabRoom:
+    """Live document and connected sessions for one post."""
+
+    def __init__(self, post: dict):
+        self.post_id = str(post["_id"])
+        self.user_id = post["user_id"]
+        self.document = CollabDocument(post["title"], expand_lexical(post["content_json"]))
+        # Snapshots only replace the version the room was loaded from (or last wrote)
+        self.base_updated_at: datetime = post["updated_at"]
+        self.sessions: Dict[str, CollabSession] = {}
+        self.seq = 0
+        self.dirty = False
+        self.stale = False
+        self._snapshot_lock = asyncio.Lock()
+        self.maintenance_task: Optional[asyncio.Task] = None
+
+    def broadcast(self, message: dict, exclude: Optional[str] = None):
+        """Queue a message for every session except `exclude`, closing stalled ones."""
+        for site, session in list(self.sessions.items()):
+            if site == exclude:
+                continue
+            if not session.send(message) and session.closer is None:
+                logger.warning("Dropping stalled collab session", extra={"post_id": self.post_id, "site": site})
+                session.close(CLOSE_TRY_AGAIN_LATER)
+
+    async def snapshot(self):
+        """
+        Write the current document into the post if it changed since the last snapshot.
+
+        The write is a compare-and-set on `updated_at`: if the post changed
+        outside the room (an autosave, another instance) or was deleted, the
+        room is marked stale instead of overwriting it.
+        """
+        async with self._snapshot_lock:
+            if self.dirty and not self.stale:
+                await self._write_snapshot()
+
+    async def _write_snapshot(self):
+        self.dirty = False
+        content_json = self.document.to_content_json()
+        word_count = count_words(content_json)
+        now = datetime.utcnow()
+        # MongoDB keeps milliseconds; compare against what a re-read would return
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        try:
+            previous_post = await get_post_repository().update(
+                self.post_id,
+                {
+                    "title": self.document.title,
+                    "content_json": encode_for_storage(content_json),
+                    "word_count": word_count,
+                    "updated_at": now
+                },
+                previous_fields=("word_count",),
+                expected={"updated_at": self.base_updated_at}
+            )
+        except asyncio.CancelledError:
+            self.dirty = True
+            raise
+        except Exception:
+            # Retry on the next tick rather than losing edits
+            self.dirty = True
+            COLLAB_SNAPSHOTS.labels(outcome="error").inc()
+            logger.exception("Collab snapshot failed", extra={"post_id": self.post_id})
+            return
+
+        if previous_post is None:
+            self.stale = True
+            exists = await get_post_repository().get(self.post_id) is not None
+            COLLAB_SNAPSHOTS.labels(outcome="conflict" if exists else "missing").inc()
+            logger.warning(
+                "Post changed outside its collab room, discarding the room",
+                extra={"post_id": self.post_id, "deleted": not exists}
+            )
+            return
+
+        self.base_updated_at = now
+        COLLAB_SNAPSHOTS.labels(outcome="ok").inc()
+        try:
+            await invalidate_user_posts(self.user_id)
+            await apply_stats_delta(
+                self.user_id,
+                merge_deltas({"total_words": word_count - previous_post.get("word_count", 0)}),
+                now
+            )
+            index_post(self.user_id, {
+                "_id": self.post_id,
+                "title": self.document.title,
+                "content_json": content_json,
+                "updated_at": now
+            })
+        except Exception:
+            logger.exception("Collab snapshot side effects failed", extra={"post_id": self.post_id})
+
+
+class CollabManager:
+    """Registry of the live rooms this process owns."""
+
+    def __init__(self):
+        self.rooms: Dict[str, CollabRoom] = {}
+
+    async def join(self, post: dict, websocket: WebSocket) -> CollabSession:
+        """
+        Register a session in the post's room, creating the room from the stored post.
+
+        Args:
+            post: Post document as loaded from storage
+            websocket: Accepted WebSocket connection
+
+        Returns:
+            The new session
+
+        Raises:
+            CollabJoinError: If the room is full or owned by another instance
+        """
+        post_id = str(post["_id"])
+        room = self.rooms.get(post_id)
+        if room is None:
+            if not await acquire_lease(_lease_name(post_id), settings.COLLAB_LEASE_SECONDS):
+                raise CollabJoinError("elsewhere", "Post is being edited on another server")
+            # Another session may have opened the room while the lease was being taken
+            room = self.rooms.get(post_id)
+            if room is None:
+                room = CollabRoom(post)
+                room.maintenance_task = asyncio.create_task(self._maintain(room))
+                self.rooms[post_id] = room
+
+        if len(room.sessions) >= settings.COLLAB_MAX_SESSIONS_PER_POST:
+            raise CollabJoinError("full", "Too many collaborators")
+
+        session = CollabSession(websocket, secrets.token_hex(4))
+        session.start()
+        room.sessions[session.site] = session
+        COLLAB_SESSIONS.inc()
+
+        session.send({"type": "sync", "site": session.site, "seq": room.seq, **room.document.state()})
+        return session
+
+    def apply(self, post_id: str, session: CollabSession, ops: list) -> Optional[int]:
+        """
+        Apply a batch of operations from a session and relay the effective ones.
+
+        Args:
+            post_id: Post ID of the room
+            session: Authoring session
+            ops: Operations to apply in order
+
+        Returns:
+            Sequence number after the batch, or None if the session's room was discarded
+
+        Raises:
+            CollabOperationError: If an operation is invalid; the operations
+                before it stay applied and are still relayed
+        """
+        room = self.rooms.get(post_id)
+        if room is None or room.sessions.get(session.site) is not session:
+            return None
+        applied = []
+        try:
+            for op in ops:
+                normalized = room.document.apply(session.site, op)
+                if normalized is not None:
+                    applied.append(normalized)
+                    COLLAB_OPS.labels(kind=normalized["kind"]).inc()
+        finally:
+            # Peers must see every change the server document took, or the replicas diverge
+            if applied:
+                room.seq += 1
+                room.dirty = True
+                room.broadcast({"type": "ops", "site": session.site, "seq": room.seq, "ops": applied}, exclude=session.site)
+        return room.seq
+
+    async def leave(self, post_id: str, session: CollabSession):
+        """
+        Remove a session; the last one out snapshots and closes the room.
+
+        Args:
+            post_id: Post ID of the room
+            session: Session that disconnected
+        """
+        await session.stop()
+        room = self.rooms.get(post_id)
+        if room is None or room.sessions.get(session.site) is not session:
+            return
+        del room.sessions[session.site]
+        COLLAB_SESSIONS.dec()
+
+        if room.sessions:
+            return
+
+        await room.snapshot()
+        # Someone may have joined while the snapshot was being written
+        if not room.sessions and self.rooms.get(post_id) is room:
+            await self._discard(room)
+
+    async def _discard(self, room: CollabRoom, code: int = CLOSE_SERVICE_RESTART):
+        """Close a room's sessions, stop its maintenance and give up its lease."""
+        if self.rooms.get(room.post_id) is room:
+            del self.rooms[room.post_id]
+        if room.maintenance_task and room.maintenance_task is not asyncio.current_task():
+            room.maintenance_task.cancel()
+        sessions = list(room.sessions.values())
+        room.sessions.clear()
+        COLLAB_SESSIONS.dec(len(sessions))
+        for session in sessions:
+            session.close(code)
+        await asyncio.gather(*(session.stop() for session in sessions))
+        try:
+            await release_lease(_lease_name(room.post_id))
+        except Exception:
+            # The lease expires on its own
+            logger.warning("Failed to release collab lease", extra={"post_id": room.post_id})
+
+    async def _maintain(self, room: CollabRoom):
+        """Snapshot the room and renew its lease until it closes; discard it if either fails."""
+        while True:
+            await asyncio.sleep(settings.COLLAB_SNAPSHOT_INTERVAL_SECONDS)
+            await room.snapshot()
+            if room.stale:
+                # Clients reconnect and resync from the stored post
+                await self._discard(room)
+                return
+            try:
+                renewed = await acquire_lease(_lease_name(room.post_id), settings.COLLAB_LEASE_SECONDS)
+            except Exception:
+                logger.exception("Collab lease renewal failed", extra={"post_id": room.post_id})
+                continue
+            if not renewed:
+                logger.warning("Lost collab room lease", extra={"post_id": room.post_id})
+                await self._discard(room)
+                return
+
+    async def close_all(self):
+        """
+        Snapshot every live room and disconnect all sessions.
+        Should be called on application shutdown.
+        """
+        for room in list(self.rooms.values()):
+            await room.snapshot()
+            await self._discard(room)
+
+
+# Global room registry
+collab_manager = CollabManager()
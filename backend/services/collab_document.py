@@ -0,0 +1,192 @@
+"""
+CRDT document model for collaborative editing
+Top-level Lexical blocks form a replicated sequence (RGA) and each block's
+content, like the post title, is a last-writer-wins register
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+# (Lamport clock, site id); ordering of ids decides concurrent inserts and LWW updates
+BlockId = Tuple[int, str]
+
+# Virtual position before the first block
+HEAD: BlockId = (0, "")
+
+# Site id of the blocks loaded from the stored content_json
+INITIAL_SITE = "init"
+
+OP_KINDS = ("insert", "update", "delete", "title")
+
+
+class CollabOperationError(ValueError):
+    """Raised when an operation is malformed or references unknown blocks."""
+
+
+@dataclass
+class Block:
+    """One top-level Lexical node in the replicated sequence."""
+
+    id: BlockId
+    node: Optional[dict]
+    version: BlockId
+    deleted: bool = False
+
+
+def _parse_id(value) -> BlockId:
+    """Parse a wire id ([clock, site]) into a BlockId."""
+    if (
+        not isinstance(value, (list, tuple))
+        or len(value) != 2
+        or not isinstance(value[0], int)
+        or not isinstance(value[1], str)
+    ):
+        raise CollabOperationError(f"Invalid block id: {value!r}")
+    return (value[0], value[1])
+
+
+def _parse_node(value) -> dict:
+    """Check that a block payload looks like a Lexical node."""
+    if not isinstance(value, dict) or not isinstance(value.get("type"), str):
+        raise CollabOperationError("Block node must be an object with a string 'type'")
+    return value
+
+
+class CollabDocument:
+    """
+    Replicated post document.
+
+    Operations are stamped with (clock, site) by their author; applying the
+    same set of operations in any causal order yields the same document.
+    """
+
+    def __init__(self, title: str, content_json: dict):
+        self.title = title
+        self.title_version: BlockId = HEAD
+        self.clock = 0
+        self.order: List[BlockId] = []
+        self.blocks: Dict[BlockId, Block] = {}
+
+        root = (content_json or {}).get("root") or {}
+        self.root_attrs = {key: value for key, value in root.items() if key != "children"}
+        self.root_attrs.setdefault("type", "root")
+
+        # Stored blocks get clock 0, so every client insert sorts after them
+        for index, node in enumerate(root.get("children") or []):
+            block_id = (0, f"{INITIAL_SITE}{index:06d}")
+            self.blocks[block_id] = Block(id=block_id, node=node, version=block_id)
+            self.order.append(block_id)
+
+    def _observe(self, clock: int):
+        self.clock = max(self.clock, clock)
+
+    def _integrate(self, block: Block, after: BlockId):
+        # RGA: place after the origin, skipping concurrent inserts with higher ids
+        if after == HEAD:
+            index = 0
+        else:
+            index = self.order.index(after) + 1
+        while index < len(self.order) and self.order[index] > block.id:
+            index += 1
+        self.order.insert(index, block.id)
+        self.blocks[block.id] = block
+
+    def apply(self, site: str, op: dict) -> Optional[dict]:
+        """
+        Apply one operation authored by `site`.
+
+        Args:
+            site: Site id of the authoring session
+            op: Operation with "kind" and "clock" plus kind-specific fields
+
+        Returns:
+            The normalized operation to broadcast, or None if it changed nothing
+
+        Raises:
+            CollabOperationError: If the operation is malformed
+        """
+        if not isinstance(op, dict):
+            raise CollabOperationError("Operation must be an object")
+        kind = op.get("kind")
+        clock = op.get("clock")
+        if kind not in OP_KINDS:
+            raise CollabOperationError(f"Unknown operation kind: {kind!r}")
+        if not isinstance(clock, int) or clock <= 0:
+            raise CollabOperationError("Operation clock must be a positive integer")
+
+        stamp: BlockId = (clock, site)
+        self._observe(clock)
+
+        if kind == "title":
+            title = op.get("title")
+            if not isinstance(title, str):
+                raise CollabOperationError("Title must be a string")
+            if stamp <= self.title_version:
+                return None
+            self.title = title
+            self.title_version = stamp
+            return {"kind": kind, "clock": clock, "title": title}
+
+        if kind == "insert":
+            if stamp in self.blocks:
+                return None
+            after = HEAD if op.get("after") is None else _parse_id(op["after"])
+            if after != HEAD and after not in self.blocks:
+                raise CollabOperationError(f"Unknown origin block: {list(after)}")
+            node = _parse_node(op.get("node"))
+            self._integrate(Block(id=stamp, node=node, version=stamp), after)
+            return {"kind": kind, "clock": clock, "after": None if after == HEAD else list(after), "node": node}
+
+        block_id = _parse_id(op.get("id"))
+        block = self.blocks.get(block_id)
+        if block is None:
+            raise CollabOperationError(f"Unknown block: {list(block_id)}")
+
+        if kind == "delete":
+            if block.deleted:
+                return None
+            # Keep a tombstone so later inserts can still use it as an origin
+            block.deleted = True
+            block.node = None
+            return {"kind": kind, "clock": clock, "id": list(block_id)}
+
+        node = _parse_node(op.get("node"))
+        if block.deleted or stamp <= block.version:
+            return None
+        block.node = node
+        block.version = stamp
+        return {"kind": kind, "clock": clock, "id": list(block_id), "node": node}
+
+    def to_content_json(self) -> dict:
+        """
+        Materialize the live blocks as a Lexical editor state.
+
+        Returns:
+            Lexical JSON with the visible blocks as root children
+        """
+        children = [self.blocks[block_id].node for block_id in self.order if not self.blocks[block_id].deleted]
+        return {"root": {**self.root_attrs, "children": children}}
+
+    def state(self) -> dict:
+        """
+        Full replica state for a joining session, tombstones included.
+
+        Returns:
+            Dict with title, clock and ordered blocks
+        """
+        return {
+            "title": self.title,
+            "title_version": list(self.title_version),
+            "clock": self.clock,
+            "root": self.root_attrs,
+            "blocks": [
+                {
+                    "id": list(block_id),
+                    "version": list(self.blocks[block_id].version),
+                    "deleted": self.blocks[block_id].deleted,
+                    "node": self.blocks[block_id].node,
+                }
+                for block_id in self.order
+            ],
+        }
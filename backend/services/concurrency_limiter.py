@@ -0,0 +1,219 @@
+"""
+Adaptive concurrency limits per route class
+Each class's limit follows its observed latency (the gradient of a long-term
+baseline over recent latency); requests beyond it are shed early, and less
+important classes give way while more important ones are congested
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+from backend.core.config import settings
+from backend.core.metrics import CONCURRENCY_IN_FLIGHT, CONCURRENCY_LIMIT
+
+
+# Weight of each window's latency in the long-term baseline
+BASELINE_SMOOTHING = 0.05
+# Weight of a newly computed limit against the current one
+LIMIT_SMOOTHING = 0.2
+# Recent latency may exceed the baseline by this factor before the limit shrinks
+LATENCY_TOLERANCE = 1.5
+# A class counts as congested for this long after it last ran out of slots
+CONGESTION_HOLD_SECONDS = 1.0
+
+
+class AdaptiveLimit:
+    """
+    Concurrency limit of one route class, adjusted from request latency.
+
+    Latency is averaged over windows of at least CONCURRENCY_WINDOW_SECONDS
+    and CONCURRENCY_WINDOW_MIN_SAMPLES requests. After each window the limit
+    moves towards `limit * gradient + headroom`, where the gradient is
+    baseline / recent latency (with tolerance, clamped to [0.5, 1]) and the
+    headroom of sqrt(limit) probes for more capacity only while at least
+    half the limit was in use. Queueing delay therefore shrinks the limit
+    before requests pile up, and spare capacity grows it back.
+    """
+
+    def __init__(self, name: str, initial: float, min_limit: float, max_limit: float, priority: int, queue_timeout: float):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.priority = int(priority)
+        self.queue_timeout = float(queue_timeout)
+        self.in_flight = 0
+        self.congested_at = -math.inf
+        self.waiters: Deque[asyncio.Future] = deque()
+        self._baseline: Optional[float] = None
+        self._window_started = time.monotonic()
+        self._window_total = 0.0
+        self._window_count = 0
+        self._window_peak = 0
+        CONCURRENCY_LIMIT.labels(route_class=name).set(self.limit)
+
+    @property
+    def capacity(self) -> int:
+        """Whole number of slots the limit allows."""
+        return max(1, int(self.limit))
+
+    def is_congested(self, now: float) -> bool:
+        """Whether the class ran out of slots recently."""
+        return now - self.congested_at < CONGESTION_HOLD_SECONDS
+
+    def retry_after(self) -> float:
+        """Rough seconds until a slot frees up (one baseline latency)."""
+        return self._baseline or 1.0
+
+    def admit(self):
+        self.in_flight += 1
+        self._window_peak = max(self._window_peak, self.in_flight)
+        CONCURRENCY_IN_FLIGHT.labels(route_class=self.name).set(self.in_flight)
+
+    def release(self, latency: Optional[float], now: float):
+        self.in_flight -= 1
+        CONCURRENCY_IN_FLIGHT.labels(route_class=self.name).set(self.in_flight)
+        if latency is not None:
+            self._record(latency, now)
+
+    def _record(self, latency: float, now: float):
+        self._window_total += latency
+        self._window_count += 1
+        if (
+            now - self._window_started < settings.CONCURRENCY_WINDOW_SECONDS
+            or self._window_count < settings.CONCURRENCY_WINDOW_MIN_SAMPLES
+        ):
+            return
+
+        recent = self._window_total / self._window_count
+        peak = self._window_peak
+        self._window_started = now
+        self._window_total = 0.0
+        self._window_count = 0
+        self._window_peak = self.in_flight
+
+        if self._baseline is None:
+            self._baseline = recent
+            return
+        self._baseline += (recent - self._baseline) * BASELINE_SMOOTHING
+        # Let the baseline follow quickly when latency has dropped for good
+        if self._baseline > 2 * recent:
+            self._baseline *= 0.95
+
+        gradient = max(0.5, min(1.0, LATENCY_TOLERANCE * self._baseline / max(recent, 1e-6)))
+        headroom = math.sqrt(self.limit) if peak >= self.limit / 2 else 0.0
+        target = self.limit * gradient + headroom
+        self.limit = min(self.max_limit, max(self.min_limit, self.limit + (target - self.limit) * LIMIT_SMOOTHING))
+        CONCURRENCY_LIMIT.labels(route_class=self.name).set(self.limit)
+
+
+class ConcurrencyLimiter:
+    """
+    Adaptive limits for every route class of this process.
+
+    Priority 0 is the most important. While any more important class is
+    congested, a class may only use CONCURRENCY_DEGRADED_SHARE of its limit.
+    A request that finds its class full waits up to the class's
+    `queue_timeout` for a slot (first come, first served) or is rejected.
+    """
+
+    def __init__(self, classes: Dict[str, Dict[str, float]]):
+        self._limits = {
+            name: AdaptiveLimit(
+                name,
+                initial=config["initial"],
+                min_limit=config["min"],
+                max_limit=config["max"],
+                priority=config.get("priority", 0),
+                queue_timeout=config.get("queue_timeout", 0.0),
+            )
+            for name, config in classes.items()
+        }
+
+    def __contains__(self, route_class: str) -> bool:
+        return route_class in self._limits
+
+    def _capacity(self, limit: AdaptiveLimit, now: float) -> int:
+        if any(other.priority < limit.priority and other.is_congested(now) for other in self._limits.values()):
+            return max(1, int(limit.limit * settings.CONCURRENCY_DEGRADED_SHARE))
+        return limit.capacity
+
+    def _wake(self, limit: AdaptiveLimit, now: float):
+        """Hand free slots to waiting requests in arrival order."""
+        while limit.waiters and limit.in_flight < self._capacity(limit, now):
+            waiter = limit.waiters.popleft()
+            if not waiter.done():
+                limit.admit()
+                waiter.set_result(None)
+
+    async def acquire(self, route_class: str) -> bool:
+        """
+        Take a slot of a route class, waiting briefly if allowed.
+
+        Args:
+            route_class: Route class of the request
+
+        Returns:
+            True if admitted (call release() when done), False if shed
+        """
+        limit = self._limits[route_class]
+        now = time.monotonic()
+        self._wake(limit, now)
+        if not limit.waiters and limit.in_flight < self._capacity(limit, now):
+            limit.admit()
+            return True
+
+        limit.congested_at = now
+        if limit.queue_timeout <= 0 or len(limit.waiters) >= limit.capacity:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        limit.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, limit.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the client went away
+            if waiter.done() and not waiter.cancelled():
+                self.release(route_class, None)
+            raise
+        finally:
+            if waiter in limit.waiters:
+                limit.waiters.remove(waiter)
+
+    def release(self, route_class: str, latency: Optional[float]):
+        """
+        Return a slot and feed the request's latency into its class's limit.
+
+        Args:
+            route_class: Route class of the request
+            latency: Seconds until the response started, or None if it never did
+        """
+        limit = self._limits[route_class]
+        now = time.monotonic()
+        limit.release(latency, now)
+        self._wake(limit, now)
+
+    def retry_after(self, route_class: str) -> float:
+        """Suggested seconds before retrying a shed request."""
+        return self._limits[route_class].retry_after()
+
+
+_limiter: Optional[ConcurrencyLimiter] = None
+
+
+def get_concurrency_limiter() -> ConcurrencyLimiter:
+    """
+    Get the process-wide limiter, created from CONCURRENCY_LIMITS on first use.
+
+    Returns:
+        ConcurrencyLimiter instance
+    """
+    global _limiter
+    if _limiter is None:
+        _limiter = ConcurrencyLimiter(settings.CONCURRENCY_LIMITS)
+    return _limiter
@@ -0,0 +1,207 @@
+"""
+Gemini REST client shared by the AI routes
+Wraps every call with metrics, tracing and the Gemini circuit breaker
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Literal, Optional
+import aiohttp
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from backend.core.config import settings
+from backend.core.metrics import GEMINI_ERRORS, GEMINI_REQUEST_DURATION, record_gemini_usage
+from backend.core.tracing import tracer
+from backend.services.circuit_breaker import gemini_circuit
+from backend.services.http_client import get_http_session
+from backend.services.token_budget import calibrator, estimate_raw_tokens
+
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
+DEFAULT_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "topK": 40,
+    "topP": 0.95,
+    "maxOutputTokens": 1024,
+}
+
+
+class GeminiError(Exception):
+    """Raised when a Gemini call fails; carries the HTTP status to report to the client."""
+    
+    def __init__(self, reason: str, detail: str, status_code: int = 500, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.reason = reason
+        self.detail = detail
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@dataclass
+class GeminiResult:
+    """Text and usage metadata returned by a successful Gemini call."""
+    
+    text: str
+    usage: dict = field(default_factory=dict)
+
+
+def build_prompt(content: str, task_type: Literal["summary", "grammar"]) -> str:
+    """
+    Build the prompt for a summary or grammar task.
+    
+    Args:
+        content: The blog content to process
+        task_type: Either "summary" or "grammar"
+    
+    Returns:
+        Formatted prompt string
+    """
+    if task_type == "summary":
+        return f"""Generate a concise professional summary of the following blog post. 
+The summary should be 2-3 sentences and capture the main points clearly.
+
+Blog content:
+{content}
+
+Professional Summary:"""
+    
+    return f"""Fix all grammar mistakes and improve the clarity of the following text. 
+Do not change the meaning or core message. Keep the same tone and style.
+Only return the corrected text, without any explanations.
+
+Original text:
+{content}
+
+Corrected text:"""
+
+
+async def generate_content(
+    prompt: str,
+    request_type: str = "generic",
+    generation_config: Optional[dict] = None
+) -> GeminiResult:
+    """
+    Call Gemini `generateContent` with the shared HTTP session.
+    
+    Args:
+        prompt: Prompt text
+        request_type: Label recorded on traces (e.g. "summary")
+        generation_config: Overrides merged into the default generation config
+    
+    Returns:
+        GeminiResult with the generated text and usage metadata
+    
+    Raises:
+        GeminiError: If the circuit is open or the call fails
+    """
+    if not gemini_circuit.allow_request():
+        GEMINI_ERRORS.labels(model=GEMINI_MODEL, reason="circuit_open").inc()
+        raise GeminiError(
+            "circuit_open",
+            "AI service is temporarily unavailable, please retry shortly",
+            status_code=503,
+            retry_after=gemini_circuit.retry_after()
+        )
+    
+    payload = {
+        "contents": [{
+            "parts": [{"text": prompt}]
+        }],
+        "generationConfig": {**DEFAULT_GENERATION_CONFIG, **(generation_config or {})}
+    }
+    
+    # Using header-based authentication for better security
+    url = f"{settings.GEMINI_API_BASE_URL}/models/{GEMINI_MODEL}:generateContent"
+    headers = {
+        "Content-Type": "application/json",
+        "x-goog-api-key": settings.GEMINI_API_KEY
+    }
+    
+    outcome = "error"
+    # Only upstream trouble (5xx, 429, network, garbled responses) counts against the circuit;
+    # None means no verdict (cancelled by the caller, local bug) and counts as neither
+    upstream_failed: Optional[bool] = None
+    started = time.perf_counter()
+    span = tracer.start_span("gemini.generate_content", kind=SpanKind.CLIENT)
+    try:
+        if span.is_recording():
+            span.set_attribute("gen_ai.system", "gemini")
+            span.set_attribute("gen_ai.request.model", GEMINI_MODEL)
+            span.set_attribute("gen_ai.request.type", request_type)
+            span.set_attribute("gen_ai.prompt.length", len(prompt))
+        
+        session = get_http_session()
+        async with session.post(url, json=payload, headers=headers) as response:
+            response_text = await response.text()
+            
+            if response.status != 200:
+                upstream_failed = response.status >= 500 or response.status == 429
+                GEMINI_ERRORS.labels(model=GEMINI_MODEL, reason=f"http_{response.status}").inc()
+                logger.warning(
+                    "Gemini API error",
+                    extra={"status": response.status, "response_text": response_text}
+                )
+                raise GeminiError(
+                    f"http_{response.status}",
+                    f"Gemini API error ({response.status}): {response_text[:200]}"
+                )
+            
+            try:
+                data = await response.json()
+            except Exception as json_err:
+                upstream_failed = True
+                GEMINI_ERRORS.labels(model=GEMINI_MODEL, reason="invalid_json").inc()
+                logger.warning(
+                    "Gemini response is not valid JSON",
+                    extra={"error": str(json_err), "response_text": response_text}
+                )
+                raise GeminiError("invalid_json", f"Failed to parse API response: {str(json_err)}")
+            
+            usage = data.get("usageMetadata") or {}
+            record_gemini_usage(GEMINI_MODEL, usage)
+            # Compare the local estimate with the real count to calibrate future estimates
+            calibrator.record(estimate_raw_tokens(prompt), usage.get("promptTokenCount", 0))
+            
+            # Extract generated text
+            try:
+                text = data["candidates"][0]["content"]["parts"][0]["text"]
+            except (KeyError, IndexError, TypeError) as e:
+                upstream_failed = True
+                GEMINI_ERRORS.labels(model=GEMINI_MODEL, reason="unexpected_format").inc()
+                logger.warning(
+                    "Unexpected Gemini response format",
+                    extra={"error": str(e), "response": data}
+                )
+                raise GeminiError(
+                    "unexpected_format",
+                    f"Unexpected API response format: {str(e)}, Response: {str(data)[:200]}"
+                )
+            
+            outcome = "success"
+            upstream_failed = False
+            logger.debug("AI generation succeeded", extra={"result_length": len(text)})
+            return GeminiResult(text=text, usage=usage)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        upstream_failed = True
+        GEMINI_ERRORS.labels(model=GEMINI_MODEL, reason="network").inc()
+        raise GeminiError("network", f"AI generation failed: {type(e).__name__}: {str(e)}")
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        if upstream_failed is None:
+            gemini_circuit.record_abandoned()
+        elif upstream_failed:
+            gemini_circuit.record_failure()
+        else:
+            gemini_circuit.record_success()
+        GEMINI_REQUEST_DURATION.labels(model=GEMINI_MODEL, outcome=outcome).observe(
+            time.perf_counter() - started
+        )
+        if outcome != "success":
+            span.set_status(Status(StatusCode.ERROR))
+        span.end()
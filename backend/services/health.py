@@ -0,0 +1,201 @@
+"""
+Cached dependency health checks for the liveness and readiness probes
+A background task refreshes the checks so probes never touch MongoDB themselves
+"""
+
+import asyncio
+import logging
+import time
+from typing import List, Optional
+from backend.core.config import settings
+from backend.db.database import database
+from backend.db.pool_stats import pool_stats
+from backend.services.circuit_breaker import gemini_circuit
+
+
+logger = logging.getLogger(__name__)
+
+# How often the event-loop lag sampler wakes up
+LAG_SAMPLE_INTERVAL_SECONDS = 0.25
+
+_tasks: List[asyncio.Task] = []
+
+
+class HealthState:
+    """Latest results of the dependency checks."""
+    
+    def __init__(self):
+        self.mongo_ok = False
+        self.mongo_latency_ms: Optional[float] = None
+        self.mongo_error: Optional[str] = None
+        self.pool_in_use = 0
+        self.pool_waiting = 0
+        self.event_loop_lag_ms = 0.0
+        self.checked_at = 0.0
+        self.draining = False
+    
+    def pool_saturation(self) -> float:
+        """Fraction of the per-server pool currently checked out."""
+        return self.pool_in_use / max(1, settings.MONGO_MAX_POOL_SIZE)
+    
+    def readiness(self) -> dict:
+        """
+        Readiness verdict built from the cached checks.
+        
+        Returns:
+            Dict with "ready", "status" and the individual checks
+        """
+        stale_after = settings.HEALTH_CHECK_INTERVAL_SECONDS * 3
+        fresh = self.checked_at and time.monotonic() - self.checked_at <= stale_after
+        saturated = (
+            self.pool_saturation() >= settings.HEALTH_POOL_SATURATION_THRESHOLD
+            and self.pool_waiting > 0
+        )
+        lagging = self.event_loop_lag_ms > settings.HEALTH_MAX_EVENT_LOOP_LAG_MS
+        circuit = gemini_circuit.state
+        
+        reasons = []
+        if self.draining:
+            reasons.append("draining")
+        if not fresh:
+            reasons.append("checks_stale")
+        if not self.mongo_ok:
+            reasons.append("mongo_unreachable")
+        if saturated:
+            reasons.append("mongo_pool_saturated")
+        if lagging:
+            reasons.append("event_loop_lag")
+        
+        ready = not reasons
+        # An open Gemini circuit only degrades AI features; the instance still serves posts
+        if not ready:
+            status = "unavailable"
+        elif circuit != "closed":
+            status = "degraded"
+        else:
+            status = "ready"
+        
+        return {
+            "ready": ready,
+            "status": status,
+            "reasons": reasons,
+            "checks": {
+                "mongo": {
+                    "ok": self.mongo_ok,
+                    "latency_ms": self.mongo_latency_ms,
+                    "error": self.mongo_error,
+                },
+                "mongo_pool": {
+                    "in_use": self.pool_in_use,
+                    "waiting": self.pool_waiting,
+                    "saturation": round(self.pool_saturation(), 3),
+                },
+                "gemini_circuit": circuit,
+                "event_loop_lag_ms": round(self.event_loop_lag_ms, 1),
+                "age_seconds": round(time.monotonic() - self.checked_at, 3) if self.checked_at else None,
+            },
+        }
+
+
+# Global health state shared by the probes
+health_state = HealthState()
+
+
+async def _check_mongo():
+    """Ping MongoDB with a short timeout and record the result."""
+    if settings.STORAGE_BACKEND != "mongo":
+        # In-memory storage has no database to reach
+        health_state.mongo_ok = True
+        health_state.mongo_error = None
+        health_state.mongo_latency_ms = None
+        return
+    
+    if database.client is None:
+        health_state.mongo_ok = False
+        health_state.mongo_error = "not connected"
+        return
+    
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(
+            database.client.admin.command("ping"),
+            timeout=settings.HEALTH_MONGO_TIMEOUT_SECONDS
+        )
+        health_state.mongo_ok = True
+        health_state.mongo_error = None
+        health_state.mongo_latency_ms = round((time.perf_counter() - started) * 1000, 2)
+    except Exception as e:
+        if health_state.mongo_ok:
+            logger.warning("MongoDB health check failed", extra={"error": f"{type(e).__name__}: {e}"})
+        health_state.mongo_ok = False
+        health_state.mongo_error = type(e).__name__
+        health_state.mongo_latency_ms = None
+
+
+def _check_pool():
+    """Record the busiest server's pool usage."""
+    servers = pool_stats.snapshot().values()
+    health_state.pool_in_use = max((stats["checked_out"] for stats in servers), default=0)
+    health_state.pool_waiting = max((stats["waiting"] for stats in servers), default=0)
+
+
+async def run_health_checks():
+    """Run all dependency checks once and update the cached state."""
+    await _check_mongo()
+    _check_pool()
+    health_state.checked_at = time.monotonic()
+
+
+async def _run_check_loop():
+    """Refresh the dependency checks periodically until cancelled."""
+    while True:
+        try:
+            await run_health_checks()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Health check failed")
+        
+        await asyncio.sleep(settings.HEALTH_CHECK_INTERVAL_SECONDS)
+
+
+async def _sample_event_loop_lag():
+    """Measure how late the loop wakes a sleeping task."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(LAG_SAMPLE_INTERVAL_SECONDS)
+        lag = (time.perf_counter() - started - LAG_SAMPLE_INTERVAL_SECONDS) * 1000
+        # Exponential smoothing so one slow tick does not flip readiness
+        health_state.event_loop_lag_ms = 0.7 * health_state.event_loop_lag_ms + 0.3 * max(0.0, lag)
+
+
+async def start_health_checks():
+    """
+    Run the first checks and start the background refresh tasks.
+    Should be called on application startup.
+    """
+    health_state.draining = False
+    await run_health_checks()
+    if not _tasks:
+        _tasks.append(asyncio.create_task(_run_check_loop()))
+        _tasks.append(asyncio.create_task(_sample_event_loop_lag()))
+
+
+def mark_draining():
+    """Fail readiness so load balancers stop routing new traffic during shutdown."""
+    health_state.draining = True
+
+
+async def stop_health_checks():
+    """
+    Stop the background refresh tasks.
+    Should be called on application shutdown.
+    """
+    for task in _tasks:
+        task.cancel()
+    for task in _tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _tasks.clear()
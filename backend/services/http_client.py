@@ -0,0 +1,54 @@
+"""
+Shared aiohttp client session for outbound API calls
+Created once per worker at startup so connections are pooled and reused
+"""
+
+import aiohttp
+from typing import Optional
+from backend.core.config import settings
+
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+async def open_http_session():
+    """
+    Create the shared client session.
+    Should be called on application startup.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=settings.GEMINI_MAX_CONNECTIONS,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            ),
+            timeout=aiohttp.ClientTimeout(total=settings.GEMINI_TIMEOUT_SECONDS)
+        )
+
+
+async def close_http_session():
+    """
+    Close the shared client session.
+    Should be called on application shutdown.
+    """
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Get the shared client session.
+    
+    Returns:
+        aiohttp.ClientSession instance
+        
+    Raises:
+        RuntimeError: If called before open_http_session()
+    """
+    if _session is None or _session.closed:
+        raise RuntimeError("HTTP session is not open; call open_http_session() on startup")
+    return _session
@@ -0,0 +1,58 @@
+"""
+Named leases shared by every instance
+A lease has one holder at a time until it expires, so singleton work
+(collaboration rooms, background loops) runs in one process only
+"""
+
+import secrets
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from backend.core.config import settings
+from backend.db.database import get_database
+
+
+# Identifies this process as a lease holder
+INSTANCE_ID = secrets.token_hex(8)
+
+
+async def acquire_lease(name: str, ttl_seconds: float) -> bool:
+    """
+    Take or renew a lease for this process.
+
+    With in-memory storage there is only one process, so the lease is
+    always granted.
+
+    Args:
+        name: Lease name (e.g. "collab:<post_id>")
+        ttl_seconds: Seconds the lease stays valid unless renewed
+
+    Returns:
+        True if this process holds the lease until `ttl_seconds` from now
+    """
+    if settings.STORAGE_BACKEND != "mongo":
+        return True
+
+    now = datetime.utcnow()
+    try:
+        # Matches only a lease we hold or one that expired; otherwise the upsert
+        # tries to insert a second document with the same _id and fails
+        await get_database()["leases"].update_one(
+            {"_id": name, "$or": [{"holder": INSTANCE_ID}, {"expires_at": {"$lte": now}}]},
+            {"$set": {"holder": INSTANCE_ID, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+async def release_lease(name: str):
+    """
+    Give up a lease if this process holds it.
+
+    Args:
+        name: Lease name
+    """
+    if settings.STORAGE_BACKEND != "mongo":
+        return
+    await get_database()["leases"].delete_one({"_id": name, "holder": INSTANCE_ID})
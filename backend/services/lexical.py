@@ -0,0 +1,194 @@
+"""
+Helpers for working with Lexical editor state stored in content_json
+"""
+
+from typing import List
+from backend.core.config import settings
+
+
+# Nodes rendered as their own line/paragraph in plain text
+BLOCK_TYPES = {"paragraph", "heading", "quote", "listitem", "code", "table", "tablerow"}
+
+
+def extract_plain_text(content_json: dict) -> str:
+    """
+    Flatten a Lexical document into plain text, one block per line.
+    
+    Args:
+        content_json: Lexical editor state ({"root": {...}})
+    
+    Returns:
+        Plain text with blocks separated by newlines
+    """
+    lines: List[str] = []
+    current: List[str] = []
+    
+    def walk(node: dict):
+        node_type = node.get("type")
+        if node_type == "linebreak":
+            current.append("\n")
+        text = node.get("text")
+        if isinstance(text, str):
+            current.append(text)
+        for child in node.get("children") or ():
+            if isinstance(child, dict):
+                walk(child)
+        if node_type in BLOCK_TYPES and current:
+            line = "".join(current).strip()
+            if line:
+                lines.append(line)
+            current.clear()
+    
+    root = (content_json or {}).get("root")
+    if isinstance(root, dict):
+        walk(root)
+    if current:
+        lines.append("".join(current).strip())
+    
+    return "\n".join(line for line in lines if line)
+
+
+def count_words(content_json: dict) -> int:
+    """Number of whitespace-separated words in a Lexical document."""
+    return len(extract_plain_text(content_json).split())
+
+
+# Values Lexical's exportJSON writes for every node of a type (lexical 0.13)
+ELEMENT_DEFAULTS = {"direction": "ltr", "format": "", "indent": 0, "version": 1}
+NODE_DEFAULTS = {
+    "root": ELEMENT_DEFAULTS,
+    "paragraph": ELEMENT_DEFAULTS,
+    "heading": ELEMENT_DEFAULTS,
+    "quote": ELEMENT_DEFAULTS,
+    "link": ELEMENT_DEFAULTS,
+    "list": {**ELEMENT_DEFAULTS, "start": 1},
+    "listitem": {**ELEMENT_DEFAULTS, "value": 1},
+    "text": {"detail": 0, "format": 0, "mode": "normal", "style": "", "version": 1},
+    "linebreak": {"version": 1},
+}
+
+# Top-level marker of a compact document (underscore keys, since MongoDB restricts "$" field names)
+COMPACT_MARKER = "_c"
+# Default keys that were missing from the original node, so expansion does not invent them
+ABSENT_KEY = "_a"
+
+
+def _is_default(value, default) -> bool:
+    # Type check keeps True from matching 1 and 0.0 from matching 0
+    return type(value) is type(default) and value == default
+
+
+def _compact_node(node: dict) -> dict:
+    defaults = NODE_DEFAULTS.get(node.get("type"), {})
+    compact = {}
+    for key, value in node.items():
+        if key == "children":
+            continue
+        if key in defaults and _is_default(value, defaults[key]):
+            continue
+        compact[key] = value
+    
+    absent = [key for key in defaults if key not in node]
+    if absent:
+        compact[ABSENT_KEY] = absent
+    
+    children = node.get("children")
+    if isinstance(children, list):
+        compact["children"] = _merge_text_runs(
+            [_compact_node(child) if isinstance(child, dict) else child for child in children]
+        )
+    elif "children" in node:
+        compact["children"] = children
+    return compact
+
+
+def _mergeable(node) -> bool:
+    # Only plain text runs; token/segmented modes and detail flags must stay separate
+    return (
+        isinstance(node, dict)
+        and node.get("type") == "text"
+        and isinstance(node.get("text"), str)
+        and "mode" not in node
+        and "detail" not in node
+        and ABSENT_KEY not in node
+    )
+
+
+def _merge_text_runs(children: list) -> list:
+    merged = []
+    for child in children:
+        previous = merged[-1] if merged else None
+        if (
+            _mergeable(child)
+            and _mergeable(previous)
+            and {k: v for k, v in previous.items() if k != "text"} == {k: v for k, v in child.items() if k != "text"}
+        ):
+            merged[-1] = {**previous, "text": previous["text"] + child["text"]}
+        else:
+            merged.append(child)
+    return merged
+
+
+def _expand_node(node: dict) -> dict:
+    defaults = NODE_DEFAULTS.get(node.get("type"), {})
+    absent = node.get(ABSENT_KEY) or ()
+    expanded = {key: value for key, value in defaults.items() if key not in absent}
+    for key, value in node.items():
+        if key == ABSENT_KEY:
+            continue
+        if key == "children" and isinstance(value, list):
+            value = [_expand_node(child) if isinstance(child, dict) else child for child in value]
+        expanded[key] = value
+    return expanded
+
+
+def compact_lexical(content_json: dict) -> dict:
+    """
+    Canonical compact encoding of a Lexical document for storage.
+    
+    Drops values equal to the node type's defaults and merges adjacent text
+    runs with identical formatting (Lexical merges them on load anyway).
+    Already-compact and non-Lexical documents are returned unchanged.
+    
+    Args:
+        content_json: Lexical editor state ({"root": {...}})
+    
+    Returns:
+        Compact document marked with "_c"
+    """
+    if (
+        not isinstance(content_json, dict)
+        or content_json.get(COMPACT_MARKER)
+        or not isinstance(content_json.get("root"), dict)
+    ):
+        return content_json
+    compact = {key: value for key, value in content_json.items() if key != "root"}
+    compact["root"] = _compact_node(content_json["root"])
+    compact[COMPACT_MARKER] = 1
+    return compact
+
+
+def expand_lexical(content_json: dict) -> dict:
+    """
+    Restore the editor's full JSON shape from a compact document.
+    
+    Verbose (never compacted) documents are returned unchanged.
+    
+    Args:
+        content_json: Stored document
+    
+    Returns:
+        Lexical editor state as exported by the editor
+    """
+    if not isinstance(content_json, dict) or not content_json.get(COMPACT_MARKER):
+        return content_json
+    expanded = {key: value for key, value in content_json.items() if key not in ("root", COMPACT_MARKER)}
+    expanded["root"] = _expand_node(content_json["root"])
+    return expanded
+
+
+def encode_for_storage(content_json: dict) -> dict:
+    """Storage form of a document: compact when LEXICAL_COMPACT_STORAGE is enabled."""
+    if settings.LEXICAL_COMPACT_STORAGE:
+        return compact_lexical(content_json)
+    return content_json
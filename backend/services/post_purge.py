@@ -0,0 +1,92 @@
+"""
+Background purge of soft-deleted posts.
+Physically removes tombstoned posts once their retention period has passed
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from backend.core.config import settings
+from backend.repositories.provider import get_post_repository
+from backend.services.leases import acquire_lease, release_lease
+
+
+logger = logging.getLogger(__name__)
+
+# Only the instance holding this lease runs the purge
+PURGE_LEASE = "post_purge"
+
+_purge_task: Optional[asyncio.Task] = None
+
+
+async def purge_deleted_posts() -> int:
+    """
+    Delete tombstoned posts older than the retention period in throttled batches.
+    
+    Returns:
+        Number of posts physically removed
+    """
+    posts = get_post_repository()
+    cutoff = datetime.utcnow() - timedelta(days=settings.POST_RETENTION_DAYS)
+    batch_size = settings.POST_PURGE_BATCH_SIZE
+    purged = 0
+    
+    while True:
+        removed = await posts.purge_deleted(cutoff, batch_size)
+        purged += removed
+        
+        if removed < batch_size:
+            break
+        
+        # Throttle between batches so purging never competes with live traffic
+        await asyncio.sleep(settings.POST_PURGE_BATCH_DELAY_SECONDS)
+    
+    return purged
+
+
+async def _run_purge_loop():
+    """Run the purge periodically until cancelled."""
+    while True:
+        try:
+            # Renewed every run; another instance takes over if this one stops renewing
+            if await acquire_lease(PURGE_LEASE, 2 * settings.POST_PURGE_INTERVAL_SECONDS):
+                purged = await purge_deleted_posts()
+                if purged:
+                    logger.info("Purged deleted posts", extra={"purged": purged})
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Post purge failed")
+        
+        await asyncio.sleep(settings.POST_PURGE_INTERVAL_SECONDS)
+
+
+def start_post_purge():
+    """
+    Start the background purge task.
+    Should be called on application startup.
+    """
+    global _purge_task
+    if _purge_task is None or _purge_task.done():
+        _purge_task = asyncio.create_task(_run_purge_loop())
+
+
+async def stop_post_purge():
+    """
+    Stop the background purge task.
+    Should be called on application shutdown.
+    """
+    global _purge_task
+    if _purge_task is not None:
+        _purge_task.cancel()
+        try:
+            await _purge_task
+        except asyncio.CancelledError:
+            pass
+        _purge_task = None
+        try:
+            await release_lease(PURGE_LEASE)
+        except Exception:
+            # The lease expires on its own
+            logger.warning("Failed to release the post purge lease")
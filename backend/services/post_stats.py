@@ -0,0 +1,164 @@
+"""
+Materialized per-user post statistics
+Counters are adjusted atomically on every post write ($inc in MongoDB) and
+periodically reconciled against the posts to correct drift
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from backend.core.config import settings
+from backend.core.metrics import POST_STATS_CORRECTIONS
+from backend.repositories.provider import get_post_repository
+from backend.services.leases import acquire_lease, release_lease
+from backend.services.lexical import count_words
+
+
+logger = logging.getLogger(__name__)
+
+# Only the instance holding this lease runs the periodic reconciliation
+RECONCILE_LEASE = "post_stats_reconcile"
+
+_reconcile_task: Optional[asyncio.Task] = None
+
+
+def status_delta(status: str, sign: int = 1) -> dict:
+    """Counter change for one live post with the given status entering (+1) or leaving (-1)."""
+    return {"published" if status == "published" else "drafts": sign}
+
+
+def post_delta(post: dict, sign: int = 1) -> dict:
+    """Counter change for a whole live post being added (+1) or removed (-1)."""
+    return {**status_delta(post.get("status", "draft"), sign), "total_words": sign * post.get("word_count", 0)}
+
+
+def merge_deltas(*deltas: dict) -> dict:
+    """Sum counter changes, dropping zero entries."""
+    merged: dict = {}
+    for delta in deltas:
+        for key, value in delta.items():
+            merged[key] = merged.get(key, 0) + value
+    return {key: value for key, value in merged.items() if value}
+
+
+async def apply_stats_delta(user_id, delta: dict, activity_at: Optional[datetime] = None):
+    """
+    Adjust a user's counters atomically.
+
+    Users without stats are skipped; their stats are built from scratch by
+    reconciliation on the first read.
+
+    Args:
+        user_id: Owner of the posts
+        delta: Counter changes (drafts, published, total_words)
+        activity_at: Time of the write, kept as last_activity_at if newer
+    """
+    try:
+        await get_post_repository().apply_stats_delta(user_id, delta, activity_at)
+    except Exception:
+        # The post write already succeeded; reconciliation repairs the counters
+        logger.exception("Failed to update post stats", extra={"user_id": str(user_id)})
+
+
+async def backfill_word_counts(user_id=None) -> int:
+    """
+    Store word_count on posts written before counts were kept.
+
+    Args:
+        user_id: Limit to one user's posts (all users if None)
+
+    Returns:
+        Number of posts updated
+    """
+    posts = get_post_repository()
+    updated = 0
+    word_counts = {}
+    async for post in posts.iter_missing_word_counts(user_id):
+        word_counts[post["_id"]] = count_words(post.get("content_json") or {})
+        if len(word_counts) >= settings.POST_STATS_BATCH_SIZE:
+            updated += await posts.set_missing_word_counts(word_counts)
+            word_counts = {}
+    updated += await posts.set_missing_word_counts(word_counts)
+    return updated
+
+
+async def reconcile_user_stats(user_id=None) -> int:
+    """
+    Rebuild stats from the posts and correct counters that drifted.
+
+    Args:
+        user_id: Reconcile a single user (all users if None)
+
+    Returns:
+        Number of users whose stats were corrected or created
+    """
+    await backfill_word_counts(user_id)
+    corrected = await get_post_repository().reconcile_stats(user_id)
+    POST_STATS_CORRECTIONS.inc(corrected)
+    return corrected
+
+
+async def get_user_stats(user_id) -> dict:
+    """
+    Read a user's stats, building them on first access.
+
+    Args:
+        user_id: Owner of the posts
+
+    Returns:
+        Stats document (drafts, published, total_words, last_activity_at)
+    """
+    posts = get_post_repository()
+    stats = await posts.get_stats(user_id)
+    if stats is None:
+        await reconcile_user_stats(user_id)
+        stats = await posts.get_stats(user_id) or {}
+    return stats
+
+
+async def _run_reconcile_loop():
+    """Reconcile all users periodically until cancelled."""
+    while True:
+        await asyncio.sleep(settings.POST_STATS_RECONCILE_INTERVAL_SECONDS)
+        try:
+            # Renewed every run; another instance takes over if this one stops renewing
+            if not await acquire_lease(RECONCILE_LEASE, 2 * settings.POST_STATS_RECONCILE_INTERVAL_SECONDS):
+                continue
+            corrected = await reconcile_user_stats()
+            if corrected:
+                logger.warning("Corrected drifted post stats", extra={"users": corrected})
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Post stats reconciliation failed")
+
+
+def start_stats_reconciliation():
+    """
+    Start the background stats reconciliation task.
+    Should be called on application startup.
+    """
+    global _reconcile_task
+    if _reconcile_task is None or _reconcile_task.done():
+        _reconcile_task = asyncio.create_task(_run_reconcile_loop())
+
+
+async def stop_stats_reconciliation():
+    """
+    Stop the background stats reconciliation task.
+    Should be called on application shutdown.
+    """
+    global _reconcile_task
+    if _reconcile_task is not None:
+        _reconcile_task.cancel()
+        try:
+            await _reconcile_task
+        except asyncio.CancelledError:
+            pass
+        _reconcile_task = None
+        try:
+            await release_lease(RECONCILE_LEASE)
+        except Exception:
+            # The lease expires on its own
+            logger.warning("Failed to release the stats reconciliation lease")
@@ -0,0 +1,208 @@
+"""
+Token-bucket rate limiter state
+Buckets live in process memory (bounded LRU) or in Redis for limits shared by all instances
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Sequence, Tuple
+from backend.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# One limit checked by acquire(): (bucket key, refill rate per second, burst)
+BucketLimit = Tuple[str, float, float]
+
+# Refill every bucket, then take tokens from all of them or none; Redis time keeps
+# all instances on one clock. ARGV: cost, then rate and burst for each key
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local tokens = {}
+local rejected = 0
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2])
+    local burst = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = tonumber(state[1])
+    local ts = tonumber(state[2])
+    if available == nil then
+        available = burst
+        ts = now
+    end
+    available = math.min(burst, available + math.max(0, now - ts) * rate)
+    if available < cost then
+        if rejected == 0 then
+            rejected = i
+        end
+        wait = math.max(wait, (cost - available) / rate)
+    end
+    tokens[i] = available
+end
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2])
+    local burst = tonumber(ARGV[i * 2 + 1])
+    local available = tokens[i]
+    if rejected == 0 then
+        available = available - cost
+    end
+    redis.call('HSET', key, 'tokens', available, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000) + 1000)
+end
+return {rejected, tostring(wait)}
+"""
+
+
+class MemoryTokenBuckets:
+    """
+    Token buckets keyed by string, bounded to `max_keys` entries.
+
+    A bucket that has been idle long enough to refill completely is
+    indistinguishable from a new one, so evicting the least recently used
+    bucket never makes a limit stricter.
+
+    Each worker process has its own buckets, so rates and bursts are divided
+    by the number of workers to keep the total near the configured limit.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_keys: int, workers: int = 1):
+        self.max_keys = max_keys
+        self.workers = max(1, workers)
+        # key -> (tokens, last refill time)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def acquire(self, limits: Sequence[BucketLimit], cost: float = 1.0) -> Tuple[int, float]:
+        """
+        Take `cost` tokens from every bucket, or from none if any is short.
+
+        Args:
+            limits: Buckets to check, as (key, rate in tokens per second, burst)
+            cost: Tokens needed by this request
+
+        Returns:
+            Tuple of (index of the first bucket that rejected, or -1 if allowed,
+            seconds until every bucket has enough tokens)
+        """
+        now = time.monotonic()
+        refilled = []
+        rejected = -1
+        wait = 0.0
+        for index, (key, rate, burst) in enumerate(limits):
+            rate = rate / self.workers
+            # Never below one request, or small bursts would block every worker
+            burst = max(cost, burst / self.workers)
+            tokens, updated_at = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            if tokens < cost:
+                if rejected < 0:
+                    rejected = index
+                wait = max(wait, (cost - tokens) / rate)
+            refilled.append((key, tokens))
+
+        for key, tokens in refilled:
+            self._buckets[key] = (tokens - cost if rejected < 0 else tokens, now)
+
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return rejected, wait
+
+    async def close(self):
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RedisTokenBuckets:
+    """Token buckets stored in Redis hashes that expire once fully refilled."""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str):
+        # Imported lazily so the memory backend works without the redis package
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self.prefix = prefix
+
+    async def acquire(self, limits: Sequence[BucketLimit], cost: float = 1.0) -> Tuple[int, float]:
+        if not limits:
+            return -1, 0.0
+        args = [cost]
+        for _, rate, burst in limits:
+            args.extend((rate, burst))
+        try:
+            rejected, wait = await self._script(keys=[f"{self.prefix}{key}" for key, _, _ in limits], args=args)
+        except Exception as e:
+            # Fail open: an outage of the shared store must not take the API down
+            logger.warning("Rate limit store unavailable", extra={"error": f"{type(e).__name__}: {e}"})
+            return -1, 0.0
+        # Lua indexes from 1 and returns 0 when every bucket allowed the request
+        return int(rejected) - 1, float(wait)
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+_buckets = None
+
+
+async def open_rate_limiter():
+    """
+    Create the configured bucket store.
+    Should be called on application startup.
+    """
+    global _buckets
+    if _buckets is not None:
+        return
+
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        _buckets = RedisTokenBuckets(
+            settings.RATE_LIMIT_REDIS_URL or settings.CACHE_REDIS_URL,
+            prefix=f"{settings.CACHE_KEY_PREFIX}rl:"
+        )
+    else:
+        _buckets = MemoryTokenBuckets(settings.RATE_LIMIT_MAX_KEYS, workers=settings.SERVER_WORKERS)
+        if settings.SERVER_WORKERS > 1:
+            logger.warning(
+                "In-memory rate limits are split evenly across workers; use RATE_LIMIT_BACKEND=redis for exact limits",
+                extra={"workers": settings.SERVER_WORKERS}
+            )
+
+
+async def close_rate_limiter():
+    """
+    Close the bucket store.
+    Should be called on application shutdown.
+    """
+    global _buckets
+    if _buckets is not None:
+        await _buckets.close()
+        _buckets = None
+
+
+def get_rate_limiter():
+    """
+    Get the bucket store, falling back to process memory before startup.
+
+    Returns:
+        MemoryTokenBuckets or RedisTokenBuckets instance
+    """
+    global _buckets
+    if _buckets is None:
+        _buckets = MemoryTokenBuckets(settings.RATE_LIMIT_MAX_KEYS, workers=settings.SERVER_WORKERS)
+    return _buckets
+
+
+def retry_after_header(wait_seconds: float) -> str:
+    """Whole seconds for a Retry-After header (at least 1)."""
+    return str(max(1, math.ceil(wait_seconds)))
@@ -0,0 +1,117 @@
+"""
+Refresh-token sessions
+Refresh tokens are opaque, stored only as hashes, rotated on every use and
+grouped into families so reuse of a rotated token revokes the whole session
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from bson import ObjectId
+from backend.core.config import settings
+from backend.core.metrics import AUTH_REFRESHES
+from backend.core.security import generate_refresh_token, hash_refresh_token
+from backend.repositories.provider import get_user_repository
+
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token cannot be exchanged."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+async def issue_refresh_token(user_id, family_id: Optional[ObjectId] = None) -> str:
+    """
+    Create and store a refresh token.
+
+    Args:
+        user_id: Owner of the session
+        family_id: Session the token belongs to (a new session if None)
+
+    Returns:
+        Refresh token string; only its hash is stored
+    """
+    now = datetime.utcnow()
+    token = generate_refresh_token()
+    await get_user_repository().insert_refresh_token({
+        "token_hash": hash_refresh_token(token),
+        "family_id": family_id or ObjectId(),
+        "user_id": ObjectId(str(user_id)),
+        "created_at": now,
+        "expires_at": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        "used_at": None,
+        "revoked_at": None,
+    })
+    return token
+
+
+async def rotate_refresh_token(token: str) -> Tuple[ObjectId, str]:
+    """
+    Exchange a refresh token for a new one in the same session.
+
+    Presenting a token that was already rotated means it leaked or was
+    replayed, so the whole session is revoked.
+
+    Args:
+        token: Refresh token presented by the client
+
+    Returns:
+        Tuple of (user ID, new refresh token)
+
+    Raises:
+        RefreshTokenError: If the token is unknown, expired, revoked or reused
+    """
+    users = get_user_repository()
+    now = datetime.utcnow()
+    token_hash = hash_refresh_token(token)
+
+    # Mark the token used atomically, so only one exchange can succeed
+    current = await users.consume_refresh_token(token_hash, now)
+
+    if current is None:
+        existing = await users.get_refresh_token(token_hash)
+        if existing and existing.get("used_at") and not existing.get("revoked_at"):
+            await users.revoke_refresh_family(existing["family_id"], now)
+            AUTH_REFRESHES.labels(outcome="reused").inc()
+            logger.warning(
+                "Refresh token reuse detected; session revoked",
+                extra={"user_id": str(existing["user_id"]), "family_id": str(existing["family_id"])}
+            )
+            raise RefreshTokenError("reused")
+        AUTH_REFRESHES.labels(outcome="invalid").inc()
+        raise RefreshTokenError("invalid")
+
+    new_token = await issue_refresh_token(current["user_id"], current["family_id"])
+
+    # A reuse revocation may have landed between the exchange and the insert
+    latest = await users.get_refresh_token(token_hash)
+    if latest is None or latest.get("revoked_at"):
+        await users.revoke_refresh_family(current["family_id"], now)
+        AUTH_REFRESHES.labels(outcome="reused").inc()
+        raise RefreshTokenError("reused")
+
+    AUTH_REFRESHES.labels(outcome="rotated").inc()
+    return current["user_id"], new_token
+
+
+async def revoke_refresh_token(token: str) -> bool:
+    """
+    End the session a refresh token belongs to.
+
+    Args:
+        token: Refresh token presented by the client
+
+    Returns:
+        True if a session was found
+    """
+    users = get_user_repository()
+    existing = await users.get_refresh_token(hash_refresh_token(token))
+    if existing is None:
+        return False
+    await users.revoke_refresh_family(existing["family_id"], datetime.utcnow())
+    return True
@@ -0,0 +1,385 @@
+"""
+Related-post and near-duplicate index
+Each user's posts get NumPy TF-IDF vectors for "related posts" and MinHash
+signatures banded into LSH buckets for near-duplicate detection; indexes are
+built from storage on first query and kept current by post writes
+"""
+
+import asyncio
+import re
+import time
+import zlib
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from backend.core.config import settings
+from backend.core.metrics import SIMILARITY_INDEX_BUILD_DURATION
+from backend.repositories.provider import get_post_repository
+from backend.services.lexical import extract_plain_text
+
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+# Words per MinHash shingle
+SHINGLE_SIZE = 3
+# Prime just above 2**32; (a * x + b) stays below 2**64 for 32-bit shingle hashes
+MINHASH_PRIME = np.uint64((1 << 32) + 15)
+# Fixed seed so signatures are comparable across processes and restarts
+MINHASH_SEED = 1729
+# Posts indexed between event-loop yields while building
+BUILD_YIELD_EVERY = 50
+
+# (post ID, title, score) of one result
+SimilarPost = Tuple[str, str, float]
+
+_random = np.random.default_rng(MINHASH_SEED)
+_MINHASH_A = _random.integers(1, 1 << 31, size=(settings.SIMILARITY_MINHASH_PERMUTATIONS, 1), dtype=np.uint64)
+_MINHASH_B = _random.integers(0, 1 << 31, size=(settings.SIMILARITY_MINHASH_PERMUTATIONS, 1), dtype=np.uint64)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens of a text."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def minhash_signature(tokens: List[str]) -> np.ndarray:
+    """
+    MinHash signature of a token sequence's word shingles.
+
+    Texts shorter than a shingle are hashed as one shorter shingle, so short
+    drafts such as an empty "Untitled" still compare equal to each other.
+
+    Args:
+        tokens: Word tokens
+
+    Returns:
+        uint64 array of SIMILARITY_MINHASH_PERMUTATIONS minimum hashes
+    """
+    width = min(SHINGLE_SIZE, len(tokens))
+    if width == 0:
+        return np.full(settings.SIMILARITY_MINHASH_PERMUTATIONS, MINHASH_PRIME, dtype=np.uint64)
+    shingles = {
+        zlib.crc32(" ".join(tokens[start:start + width]).encode("utf-8"))
+        for start in range(len(tokens) - width + 1)
+    }
+    values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+    # One row per permutation: (a * x + b) mod p over every shingle, then the minimum
+    return ((_MINHASH_A * values + _MINHASH_B) % MINHASH_PRIME).min(axis=1)
+
+
+@dataclass
+class _Entry:
+    """Indexed features of one post."""
+
+    title: str
+    updated_at: Optional[datetime]
+    # Sorted vocabulary IDs and their sublinear term frequencies (1 + log tf)
+    term_ids: np.ndarray
+    term_weights: np.ndarray
+    signature: np.ndarray
+
+
+class UserSimilarityIndex:
+    """
+    Similarity index over one user's posts.
+
+    Related-post candidates come from inverted lists of the query's most
+    distinctive terms, read rarest first up to SIMILARITY_MAX_CANDIDATES, and
+    duplicate candidates from the query's LSH buckets, so query cost depends
+    on those bounds rather than on the number of posts.
+    """
+
+    def __init__(self):
+        self.built_at = time.monotonic()
+        self.building = False
+        # Posts written while building; the build must not overwrite them with older reads
+        self._pinned: Set[str] = set()
+        self._entries: Dict[str, _Entry] = {}
+        self._vocabulary: Dict[str, int] = {}
+        self._document_frequency = np.zeros(1024, dtype=np.int32)
+        self._postings: Dict[int, Set[str]] = {}
+        self._bands: List[Dict[bytes, Set[str]]] = [{} for _ in range(settings.SIMILARITY_LSH_BANDS)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_current(self, post: dict) -> bool:
+        """Whether the indexed version of a post is the given one."""
+        entry = self._entries.get(str(post["_id"]))
+        return entry is not None and entry.updated_at == post.get("updated_at")
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._vocabulary.get(term)
+        if term_id is None:
+            term_id = self._vocabulary[term] = len(self._vocabulary)
+            if term_id >= len(self._document_frequency):
+                self._document_frequency = np.concatenate(
+                    [self._document_frequency, np.zeros_like(self._document_frequency)]
+                )
+        return term_id
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        rows = len(signature) // len(self._bands)
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(len(self._bands))]
+
+    def _idf(self, term_ids: np.ndarray) -> np.ndarray:
+        # Smoothed IDF over the user's posts
+        count = len(self._entries)
+        return np.log((1 + count) / (1 + self._document_frequency[term_ids])) + 1
+
+    def add(self, post: dict, from_build: bool = False):
+        """
+        Index a post, replacing its previous version.
+
+        Args:
+            post: Post document (`_id`, `title`, `content_json`, `updated_at`)
+            from_build: Whether the post was read by the index build
+        """
+        post_id = str(post["_id"])
+        if from_build and post_id in self._pinned:
+            return
+        if self.building and not from_build:
+            self._pinned.add(post_id)
+        self._discard(post_id)
+
+        title = post.get("title") or ""
+        tokens = tokenize(f"{title}\n{extract_plain_text(post.get('content_json') or {})}")
+        counts = Counter(tokens)
+        term_ids = np.fromiter((self._term_id(term) for term in counts), dtype=np.int64, count=len(counts))
+        term_weights = 1 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+        order = np.argsort(term_ids)
+        term_ids, term_weights = term_ids[order], term_weights[order]
+        signature = minhash_signature(tokens)
+
+        self._document_frequency[term_ids] += 1
+        for term_id in term_ids.tolist():
+            self._postings.setdefault(term_id, set()).add(post_id)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._bands[band].setdefault(key, set()).add(post_id)
+        self._entries[post_id] = _Entry(title, post.get("updated_at"), term_ids, term_weights, signature)
+
+    def remove(self, post_id: str):
+        """Drop a post from the index."""
+        if self.building:
+            self._pinned.add(post_id)
+        self._discard(post_id)
+
+    def _discard(self, post_id: str):
+        entry = self._entries.pop(post_id, None)
+        if entry is None:
+            return
+        self._document_frequency[entry.term_ids] -= 1
+        for term_id in entry.term_ids.tolist():
+            posting = self._postings.get(term_id)
+            if posting is not None:
+                posting.discard(post_id)
+                if not posting:
+                    del self._postings[term_id]
+        for band, key in enumerate(self._band_keys(entry.signature)):
+            bucket = self._bands[band].get(key)
+            if bucket is not None:
+                bucket.discard(post_id)
+                if not bucket:
+                    del self._bands[band][key]
+
+    def finish_build(self):
+        """Mark the build complete and start the freshness clock."""
+        self.building = False
+        self._pinned.clear()
+        self.built_at = time.monotonic()
+
+    def related(self, post_id: str, limit: int) -> List[SimilarPost]:
+        """
+        Posts most similar to a post by TF-IDF cosine similarity.
+
+        Args:
+            post_id: Indexed post to compare against
+            limit: Maximum number of results
+
+        Returns:
+            List of (post ID, title, score), best first
+        """
+        entry = self._entries.get(post_id)
+        if entry is None or not len(entry.term_ids):
+            return []
+        query_weights = entry.term_weights * self._idf(entry.term_ids)
+
+        # Most distinctive query terms, then their posting lists rarest first
+        top_terms = entry.term_ids[np.argsort(-query_weights)[:settings.SIMILARITY_QUERY_TERMS]]
+        top_terms = top_terms[np.argsort(self._document_frequency[top_terms], kind="stable")]
+        budget = settings.SIMILARITY_MAX_CANDIDATES
+        candidates: Dict[str, None] = {}
+        for term_id in top_terms.tolist():
+            for candidate in self._postings.get(term_id, ()):
+                if candidate != post_id:
+                    candidates[candidate] = None
+                    if len(candidates) >= budget:
+                        break
+            if len(candidates) >= budget:
+                break
+        if not candidates:
+            return []
+
+        # Score every candidate in one pass over their concatenated sparse vectors
+        candidate_ids = list(candidates)
+        candidate_entries = [self._entries[candidate] for candidate in candidate_ids]
+        lengths = np.fromiter((len(e.term_ids) for e in candidate_entries), dtype=np.int64, count=len(candidate_entries))
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        term_ids = np.concatenate([e.term_ids for e in candidate_entries])
+        weights = np.concatenate([e.term_weights for e in candidate_entries]) * self._idf(term_ids)
+
+        positions = np.minimum(np.searchsorted(entry.term_ids, term_ids), len(entry.term_ids) - 1)
+        matched = np.where(entry.term_ids[positions] == term_ids, query_weights[positions], 0.0)
+        dots = np.add.reduceat(weights * matched, offsets)
+        norms = np.sqrt(np.add.reduceat(weights * weights, offsets)) * np.linalg.norm(query_weights)
+        scores = dots / norms
+
+        count = min(limit, len(scores))
+        best = np.argpartition(-scores, count - 1)[:count]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [
+            (candidate_ids[i], candidate_entries[i].title, round(float(scores[i]), 4))
+            for i in best.tolist()
+            if scores[i] > 0
+        ]
+
+    def duplicates(self, post_id: str, limit: int) -> List[SimilarPost]:
+        """
+        Near-duplicates of a post by estimated Jaccard similarity of word shingles.
+
+        Args:
+            post_id: Indexed post to compare against
+            limit: Maximum number of results
+
+        Returns:
+            List of (post ID, title, similarity) at or above
+            SIMILARITY_DUPLICATE_THRESHOLD, most similar first
+        """
+        entry = self._entries.get(post_id)
+        if entry is None:
+            return []
+        budget = settings.SIMILARITY_MAX_CANDIDATES
+        candidates: Dict[str, None] = {}
+        for band, key in enumerate(self._band_keys(entry.signature)):
+            for candidate in self._bands[band].get(key, ()):
+                if candidate != post_id:
+                    candidates[candidate] = None
+                    if len(candidates) >= budget:
+                        break
+            if len(candidates) >= budget:
+                break
+        if not candidates:
+            return []
+
+        candidate_ids = list(candidates)
+        signatures = np.stack([self._entries[candidate].signature for candidate in candidate_ids])
+        similarity = (signatures == entry.signature).mean(axis=1)
+        order = np.argsort(-similarity, kind="stable")
+        results = []
+        for i in order.tolist():
+            if similarity[i] < settings.SIMILARITY_DUPLICATE_THRESHOLD or len(results) >= limit:
+                break
+            results.append((candidate_ids[i], self._entries[candidate_ids[i]].title, round(float(similarity[i]), 4)))
+        return results
+
+
+# Loaded indexes by user ID, least recently used first
+_indexes: "OrderedDict[str, UserSimilarityIndex]" = OrderedDict()
+_build_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _is_fresh(index: Optional[UserSimilarityIndex]) -> bool:
+    # Rebuilt periodically so writes made through other instances show up
+    return (
+        index is not None
+        and not index.building
+        and time.monotonic() - index.built_at < settings.SIMILARITY_INDEX_TTL_SECONDS
+    )
+
+
+async def _get_index(user_id) -> UserSimilarityIndex:
+    """Return the user's index, building it from storage if missing or stale."""
+    key = str(user_id)
+    index = _indexes.get(key)
+    if _is_fresh(index):
+        _indexes.move_to_end(key)
+        return index
+
+    lock = _build_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        index = _indexes.get(key)
+        if _is_fresh(index):
+            _indexes.move_to_end(key)
+            return index
+
+        # Registered before loading so concurrent writes reach it
+        index = UserSimilarityIndex()
+        index.building = True
+        _indexes[key] = index
+        _indexes.move_to_end(key)
+        started = time.perf_counter()
+        posts = get_post_repository().iter_by_user(user_id, settings.POST_EXPORT_BATCH_SIZE)
+        try:
+            async for post in posts:
+                index.add(post, from_build=True)
+                if len(index) % BUILD_YIELD_EVERY == 0:
+                    await asyncio.sleep(0)
+        except BaseException:
+            if _indexes.get(key) is index:
+                del _indexes[key]
+            raise
+        finally:
+            await posts.aclose()
+            _build_locks.pop(key, None)
+        index.finish_build()
+        SIMILARITY_INDEX_BUILD_DURATION.observe(time.perf_counter() - started)
+
+        while len(_indexes) > settings.SIMILARITY_MAX_INDEXED_USERS:
+            _indexes.popitem(last=False)
+        return index
+
+
+async def find_similar(user_id, post: dict, limit: int) -> Tuple[List[SimilarPost], List[SimilarPost]]:
+    """
+    Related posts and near-duplicates of one of a user's posts.
+
+    Args:
+        user_id: Owner of the post
+        post: The post as just read from storage
+        limit: Maximum results per list
+
+    Returns:
+        Tuple of (related, duplicates), each a list of (post ID, title, score)
+    """
+    index = await _get_index(user_id)
+    post_id = str(post["_id"])
+    # The post may have been written through another instance since the build
+    if not index.is_current(post):
+        index.add(post)
+    return index.related(post_id, limit), index.duplicates(post_id, limit)
+
+
+def index_post(user_id, post: dict):
+    """
+    Re-index a written post if its owner's index is loaded.
+
+    Args:
+        user_id: Owner of the post
+        post: Post document (`_id`, `title`, `content_json`, `updated_at`)
+    """
+    index = _indexes.get(str(user_id))
+    if index is not None:
+        index.add(post)
+
+
+def remove_post(user_id, post_id):
+    """Drop a deleted post from its owner's index if loaded."""
+    index = _indexes.get(str(user_id))
+    if index is not None:
+        index.remove(str(post_id))
+
+
+def drop_user_index(user_id):
+    """Forget a user's index after writes too large to apply one by one (rebuilt on next query)."""
+    _indexes.pop(str(user_id), None)
@@ -0,0 +1,230 @@
+"""
+Local token estimation and input budgeting for Gemini calls
+Oversized input is rejected, truncated or split into chunks before any network call
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import List, Literal
+from backend.core.config import settings
+from backend.core.metrics import AI_INPUT_PLANS, GEMINI_TOKEN_CALIBRATION, GEMINI_TOKEN_ESTIMATE_RATIO
+
+
+# Runs of letters (CJK excluded) and characters that are roughly one token each:
+# digits, CJK characters and punctuation
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af"
+_WORD_PATTERN = re.compile(rf"[^\W\d_{_CJK}]+")
+_SINGLE_TOKEN_PATTERN = re.compile(rf"[\d{_CJK}]|[^\w\s]|_")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class TokenBudgetExceeded(Exception):
+    """Raised when input is larger than the configured budget allows."""
+
+    def __init__(self, estimated_tokens: int, limit: int):
+        super().__init__(f"Input is about {estimated_tokens} tokens; the limit is {limit}")
+        self.estimated_tokens = estimated_tokens
+        self.limit = limit
+
+
+class TokenCalibrator:
+    """Tracks the ratio of actual (Gemini-reported) to locally estimated prompt tokens."""
+
+    def __init__(self, smoothing: float = 0.1, low: float = 0.5, high: float = 2.0):
+        self.smoothing = smoothing
+        self.low = low
+        self.high = high
+        self.factor = 1.0
+
+    def record(self, raw_estimate: int, actual: int):
+        """
+        Fold one observation into the correction factor.
+
+        Args:
+            raw_estimate: Uncalibrated local estimate of the prompt
+            actual: promptTokenCount reported by Gemini
+        """
+        if raw_estimate <= 0 or actual <= 0:
+            return
+        ratio = actual / raw_estimate
+        GEMINI_TOKEN_ESTIMATE_RATIO.observe(ratio / self.factor)
+        factor = (1 - self.smoothing) * self.factor + self.smoothing * ratio
+        self.factor = min(self.high, max(self.low, factor))
+        GEMINI_TOKEN_CALIBRATION.set(self.factor)
+
+
+# Process-wide calibration shared by all estimates
+calibrator = TokenCalibrator()
+
+
+def estimate_raw_tokens(text: str) -> int:
+    """
+    Uncalibrated token estimate.
+
+    Words count about one token per four letters (at least one per word);
+    digits, CJK characters and punctuation marks count one token each.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count (at least 1 for non-empty text)
+    """
+    if not text:
+        return 0
+    # Counting with C-level regex scans keeps this around a millisecond per 10k characters
+    words = _WORD_PATTERN.findall(text)
+    word_tokens = max(len(words), round(sum(map(len, words)) / 4.0))
+    return max(1, word_tokens + len(_SINGLE_TOKEN_PATTERN.findall(text)))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Calibrated token estimate.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    return math.ceil(estimate_raw_tokens(text) * calibrator.factor)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text to roughly `max_tokens`, preferring a sentence or paragraph boundary.
+
+    Args:
+        text: Text to cut
+        max_tokens: Token budget
+
+    Returns:
+        Text that fits the budget
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # Binary search on length; estimates grow monotonically with prefix length.
+    # No useful prefix needs more than 8 characters per token, which bounds each scan
+    low, high = 0, min(len(text), max_tokens * 8)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    cut = text[:low]
+    boundary = max(cut.rfind("\n"), cut.rfind(". "))
+    if boundary > len(cut) // 2:
+        cut = cut[:boundary + 1]
+    return cut.rstrip()
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text into chunks of at most `max_tokens`, on paragraph then sentence boundaries.
+
+    Args:
+        text: Text to split
+        max_tokens: Token budget per chunk
+
+    Returns:
+        Chunks in document order
+    """
+    pieces: List[str] = []
+    for paragraph in text.split("\n"):
+        if estimate_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        for sentence in _SENTENCE_END.split(paragraph):
+            while estimate_tokens(sentence) > max_tokens:
+                head = truncate_to_tokens(sentence, max_tokens)
+                if not head:
+                    head = sentence[:max_tokens]
+                pieces.append(head)
+                sentence = sentence[len(head):].lstrip()
+            pieces.append(sentence)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece) + 1
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n".join(current).strip())
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n".join(current).strip())
+    return [chunk for chunk in chunks if chunk]
+
+
+@dataclass
+class InputPlan:
+    """How a piece of input will be sent to Gemini."""
+
+    mode: Literal["single", "chunked"]
+    chunks: List[str]
+    estimated_tokens: int
+    truncated: bool = False
+
+
+def check_input_size(text: str) -> int:
+    """
+    Reject input above the absolute cap before any further work.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Estimated token count
+
+    Raises:
+        TokenBudgetExceeded: If the input exceeds AI_MAX_TOTAL_INPUT_TOKENS
+    """
+    limit = settings.AI_MAX_TOTAL_INPUT_TOKENS
+    # Cheap bound first: far more characters than any real text needs for the limit
+    if len(text) > limit * 8:
+        raise TokenBudgetExceeded(len(text) // 4, limit)
+    estimated = estimate_tokens(text)
+    if estimated > limit:
+        raise TokenBudgetExceeded(estimated, limit)
+    return estimated
+
+
+def plan_input(text: str) -> InputPlan:
+    """
+    Decide between a single call and chunked processing for one input.
+
+    Args:
+        text: Input text
+
+    Returns:
+        InputPlan according to AI_INPUT_OVERFLOW ("reject", "truncate" or "chunk")
+
+    Raises:
+        TokenBudgetExceeded: If the input is over the absolute cap, or over the
+            single-call budget with the "reject" policy
+    """
+    try:
+        estimated = check_input_size(text)
+    except TokenBudgetExceeded:
+        AI_INPUT_PLANS.labels(mode="rejected").inc()
+        raise
+
+    budget = settings.AI_MAX_INPUT_TOKENS
+    if estimated <= budget:
+        AI_INPUT_PLANS.labels(mode="single").inc()
+        return InputPlan(mode="single", chunks=[text], estimated_tokens=estimated)
+
+    policy = settings.AI_INPUT_OVERFLOW
+    if policy == "reject":
+        AI_INPUT_PLANS.labels(mode="rejected").inc()
+        raise TokenBudgetExceeded(estimated, budget)
+    if policy == "truncate":
+        AI_INPUT_PLANS.labels(mode="truncated").inc()
+        return InputPlan(mode="single", chunks=[truncate_to_tokens(text, budget)], estimated_tokens=budget, truncated=True)
+    AI_INPUT_PLANS.labels(mode="chunked").inc()
+    return InputPlan(mode="chunked", chunks=split_into_chunks(text, settings.AI_CHUNK_TOKENS), estimated_tokens=estimated)
@@ -0,0 +1,24 @@
+"""
+Shared pytest setup.
+Required settings get test values before any backend module loads them
+"""
+
+import asyncio
+import os
+import pytest
+
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+
+@pytest.fixture
+def repositories():
+    """Fresh in-memory user and post repositories for one test."""
+    from backend.repositories import provider
+
+    asyncio.run(provider.close_repositories())
+    provider.open_repositories()
+    yield provider.get_user_repository(), provider.get_post_repository()
+    asyncio.run(provider.close_repositories())
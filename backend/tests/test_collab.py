@@ -0,0 +1,87 @@
+"""
+Tests for collaborative editing rooms (services/collab.py).
+"""
+import json
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from backend.services.collab import CollabManager, CollabRoom, CollabSession
+from backend.services.collab_document import CollabOperationError
+
+
+def paragraph(text: str) -> dict:
+    return {"type": "paragraph", "children": [{"type": "text", "text": text}]}
+
+
+@pytest.fixture
+def room_with_peers():
+    """A manager with one room and two unstarted sessions whose queues can be inspected."""
+    post = {
+        "_id": ObjectId(),
+        "user_id": ObjectId(),
+        "title": "Title",
+        "content_json": {"root": {"type": "root", "children": [paragraph("one")]}},
+        "updated_at": datetime(2024, 1, 1),
+    }
+    manager = CollabManager()
+    room = CollabRoom(post)
+    manager.rooms[room.post_id] = room
+    for site in ("a", "b"):
+        room.sessions[site] = CollabSession(websocket=None, site=site)
+    return manager, room
+
+
+def queued(session: CollabSession) -> list:
+    messages = []
+    while not session.queue.empty():
+        messages.append(json.loads(session.queue.get_nowait()))
+    return messages
+
+
+def test_batch_is_relayed_to_the_other_sessions(room_with_peers):
+    manager, room = room_with_peers
+    author, peer = room.sessions["a"], room.sessions["b"]
+
+    seq = manager.apply(room.post_id, author, [{"kind": "title", "clock": 1, "title": "New"}])
+
+    assert seq == 1
+    assert room.dirty
+    assert queued(author) == []
+    assert queued(peer) == [{"type": "ops", "site": "a", "seq": 1, "ops": [{"kind": "title", "clock": 1, "title": "New"}]}]
+
+
+def test_invalid_op_still_relays_the_operations_applied_before_it(room_with_peers):
+    manager, room = room_with_peers
+    ops = [
+        {"kind": "insert", "clock": 1, "after": [0, "init000000"], "node": paragraph("two")},
+        {"kind": "title", "clock": 2, "title": "New"},
+        {"kind": "delete", "clock": 3, "id": [9, "missing"]},
+        {"kind": "title", "clock": 4, "title": "Never applied"},
+    ]
+
+    with pytest.raises(CollabOperationError):
+        manager.apply(room.post_id, room.sessions["a"], ops)
+
+    relayed = queued(room.sessions["b"])
+    assert [message["ops"] for message in relayed] == [ops[:2]]
+    assert room.seq == 1
+    assert room.dirty
+    assert room.document.title == "New"
+
+
+def test_invalid_first_op_changes_nothing(room_with_peers):
+    manager, room = room_with_peers
+
+    with pytest.raises(CollabOperationError):
+        manager.apply(room.post_id, room.sessions["a"], [{"kind": "move", "clock": 1}])
+
+    assert queued(room.sessions["b"]) == []
+    assert (room.seq, room.dirty) == (0, False)
+
+
+def test_session_outside_the_room_is_ignored(room_with_peers):
+    manager, room = room_with_peers
+    stranger = CollabSession(websocket=None, site="a")
+
+    assert manager.apply(room.post_id, stranger, [{"kind": "title", "clock": 1, "title": "New"}]) is None
+    assert room.document.title == "Title"
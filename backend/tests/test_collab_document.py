@@ -0,0 +1,91 @@
+"""
+Tests for the collaborative editing CRDT (services/collab_document.py).
+"""
+import itertools
+import pytest
+from backend.services.collab_document import CollabDocument, CollabOperationError
+
+
+def paragraph(text: str) -> dict:
+    return {"type": "paragraph", "children": [{"type": "text", "text": text}]}
+
+
+def stored(*texts: str) -> dict:
+    return {"root": {"type": "root", "direction": "ltr", "children": [paragraph(text) for text in texts]}}
+
+
+def texts(document: CollabDocument) -> list:
+    return [node["children"][0]["text"] for node in document.to_content_json()["root"]["children"]]
+
+
+def test_loads_stored_content_unchanged():
+    content = stored("one", "two")
+    document = CollabDocument("Title", content)
+
+    assert document.to_content_json() == content
+    assert [block["id"] for block in document.state()["blocks"]] == [[0, "init000000"], [0, "init000001"]]
+
+
+def test_concurrent_operations_converge_in_any_order():
+    # Two sites edit the same stored document without seeing each other's operations
+    ops = [
+        ("a", {"kind": "insert", "clock": 1, "after": [0, "init000000"], "node": paragraph("from a")}),
+        ("b", {"kind": "insert", "clock": 1, "after": [0, "init000000"], "node": paragraph("from b")}),
+        ("a", {"kind": "update", "clock": 2, "id": [0, "init000001"], "node": paragraph("two by a")}),
+        ("b", {"kind": "update", "clock": 2, "id": [0, "init000001"], "node": paragraph("two by b")}),
+        ("a", {"kind": "title", "clock": 3, "title": "Title by a"}),
+        ("b", {"kind": "delete", "clock": 3, "id": [0, "init000000"]}),
+    ]
+
+    results = set()
+    for order in itertools.permutations(ops):
+        document = CollabDocument("Title", stored("one", "two"))
+        for site, op in order:
+            document.apply(site, op)
+        results.add((document.title, tuple(texts(document))))
+
+    assert results == {("Title by a", ("from b", "from a", "two by b"))}
+
+
+def test_insert_after_deleted_block_uses_tombstone():
+    document = CollabDocument("Title", stored("one"))
+    document.apply("a", {"kind": "delete", "clock": 1, "id": [0, "init000000"]})
+    document.apply("b", {"kind": "insert", "clock": 1, "after": [0, "init000000"], "node": paragraph("kept")})
+
+    assert texts(document) == ["kept"]
+    assert document.state()["blocks"][0]["deleted"] is True
+
+
+def test_duplicate_and_superseded_operations_change_nothing():
+    document = CollabDocument("Title", stored("one"))
+    insert = {"kind": "insert", "clock": 2, "after": None, "node": paragraph("first")}
+
+    assert document.apply("a", insert) is not None
+    assert document.apply("a", insert) is None
+    assert document.apply("a", {"kind": "title", "clock": 3, "title": "New"}) is not None
+    assert document.apply("b", {"kind": "title", "clock": 1, "title": "Old"}) is None
+    assert document.title == "New"
+    assert document.clock == 3
+
+
+def test_update_of_deleted_block_is_ignored():
+    document = CollabDocument("Title", stored("one"))
+    document.apply("a", {"kind": "delete", "clock": 1, "id": [0, "init000000"]})
+
+    assert document.apply("b", {"kind": "update", "clock": 5, "id": [0, "init000000"], "node": paragraph("x")}) is None
+    assert texts(document) == []
+
+
+@pytest.mark.parametrize("op", [
+    "not an object",
+    {"kind": "move", "clock": 1},
+    {"kind": "title", "clock": 0, "title": "x"},
+    {"kind": "title", "clock": 1, "title": 42},
+    {"kind": "insert", "clock": 1, "after": [9, "nope"], "node": paragraph("x")},
+    {"kind": "delete", "clock": 1, "id": [9, "nope"]},
+])
+def test_invalid_operations_are_rejected(op):
+    document = CollabDocument("Title", stored("one"))
+
+    with pytest.raises(CollabOperationError):
+        document.apply("a", op)
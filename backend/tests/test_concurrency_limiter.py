@@ -0,0 +1,135 @@
+"""
+Tests for adaptive concurrency limiting (services/concurrency_limiter.py).
+"""
+import asyncio
+import time
+import pytest
+from backend.core.config import settings
+from backend.services.concurrency_limiter import AdaptiveLimit, ConcurrencyLimiter
+
+
+def route_class(initial: float, priority: int = 0, queue_timeout: float = 0.0) -> dict:
+    return {"initial": initial, "min": 1, "max": 20, "priority": priority, "queue_timeout": queue_timeout}
+
+
+@pytest.fixture
+def windows(monkeypatch):
+    """Close a latency window after every CONCURRENCY_WINDOW_MIN_SAMPLES requests."""
+    monkeypatch.setattr(settings, "CONCURRENCY_WINDOW_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "CONCURRENCY_WINDOW_MIN_SAMPLES", 4)
+
+
+def run_window(limit: AdaptiveLimit, latency: float, parallel: bool):
+    """Complete one window of requests, all in flight together or one at a time."""
+    samples = settings.CONCURRENCY_WINDOW_MIN_SAMPLES
+    if parallel:
+        for _ in range(samples):
+            limit.admit()
+    for _ in range(samples):
+        if not parallel:
+            limit.admit()
+        limit.release(latency, time.monotonic())
+
+
+def test_admits_up_to_capacity_then_sheds():
+    limiter = ConcurrencyLimiter({"api": route_class(2)})
+
+    async def scenario():
+        admitted = [await limiter.acquire("api") for _ in range(3)]
+        limiter.release("api", None)
+        return admitted, await limiter.acquire("api")
+
+    assert asyncio.run(scenario()) == ([True, True, False], True)
+
+
+def test_released_slot_goes_to_the_waiting_request():
+    limiter = ConcurrencyLimiter({"api": route_class(1, queue_timeout=5.0)})
+
+    async def scenario():
+        await limiter.acquire("api")
+        waiting = asyncio.create_task(limiter.acquire("api"))
+        await asyncio.sleep(0)
+        queued = not waiting.done()
+        limiter.release("api", None)
+        return queued, await waiting, limiter._limits["api"].in_flight
+
+    assert asyncio.run(scenario()) == (True, True, 1)
+
+
+def test_queued_request_is_shed_after_its_timeout():
+    limiter = ConcurrencyLimiter({"api": route_class(1, queue_timeout=0.01)})
+
+    async def scenario():
+        await limiter.acquire("api")
+        return await limiter.acquire("api"), len(limiter._limits["api"].waiters)
+
+    assert asyncio.run(scenario()) == (False, 0)
+
+
+def test_cancelled_waiter_does_not_hold_a_slot():
+    limiter = ConcurrencyLimiter({"api": route_class(1, queue_timeout=5.0)})
+
+    async def scenario():
+        await limiter.acquire("api")
+        waiting = asyncio.create_task(limiter.acquire("api"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        limiter.release("api", None)
+        return limiter._limits["api"].in_flight, await limiter.acquire("api")
+
+    assert asyncio.run(scenario()) == (0, True)
+
+
+def test_lower_priority_class_gives_way_while_a_higher_one_is_congested(monkeypatch):
+    monkeypatch.setattr(settings, "CONCURRENCY_DEGRADED_SHARE", 0.5)
+    limiter = ConcurrencyLimiter({"auth": route_class(1, priority=0), "ai": route_class(4, priority=1)})
+
+    async def scenario():
+        await limiter.acquire("auth")
+        # A shed auth request marks its class congested
+        assert not await limiter.acquire("auth")
+        return [await limiter.acquire("ai") for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [True, True, False]
+
+
+def test_more_important_class_keeps_its_full_limit():
+    limiter = ConcurrencyLimiter({"auth": route_class(2, priority=0), "ai": route_class(1, priority=1)})
+
+    async def scenario():
+        await limiter.acquire("ai")
+        assert not await limiter.acquire("ai")
+        return [await limiter.acquire("auth") for _ in range(2)]
+
+    assert asyncio.run(scenario()) == [True, True]
+
+
+def test_limit_shrinks_when_latency_rises_above_the_baseline(windows):
+    limit = AdaptiveLimit("api", initial=10, min_limit=4, max_limit=20, priority=0, queue_timeout=0)
+    run_window(limit, 0.1, parallel=False)
+    assert limit.retry_after() == pytest.approx(0.1)
+
+    limits = []
+    for _ in range(10):
+        run_window(limit, 1.0, parallel=False)
+        limits.append(limit.limit)
+
+    assert limits == sorted(limits, reverse=True)
+    assert limits[0] < 10
+    assert limits[-1] == 4
+
+
+def test_limit_grows_only_while_the_slots_are_in_use(windows):
+    limit = AdaptiveLimit("api", initial=6, min_limit=1, max_limit=20, priority=0, queue_timeout=0)
+    run_window(limit, 0.1, parallel=False)
+
+    for _ in range(5):
+        run_window(limit, 0.1, parallel=False)
+    idle = limit.limit
+    for _ in range(5):
+        run_window(limit, 0.1, parallel=True)
+
+    assert idle == 6
+    assert limit.limit > 6
@@ -0,0 +1,181 @@
+"""
+Tests for the compact Lexical storage encoding (services/lexical.py).
+"""
+import copy
+import random
+import pytest
+from backend.core.config import settings
+from backend.services.lexical import (
+    ABSENT_KEY,
+    COMPACT_MARKER,
+    NODE_DEFAULTS,
+    compact_lexical,
+    encode_for_storage,
+    expand_lexical,
+    extract_plain_text,
+)
+
+
+def text(value: str, **attrs) -> dict:
+    return {"detail": 0, "format": 0, "mode": "normal", "style": "", "text": value, "type": "text", "version": 1, **attrs}
+
+
+def element(node_type: str, children: list, **attrs) -> dict:
+    return {"children": children, **NODE_DEFAULTS[node_type], "type": node_type, **attrs}
+
+
+def document(*blocks) -> dict:
+    return {"root": element("root", list(blocks))}
+
+
+def random_text(rng: random.Random) -> dict:
+    node = text(rng.choice(["a", "b c", " ", "word", ""]))
+    if rng.random() < 0.3:
+        node["format"] = rng.choice([0, 1, 2, 3])
+    if rng.random() < 0.2:
+        node["style"] = rng.choice(["", "color: red"])
+    if rng.random() < 0.1:
+        node["mode"] = rng.choice(["token", "segmented"])
+    if rng.random() < 0.1:
+        node["detail"] = 1
+    if rng.random() < 0.1:
+        del node[rng.choice(["detail", "format", "mode", "style", "version"])]
+    return node
+
+
+def random_block(rng: random.Random, depth: int = 0) -> dict:
+    children = []
+    for _ in range(rng.randint(0, 5)):
+        roll = rng.random()
+        if roll < 0.1:
+            children.append({"type": "linebreak", "version": 1})
+        elif roll < 0.2 and depth < 2:
+            children.append(random_block(rng, depth + 1) | {"type": "link", "url": "https://example.com"})
+        else:
+            children.append(random_text(rng))
+    node_type = rng.choice(["paragraph", "heading", "quote", "listitem"])
+    attrs = {}
+    if node_type == "heading":
+        attrs["tag"] = rng.choice(["h1", "h2"])
+    if rng.random() < 0.2:
+        attrs["format"] = "center"
+    if rng.random() < 0.1:
+        attrs["indent"] = 1
+    return element(node_type, children, **attrs)
+
+
+def merge_reference(node: dict) -> dict:
+    """What Lexical would load: adjacent plain text runs with identical attributes joined."""
+    node = dict(node)
+    if isinstance(node.get("children"), list):
+        merged = []
+        for child in (merge_reference(child) for child in node["children"]):
+            previous = merged[-1] if merged else None
+            if (
+                previous is not None
+                and all(_plain_run(run) for run in (previous, child))
+                and {k: v for k, v in previous.items() if k != "text"} == {k: v for k, v in child.items() if k != "text"}
+            ):
+                merged[-1] = {**previous, "text": previous["text"] + child["text"]}
+            else:
+                merged.append(child)
+        node["children"] = merged
+    return node
+
+
+def _plain_run(node: dict) -> bool:
+    defaults = NODE_DEFAULTS["text"]
+    return (
+        node.get("type") == "text"
+        and all(key in node for key in defaults)
+        and node["mode"] == "normal"
+        and type(node["detail"]) is int
+        and node["detail"] == 0
+    )
+
+
+def test_round_trip_of_generated_documents():
+    rng = random.Random(1234)
+    for _ in range(300):
+        original = document(*(random_block(rng) for _ in range(rng.randint(0, 4))))
+        snapshot = copy.deepcopy(original)
+
+        restored = expand_lexical(compact_lexical(original))
+
+        assert restored == {"root": merge_reference(original["root"])}
+        assert extract_plain_text(restored) == extract_plain_text(original)
+        assert original == snapshot
+
+
+def test_defaults_are_dropped_and_restored():
+    original = document(element("paragraph", [text("Hello")]))
+
+    compact = compact_lexical(original)
+
+    assert compact == {"root": {"type": "root", "children": [{"type": "paragraph", "children": [{"type": "text", "text": "Hello"}]}]}, COMPACT_MARKER: 1}
+    assert expand_lexical(compact) == original
+
+
+def test_missing_default_keys_are_not_invented():
+    node = text("Hi")
+    del node["style"]
+    del node["version"]
+    original = document(element("paragraph", [node]))
+
+    compact = compact_lexical(original)
+
+    assert compact["root"]["children"][0]["children"][0][ABSENT_KEY] == ["style", "version"]
+    assert expand_lexical(compact) == original
+
+
+def test_identical_adjacent_runs_are_merged():
+    original = document(element("paragraph", [text("Hello, "), text("world")]))
+
+    runs = compact_lexical(original)["root"]["children"][0]["children"]
+
+    assert runs == [{"type": "text", "text": "Hello, world"}]
+
+
+@pytest.mark.parametrize("second", [
+    text("b", format=1),
+    text("b", style="color: red"),
+    text("b", detail=1),
+    text("b", mode="token"),
+    {key: value for key, value in text("b").items() if key != "version"},
+])
+def test_runs_with_different_attributes_stay_separate(second):
+    original = document(element("paragraph", [text("a"), second]))
+
+    compact = compact_lexical(original)
+
+    assert len(compact["root"]["children"][0]["children"]) == 2
+    assert expand_lexical(compact) == original
+
+
+def test_compact_input_passes_through():
+    compact = compact_lexical(document(element("paragraph", [text("Hi")])))
+
+    assert compact_lexical(compact) is compact
+    assert compact_lexical(copy.deepcopy(compact)) == compact
+
+
+def test_legacy_verbose_documents_expand_unchanged():
+    original = document(element("paragraph", [text("Stored before compaction")]))
+
+    assert expand_lexical(original) is original
+
+
+@pytest.mark.parametrize("value", [None, {}, {"root": "not a node"}, {"blocks": []}])
+def test_non_lexical_values_pass_through(value):
+    assert compact_lexical(value) is value
+    assert expand_lexical(value) is value
+
+
+def test_encode_for_storage_follows_setting(monkeypatch):
+    original = document(element("paragraph", [text("Hi")]))
+
+    monkeypatch.setattr(settings, "LEXICAL_COMPACT_STORAGE", False)
+    assert encode_for_storage(original) is original
+
+    monkeypatch.setattr(settings, "LEXICAL_COMPACT_STORAGE", True)
+    assert encode_for_storage(original)[COMPACT_MARKER] == 1
@@ -0,0 +1,252 @@
+"""
+Tests for the in-memory repositories (repositories/memory.py).
+"""
+import asyncio
+from datetime import datetime, timedelta
+from bson import ObjectId
+from backend.repositories.base import PostWrite
+
+
+OWNER = ObjectId()
+OTHER = ObjectId()
+START = datetime(2024, 1, 1)
+
+
+def post(user_id=OWNER, minutes: int = 0, **fields) -> dict:
+    return {
+        "user_id": user_id,
+        "title": "Title",
+        "content_json": None,
+        "status": "draft",
+        "word_count": 0,
+        "updated_at": START + timedelta(minutes=minutes),
+        "is_deleted": False,
+        **fields,
+    }
+
+
+def test_reads_are_scoped_to_the_owner_and_skip_deleted_posts(repositories):
+    _, posts = repositories
+
+    async def scenario():
+        live = await posts.insert(post())
+        deleted = await posts.insert(post(is_deleted=True))
+        return (
+            await posts.get(str(live["_id"]), OWNER) is not None,
+            await posts.get(str(live["_id"]), OTHER),
+            await posts.get(str(deleted["_id"])),
+            await posts.find_by_ids([str(live["_id"]), str(deleted["_id"])], OWNER, fields=["title"]),
+            await posts.find_by_ids([str(live["_id"])], OTHER),
+            live["_id"],
+        )
+
+    found, foreign, deleted, projected, foreign_many, live_id = asyncio.run(scenario())
+
+    assert found
+    assert foreign is None
+    assert deleted is None
+    assert projected == [{"_id": live_id, "title": "Title"}]
+    assert foreign_many == []
+
+
+def test_posts_without_the_deleted_flag_are_not_live(repositories):
+    # Matches the MongoDB filter {"is_deleted": False}, which skips documents without the field
+    _, posts = repositories
+    unflagged = post()
+    del unflagged["is_deleted"]
+
+    async def scenario():
+        stored = await posts.insert(unflagged)
+        return await posts.get(str(stored["_id"])), await posts.count_by_user(OWNER), await posts.list_by_user(OWNER)
+
+    assert asyncio.run(scenario()) == (None, 0, [])
+
+
+def test_returned_documents_are_copies(repositories):
+    _, posts = repositories
+
+    async def scenario():
+        stored = await posts.insert(post(tags=["a"]))
+        stored["tags"].append("b")
+        loaded = await posts.get(str(stored["_id"]))
+        loaded["title"] = "Changed"
+        return await posts.get(str(stored["_id"]))
+
+    assert asyncio.run(scenario())["tags"] == ["a"]
+
+
+def test_listing_is_newest_first_with_pagination(repositories):
+    _, posts = repositories
+
+    async def scenario():
+        for minutes in (2, 0, 3, 1):
+            await posts.insert(post(minutes=minutes, title=str(minutes)))
+        await posts.insert(post(minutes=9, is_deleted=True))
+        await posts.insert(post(OTHER, minutes=5))
+        page = await posts.list_by_user(OWNER, skip=1, limit=2)
+        everything = [item async for item in posts.iter_by_user(OWNER, batch_size=2)]
+        return page, everything, await posts.count_by_user(OWNER)
+
+    page, everything, count = asyncio.run(scenario())
+
+    assert [item["title"] for item in page] == ["2", "1"]
+    assert [item["title"] for item in everything] == ["3", "2", "1", "0"]
+    assert count == 4
+
+
+def test_duplicate_ids_are_reported_per_write(repositories):
+    _, posts = repositories
+    post_id = ObjectId()
+
+    async def scenario():
+        await posts.insert(post(_id=post_id))
+        return (
+            await posts.insert_many([post(), post(_id=post_id)]),
+            await posts.bulk_write([PostWrite.insert(post(_id=post_id)), PostWrite.update(str(post_id), {"title": "Bulk"})]),
+            await posts.get(str(post_id)),
+        )
+
+    insert_errors, bulk_errors, stored = asyncio.run(scenario())
+
+    assert list(insert_errors) == [1]
+    assert list(bulk_errors) == [0]
+    assert stored["title"] == "Bulk"
+
+
+def test_bulk_updates_that_match_no_live_post_are_reported(repositories):
+    _, posts = repositories
+
+    async def scenario():
+        live = await posts.insert(post())
+        deleted = await posts.insert(post(is_deleted=True))
+        foreign = await posts.insert(post(OTHER))
+        errors = await posts.bulk_write([
+            PostWrite.update(str(deleted["_id"]), {"is_deleted": True}),
+            PostWrite.update(str(live["_id"]), {"title": "Bulk"}),
+            PostWrite.update(str(foreign["_id"]), {"title": "Bulk"}),
+            PostWrite.update(str(ObjectId()), {"title": "Bulk"}),
+        ], user_id=OWNER)
+        return errors, await posts.get(str(live["_id"])), await posts.get(str(foreign["_id"]))
+
+    errors, live, foreign = asyncio.run(scenario())
+
+    assert errors == {0: "Post not found", 2: "Post not found", 3: "Post not found"}
+    assert live["title"] == "Bulk"
+    assert foreign["title"] == "Title"
+
+
+def test_update_with_expected_is_a_compare_and_set(repositories):
+    _, posts = repositories
+
+    async def scenario():
+        stored = await posts.insert(post(word_count=3))
+        post_id = str(stored["_id"])
+        previous = await posts.update(
+            post_id, {"word_count": 5, "updated_at": START + timedelta(minutes=1)},
+            previous_fields=("word_count",), expected={"updated_at": START}
+        )
+        conflict = await posts.update(post_id, {"word_count": 7}, expected={"updated_at": START})
+        foreign = await posts.update(post_id, {"word_count": 9}, user_id=OTHER)
+        return previous, conflict, foreign, await posts.get(post_id)
+
+    previous, conflict, foreign, stored = asyncio.run(scenario())
+
+    assert previous == {"_id": stored["_id"], "word_count": 3}
+    assert conflict is None
+    assert foreign is None
+    assert stored["word_count"] == 5
+
+
+def test_purge_removes_only_posts_deleted_before_the_cutoff(repositories):
+    _, posts = repositories
+
+    async def scenario():
+        old = await posts.insert(post())
+        recent = await posts.insert(post())
+        await posts.update(str(old["_id"]), {"is_deleted": True, "deleted_at": START})
+        await posts.update(str(recent["_id"]), {"is_deleted": True, "deleted_at": START + timedelta(days=30)})
+        purged = await posts.purge_deleted(START + timedelta(days=1), limit=10)
+        again = await posts.purge_deleted(START + timedelta(days=1), limit=10)
+        restored = await posts.bulk_write([PostWrite.update(str(recent["_id"]), {"is_deleted": False})])
+        return purged, again, restored, await posts.count_by_user(OWNER)
+
+    purged, again, restored, count = asyncio.run(scenario())
+
+    assert (purged, again) == (1, 0)
+    # Soft-deleted posts are no longer live, so the bulk update cannot revive them
+    assert restored == {0: "Post not found"}
+    assert count == 0
+
+
+def test_stats_deltas_bump_the_version(repositories):
+    _, posts = repositories
+
+    async def scenario():
+        await posts.apply_stats_delta(OWNER, {"drafts": 1})
+        missing = await posts.get_stats(OWNER)
+        await posts.reconcile_stats(OWNER)
+        await posts.apply_stats_delta(OWNER, {"drafts": 1, "total_words": 4}, START)
+        await posts.apply_stats_delta(OWNER, {}, START - timedelta(days=1))
+        return missing, await posts.get_stats(OWNER)
+
+    missing, stats = asyncio.run(scenario())
+
+    # Deltas never create the document; reconciliation does
+    assert missing is None
+    assert (stats["drafts"], stats["total_words"], stats["version"]) == (1, 4, 1)
+    assert stats["last_activity_at"] == START
+
+
+def test_reconcile_counts_only_drifted_users(repositories):
+    _, posts = repositories
+
+    async def scenario():
+        await posts.insert(post(word_count=2))
+        await posts.insert(post(minutes=5, status="published", word_count=3))
+        await posts.insert(post(OTHER, is_deleted=True))
+        first = await posts.reconcile_stats()
+        second = await posts.reconcile_stats()
+        await posts.apply_stats_delta(OWNER, {"published": 1})
+        drifted = await posts.reconcile_stats()
+        return first, second, drifted, await posts.get_stats(OWNER), await posts.get_stats(OTHER)
+
+    first, second, drifted, stats, other = asyncio.run(scenario())
+
+    assert (first, second, drifted) == (1, 0, 1)
+    assert (stats["drafts"], stats["published"], stats["total_words"]) == (1, 1, 5)
+    assert stats["last_activity_at"] == START + timedelta(minutes=5)
+    # A user whose posts are all deleted gets no stats document from a full pass
+    assert other is None
+
+
+def test_refresh_tokens_are_consumed_once_and_revoked_by_family(repositories):
+    users, _ = repositories
+    now = datetime.utcnow()
+    family_id = ObjectId()
+
+    def token(token_hash: str, expires_in: timedelta = timedelta(days=1)) -> dict:
+        return {
+            "token_hash": token_hash,
+            "family_id": family_id,
+            "user_id": OWNER,
+            "expires_at": now + expires_in,
+            "used_at": None,
+            "revoked_at": None,
+        }
+
+    async def scenario():
+        for token_hash in ("first", "second"):
+            await users.insert_refresh_token(token(token_hash))
+        await users.insert_refresh_token(token("expired", -timedelta(seconds=1)))
+        consumed = await users.consume_refresh_token("first", now)
+        consumed_again = await users.consume_refresh_token("first", now)
+        expired = await users.get_refresh_token("expired")
+        await users.revoke_refresh_family(family_id, now)
+        return consumed, consumed_again, expired, await users.consume_refresh_token("second", now)
+
+    consumed, consumed_again, expired, revoked = asyncio.run(scenario())
+
+    assert consumed["used_at"] == now
+    assert consumed_again is None
+    assert expired is None
+    assert revoked is None
@@ -0,0 +1,44 @@
+"""
+Tests for the MongoDB connection pool statistics (db/pool_stats.py).
+"""
+import threading
+from types import SimpleNamespace
+from backend.db.pool_stats import PoolStatsListener
+
+
+EVENT = SimpleNamespace(address=("db", 27017), reason="timeout")
+
+
+def test_checkout_lifecycle_is_counted():
+    listener = PoolStatsListener()
+
+    listener.connection_created(EVENT)
+    listener.connection_check_out_started(EVENT)
+    listener.connection_checked_out(EVENT)
+    checked_out = listener.snapshot()["db:27017"]
+    listener.connection_checked_in(EVENT)
+    listener.connection_check_out_started(EVENT)
+    listener.connection_check_out_failed(EVENT)
+
+    assert checked_out == {"open": 1, "checked_out": 1, "waiting": 0, "checkout_failures": 0}
+    assert listener.snapshot() == {"db:27017": {"open": 1, "checked_out": 0, "waiting": 0, "checkout_failures": 1}}
+
+
+def test_counters_stay_exact_under_concurrent_events():
+    # pymongo delivers pool events from Motor's executor threads
+    listener = PoolStatsListener()
+
+    def checkouts():
+        for _ in range(2000):
+            listener.connection_check_out_started(EVENT)
+            listener.connection_checked_out(EVENT)
+            listener.connection_checked_in(EVENT)
+            listener.snapshot()
+
+    threads = [threading.Thread(target=checkouts) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert listener.snapshot()["db:27017"] == {"open": 0, "checked_out": 0, "waiting": 0, "checkout_failures": 0}
@@ -0,0 +1,82 @@
+"""
+Tests for the in-memory token buckets (services/rate_limiter.py).
+"""
+import asyncio
+import pytest
+from backend.services import rate_limiter
+from backend.services.rate_limiter import MemoryTokenBuckets
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    return now
+
+
+def acquire(buckets, *limits):
+    return asyncio.run(buckets.acquire(list(limits)))
+
+
+def test_burst_then_refill(clock):
+    buckets = MemoryTokenBuckets(max_keys=10)
+    limit = ("k", 1.0, 2)
+
+    assert acquire(buckets, limit) == (-1, 0.0)
+    assert acquire(buckets, limit) == (-1, 0.0)
+    rejected, wait = acquire(buckets, limit)
+    assert rejected == 0
+    assert wait == pytest.approx(1.0)
+
+    clock[0] += 1.0
+    assert acquire(buckets, limit)[0] == -1
+
+
+def test_rejection_spends_no_tokens_from_other_buckets(clock):
+    buckets = MemoryTokenBuckets(max_keys=10)
+    ip = ("ip", 0.001, 3)
+    user = ("user", 0.001, 1)
+
+    assert acquire(buckets, ip, user)[0] == -1
+    # The user bucket is empty now; the shared IP bucket must keep its tokens
+    for _ in range(5):
+        assert acquire(buckets, ip, user)[0] == 1
+    assert acquire(buckets, ip)[0] == -1
+    assert acquire(buckets, ip)[0] == -1
+    assert acquire(buckets, ip)[0] == 0
+
+
+def test_wait_covers_every_short_bucket(clock):
+    buckets = MemoryTokenBuckets(max_keys=10)
+    acquire(buckets, ("a", 1.0, 1), ("b", 0.5, 1))
+
+    rejected, wait = acquire(buckets, ("a", 1.0, 1), ("b", 0.5, 1))
+    assert rejected == 0
+    assert wait == pytest.approx(2.0)
+
+
+def test_limits_are_split_across_workers(clock):
+    buckets = MemoryTokenBuckets(max_keys=10, workers=4)
+
+    # Burst 8 over 4 workers leaves 2 per worker, refilled at 1/4 token per second
+    assert acquire(buckets, ("k", 1.0, 8))[0] == -1
+    assert acquire(buckets, ("k", 1.0, 8))[0] == -1
+    rejected, wait = acquire(buckets, ("k", 1.0, 8))
+    assert rejected == 0
+    assert wait == pytest.approx(4.0)
+
+
+def test_split_burst_never_drops_below_one_request(clock):
+    buckets = MemoryTokenBuckets(max_keys=10, workers=8)
+
+    assert acquire(buckets, ("k", 0.2, 5))[0] == -1
+
+
+def test_least_recently_used_buckets_are_evicted(clock):
+    buckets = MemoryTokenBuckets(max_keys=2)
+    for key in ("a", "b", "c"):
+        acquire(buckets, (key, 1.0, 1))
+
+    assert len(buckets) == 2
+    # "a" was evicted and starts over with a full bucket
+    assert acquire(buckets, ("a", 1.0, 1))[0] == -1
@@ -0,0 +1,79 @@
+"""
+Tests for refresh-token rotation and reuse detection (services/refresh_tokens.py).
+"""
+import asyncio
+import pytest
+from bson import ObjectId
+from backend.core.config import settings
+from backend.services.refresh_tokens import (
+    RefreshTokenError,
+    issue_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
+
+
+USER_ID = ObjectId()
+
+
+def test_rotation_issues_a_new_token_for_the_same_user(repositories):
+    async def scenario():
+        token = await issue_refresh_token(USER_ID)
+        user_id, rotated = await rotate_refresh_token(token)
+        user_id_again, _ = await rotate_refresh_token(rotated)
+        return token, rotated, user_id, user_id_again
+
+    token, rotated, user_id, user_id_again = asyncio.run(scenario())
+
+    assert rotated != token
+    assert user_id == user_id_again == USER_ID
+
+
+def test_reusing_a_rotated_token_revokes_the_session(repositories):
+    async def scenario():
+        token = await issue_refresh_token(USER_ID)
+        _, rotated = await rotate_refresh_token(token)
+        with pytest.raises(RefreshTokenError) as reused:
+            await rotate_refresh_token(token)
+        with pytest.raises(RefreshTokenError) as revoked:
+            await rotate_refresh_token(rotated)
+        return reused.value.reason, revoked.value.reason
+
+    assert asyncio.run(scenario()) == ("reused", "invalid")
+
+
+def test_concurrent_exchanges_of_one_token_let_exactly_one_through(repositories):
+    async def scenario():
+        token = await issue_refresh_token(USER_ID)
+        return await asyncio.gather(rotate_refresh_token(token), rotate_refresh_token(token), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert sum(not isinstance(result, Exception) for result in results) == 1
+    assert [result.reason for result in results if isinstance(result, RefreshTokenError)] == ["reused"]
+
+
+def test_unknown_and_expired_tokens_are_invalid(repositories, monkeypatch):
+    async def scenario():
+        reasons = []
+        monkeypatch.setattr(settings, "REFRESH_TOKEN_EXPIRE_DAYS", -1)
+        expired = await issue_refresh_token(USER_ID)
+        for token in ("not-a-token", expired):
+            with pytest.raises(RefreshTokenError) as error:
+                await rotate_refresh_token(token)
+            reasons.append(error.value.reason)
+        return reasons
+
+    assert asyncio.run(scenario()) == ["invalid", "invalid"]
+
+
+def test_logout_ends_the_session(repositories):
+    async def scenario():
+        token = await issue_refresh_token(USER_ID)
+        _, rotated = await rotate_refresh_token(token)
+        assert await revoke_refresh_token(token)
+        with pytest.raises(RefreshTokenError):
+            await rotate_refresh_token(rotated)
+        return await revoke_refresh_token("not-a-token")
+
+    assert asyncio.run(scenario()) is False
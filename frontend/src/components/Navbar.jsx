@@ -1,7 +1,7 @@
 import { useNavigate } from 'react-router-dom';
 import { LogOut, Save, Send, Check, AlertCircle, Menu, Loader2 } from 'lucide-react';
 import useEditorStore from '../store/editorStore';
-import { postsAPI } from '../services/api';
+import { authAPI, clearTokens, postsAPI } from '../services/api';
 import { useState } from 'react';
 import { formatSaveTime } from '../utils/time';
 
@@ -19,7 +19,12 @@ function Navbar({ onMenuClick }) {
   const [isPublishing, setIsPublishing] = useState(false);
 
   const handleLogout = () => {
-    localStorage.removeItem('token');
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (refreshToken) {
+      // End the server-side session; logging out locally does not wait for it
+      authAPI.logout(refreshToken).catch(() => {});
+    }
+    clearTokens();
     navigate('/login');
   };
 
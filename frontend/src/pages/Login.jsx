@@ -1,6 +1,6 @@
 import { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { authAPI } from '../services/api';
+import { authAPI, storeTokens } from '../services/api';
 
 function Login() {
   const [email, setEmail] = useState('');
@@ -16,10 +16,8 @@ function Login() {
 
     try {
       const response = await authAPI.login(email, password);
-      const { access_token } = response.data;
-
-      // Store JWT token
-      localStorage.setItem('token', access_token);
+      // Store JWT access token and refresh token
+      storeTokens(response.data);
 
       // Redirect to dashboard
       navigate('/dashboard');
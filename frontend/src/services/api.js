@@ -24,13 +24,74 @@ api.interceptors.request.use(
   }
 );
 
+// Store the tokens returned by login or refresh
+export const storeTokens = ({ access_token, refresh_token }) => {
+  localStorage.setItem('token', access_token);
+  if (refresh_token) {
+    localStorage.setItem('refreshToken', refresh_token);
+  }
+};
+
+export const clearTokens = () => {
+  localStorage.removeItem('token');
+  localStorage.removeItem('refreshToken');
+};
+
+// Refresh tokens are single-use: concurrent 401s in this tab share one refresh call,
+// and a Web Lock serializes refreshes across tabs, which share localStorage
+let refreshPromise = null;
+
+const exchangeRefreshToken = async (staleToken) => {
+  // Another tab may have rotated the tokens while this one waited for the lock
+  const currentToken = localStorage.getItem('token');
+  if (currentToken && currentToken !== staleToken) {
+    return currentToken;
+  }
+
+  const refreshToken = localStorage.getItem('refreshToken');
+  if (!refreshToken) {
+    throw new Error('No refresh token');
+  }
+  const response = await axios.post(`${API_BASE_URL}/api/auth/refresh`, { refresh_token: refreshToken });
+  storeTokens(response.data);
+  return response.data.access_token;
+};
+
+const refreshAccessToken = (staleToken) => {
+  if (!refreshPromise) {
+    refreshPromise = (navigator.locks
+      ? navigator.locks.request('auth-refresh', () => exchangeRefreshToken(staleToken))
+      : exchangeRefreshToken(staleToken)
+    ).finally(() => {
+      refreshPromise = null;
+    });
+  }
+  return refreshPromise;
+};
+
 // Response interceptor to handle errors
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
-    if (error.response?.status === 401) {
-      // Token expired or invalid
-      localStorage.removeItem('token');
+  async (error) => {
+    const original = error.config;
+    const isAuthRequest = original?.url?.startsWith('/api/auth/');
+
+    if (error.response?.status === 401 && original && !original._retried && !isAuthRequest) {
+      // Access token expired: refresh once and replay the request
+      original._retried = true;
+      const staleToken = original.headers?.Authorization?.replace(/^Bearer /, '');
+      try {
+        const token = await refreshAccessToken(staleToken);
+        original.headers.Authorization = `Bearer ${token}`;
+        return api(original);
+      } catch {
+        // Fall through to the login redirect
+      }
+    }
+
+    if (error.response?.status === 401 && !isAuthRequest) {
+      // Session expired or revoked
+      clearTokens();
       window.location.href = '/login';
     }
     return Promise.reject(error);
@@ -44,6 +105,9 @@ export const authAPI = {
   
   register: (email, password) => 
     api.post('/api/auth/register', { email, password }),
+  
+  logout: (refreshToken) => 
+    api.post('/api/auth/logout', { refresh_token: refreshToken }),
 };
 
 // Posts API
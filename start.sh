@@ -9,5 +9,7 @@ cd "$(dirname "$0")"
 # Add project root to PYTHONPATH so 'backend' module can be imported
 export PYTHONPATH="${PYTHONPATH}:$(pwd)"
 
-# Start uvicorn
-exec uvicorn backend.main:app --host 0.0.0.0 --port ${PORT:-8000}
+# Start the production server with graceful SIGTERM drain. Single worker unless
+# WEB_CONCURRENCY is set: workers do not share caches, rate limits or collab rooms
+export WEB_CONCURRENCY="${WEB_CONCURRENCY:-1}"
+exec python -m backend.serve